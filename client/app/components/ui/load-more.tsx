@@ -0,0 +1,16 @@
+import { Button } from "@/components/ui/button";
+
+interface LoadMoreProps {
+  hasMore: boolean;
+  loading: boolean;
+  loadMore: () => void;
+}
+
+export default function LoadMore({ hasMore, loading, loadMore }: LoadMoreProps) {
+  if (!hasMore) return <></>;
+  return (
+    <Button variant="secondary" disabled={loading} onClick={loadMore}>
+      {loading ? "Loading..." : "Load more"}
+    </Button>
+  );
+}
@@ -68,6 +68,7 @@ export interface PostData {
     name: string,
   }
   like_number: number,
+  comment_count: number,
   liked?: boolean,
   comments: CommentData[];
 }
@@ -77,3 +78,16 @@ export interface LikeData {
   user: number;
   post: number;
 }
+
+// The pagination block list endpoints send next to their rows.
+export interface Pagination {
+  next_cursor: string | null;
+  limit: number;
+  total?: number;
+}
+
+// One page of a list, as returned by apiFetchPage().
+export interface Page<T> {
+  rows: T[];
+  next_cursor: string | null;
+}
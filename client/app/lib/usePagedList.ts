@@ -0,0 +1,38 @@
+import { useEffect, useState } from "react";
+import type { Page } from "@/lib/types";
+import { apiFetchPage } from "@/lib/utils";
+
+/**
+ * Keeps the pages of a list loaded so far, starting from the page a loader
+ * fetched, and fetches the next one on demand
+ * @param {string} url - The list endpoint the first page came from
+ * @param {string} key - Name of the list in each page's data
+ * @param {Page<T>} first - The first page
+ */
+export const usePagedList = <T,>(url: string, key: string, first: Page<T>) => {
+  const [rows, setRows] = useState(first.rows);
+  const [cursor, setCursor] = useState(first.next_cursor);
+  const [loading, setLoading] = useState(false);
+
+  // The route can be reused for another list, e.g. another user's page
+  useEffect(() => {
+    setRows(first.rows);
+    setCursor(first.next_cursor);
+  }, [first]);
+
+  const loadMore = async () => {
+    if (cursor === null || loading) return;
+    setLoading(true);
+    try {
+      const page = await apiFetchPage<T>(url, key, cursor);
+      if (page) {
+        setRows((loaded) => [...loaded, ...page.rows]);
+        setCursor(page.next_cursor);
+      }
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  return { rows, hasMore: cursor !== null, loading, loadMore };
+};
@@ -1,5 +1,6 @@
 import { clsx, type ClassValue } from "clsx";
 import { twMerge } from "tailwind-merge";
+import type { Page, Pagination } from "@/lib/types";
 
 /**
  * Concatenates tailwind classnames for use within components
@@ -43,3 +44,22 @@ export async function apiFetch(
 
   return fetch("/api" + url , { ...options, headers });
 }
+
+/**
+ * Fetches one page of a paginated list endpoint
+ *
+ * @param url - The list endpoint, e.g. "/posts/user/someone"
+ * @param key - Name of the list in the page's data, e.g. "posts"
+ * @param cursor - next_cursor of the previous page, empty for the first
+ * @returns {Promise<Page<T> | null>} The page, or null if the request failed
+ */
+export async function apiFetchPage<T>(url: string, key: string, cursor: string = ""): Promise<Page<T> | null> {
+  const separator = url.includes("?") ? "&" : "?";
+  const response = await apiFetch(`${url}${separator}cursor=${encodeURIComponent(cursor)}`, {
+    method: "GET",
+    headers: { "Content-Type": "application/json" },
+  });
+  if (!response.ok) return null;
+  const page: { data: { [key: string]: unknown; pagination: Pagination } } = await response.json();
+  return { rows: page.data[key] as T[], next_cursor: page.data.pagination.next_cursor };
+}
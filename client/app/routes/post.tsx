@@ -1,36 +1,42 @@
-import type { CommentData, PostData } from "@/lib/types";
-import { apiFetch } from "@/lib/utils";
+import type { CommentData, Page, PostData } from "@/lib/types";
+import { apiFetch, apiFetchPage } from "@/lib/utils";
+import { usePagedList } from "@/lib/usePagedList";
 import type { Route } from "./+types/post";
 import Post from "@/components/ui/post";
 import Comment from "@/components/ui/comment";
+import LoadMore from "@/components/ui/load-more";
+
+const NO_COMMENTS: Page<CommentData> = { rows: [], next_cursor: null };
 
 export async function clientLoader({ params }: Route.ClientLoaderArgs) {
   const posts = await apiFetch(`/posts/${params.postID}`, {
     method: "GET",
     headers: { "Content-Type": "application/json" },
   });
-  const comments = await apiFetch(`/comments?id=${params.postID}`, {
-    method: "GET",
-    headers: { "Content-Type": "application/json" },
-  });
+  const commentsUrl = `/comments?id=${params.postID}`;
+  const comments = await apiFetchPage<CommentData>(commentsUrl, "comments");
 
   if (posts.ok) {
     const postData: { data: { post: PostData } } = await posts.json();
-    const commentData: { data: CommentData[] } = await comments.json();
     console.log(postData.data);
     return {
       postData: postData.data.post,
-      commentData: commentData.data
+      commentsUrl,
+      commentData: comments || NO_COMMENTS
     };
   }
 }
 
 
 export default function PostRoute({loaderData}: Route.ComponentProps){
+const comments = usePagedList<CommentData>(
+    loaderData?.commentsUrl || "", "comments", loaderData?.commentData || NO_COMMENTS
+);
 return <div className="flex flex-col items-center gap-5 pb-18">
     <Post className="mb-7" post={(loaderData?.postData) as PostData}/>
-    {loaderData?.commentData?loaderData?.commentData.map((comment: CommentData)=>{
+    {comments.rows.map((comment: CommentData)=>{
         return <Comment comment={comment}/>
-    }):<></>}
+    })}
+    <LoadMore {...comments}/>
 </div>
-}
\ No newline at end of file
+}
@@ -1,58 +1,51 @@
-import { apiFetch } from "@/lib/utils";
+import { apiFetch, apiFetchPage } from "@/lib/utils";
+import { usePagedList } from "@/lib/usePagedList";
 import type { Route } from "./+types/userpage";
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs";
 import type { User } from "@/lib/userSlice";
-import type { LikeData, PostData, SuperData } from "@/lib/types";
+import type { Page, PostData, SuperData } from "@/lib/types";
 import Post from "@/components/ui/post";
+import LoadMore from "@/components/ui/load-more";
+
+const EMPTY_PAGE: Page<never> = { rows: [], next_cursor: null };
 
 export async function clientLoader({ params }: Route.ClientLoaderArgs) {
   const user = await apiFetch(`/users/${params.username}`, {
     method: "GET",
     headers: { "Content-Type": "application/json" },
   });
-  const likes = await apiFetch(`/likes/user/${params.username}`, {
-    method: "GET",
-    headers: { "Content-Type": "application/json" },
-  });
-
-  const posts = await apiFetch(`/posts/user/${params.username}`, {
-    method: "GET",
-    headers: { "Content-Type": "application/json" },
-  });
-
-  const supers = await apiFetch(`/super/user/${params.username}`, {
-    method: "GET",
-    headers: { "Content-Type": "application/json" },
-  });
+  const urls = {
+    likes: `/likes/user/${params.username}`,
+    posts: `/posts/user/${params.username}`,
+    supers: `/super/user/${params.username}`,
+  };
+  // Only the first page of each list, the tabs load more as asked
+  const likes = await apiFetchPage<PostData>(urls.likes, "posts");
+  const posts = await apiFetchPage<PostData>(urls.posts, "posts");
+  const supers = await apiFetchPage<SuperData>(urls.supers, "activities");
 
-  if (user.ok && likes.ok && posts.ok && supers.ok) {
-    const [userData, likeData, postData, superData]: [
-      { data: User },
-      { data: PostData[] },
-      { data: PostData[] },
-      { data: SuperData[] },
-    ] = [
-      await user.json(),
-      await likes.json(),
-      await posts.json(),
-      await supers.json(),
-    ];
-    console.log(postData.data);
+  if (user.ok && likes && posts && supers) {
+    const userData: { data: User } = await user.json();
+    console.log(posts.rows);
     return {
+      urls,
       userData: userData.data,
-      likeData: likeData.data,
-      postData: postData.data,
-      superData: superData.data,
+      likeData: likes,
+      postData: posts,
+      superData: supers,
     };
   }
 }
 
 export default function UserPage({ loaderData }: Route.ComponentProps) {
-  // Add null checks with optional chaining and default empty arrays
+  // Add null checks with optional chaining and default empty pages
   const userData = loaderData?.userData || ({} as User);
-  const postData = loaderData?.postData || ([] as PostData[]);
-  const superData = loaderData?.superData || ([] as SuperData[]);
-  const likeData = loaderData?.likeData || ([] as PostData[]);
+  const posts = usePagedList<PostData>(loaderData?.urls.posts || "", "posts", loaderData?.postData || EMPTY_PAGE);
+  const supers = usePagedList<SuperData>(loaderData?.urls.supers || "", "activities", loaderData?.superData || EMPTY_PAGE);
+  const likes = usePagedList<PostData>(loaderData?.urls.likes || "", "posts", loaderData?.likeData || EMPTY_PAGE);
+  const postData = posts.rows;
+  const superData = supers.rows;
+  const likeData = likes.rows;
 
   return (
     <div className="text-secondary-foreground flex flex-col items-center">
@@ -88,6 +81,7 @@ export default function UserPage({ loaderData }: Route.ComponentProps) {
               {postData.map((post: PostData) => (
                 <Post post={post} />
               ))}
+              <LoadMore {...posts} />
             </div>
           ) : (
             <p>No posts yet.</p>
@@ -105,6 +99,7 @@ export default function UserPage({ loaderData }: Route.ComponentProps) {
                   <h3>{superItem.name}</h3>
                 </div>
               ))}
+              <LoadMore {...supers} />
             </div>
           ) : (
             <p>No activities yet.</p>
@@ -117,6 +112,7 @@ export default function UserPage({ loaderData }: Route.ComponentProps) {
               {likeData.map((post: PostData) => (
                 <Post post={post}/>
               ))}
+              <LoadMore {...likes} />
             </div>
           ) : (
             <p>No liked posts yet.</p>
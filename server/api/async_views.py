@@ -0,0 +1,223 @@
+from asgiref.sync import sync_to_async
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated
+
+from core.services import SuperService, PostService, TagService
+from core.search import asearch_users
+from core.models import User, Post
+from core.routers import use_replica
+from core.cache import FEED, SUPERS, USERS, post_key
+from .authentication import aauthenticate
+from .utils import StandardJsonResponse, json_standard_response, mistakes_were_made
+from .cache import HOT_FEED_TIMEOUT, cached_response
+from .middleware import view_query_budget
+from .views import PostView, SuperView, UserRegistrationView
+
+class AsyncReadView(View):
+    """
+    Base for endpoints whose reads are async views
+
+    DRF views are sync only, so the read (GET) side of these endpoints is a
+    plain Django async view returning json_standard_response(). Every write
+    method of `write_view` is handed to that DRF view unchanged, so it keeps
+    its authentication, permissions and CSRF checks. Reads authenticate with
+    the same tokens, through aauthenticate().
+
+    Attributes:
+        write_view: DRF view handling POST/PUT/PATCH/DELETE on the same URL
+        login_required: Reject anonymous reads, like DRF's IsAuthenticated
+        query_budget: Query budget of the reads (writes use write_view's)
+    """
+    write_view = None
+    login_required = False
+    query_budget = None
+    WRITE_METHODS = ['post', 'put', 'patch', 'delete']
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        write_view = cls.__dict__.get('write_view')
+        if write_view is None:
+            return
+        delegate = sync_to_async(write_view.as_view())
+
+        async def write(self, request, *args, **kwargs):
+            return await delegate(request, *args, **kwargs)
+
+        budget = {'GET': cls.query_budget}
+        for method in cls.WRITE_METHODS:
+            if hasattr(write_view, method):
+                setattr(cls, method, write)
+                budget[method.upper()] = view_query_budget(write_view, method.upper())
+        cls.query_budget = budget
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Writes check CSRF themselves in write_view, reads don't need it
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await super().dispatch(request, *args, **kwargs)
+        try:
+            request.user = await aauthenticate(request)
+            if self.login_required and not request.user.is_authenticated:
+                raise NotAuthenticated()
+            return await super().dispatch(request, *args, **kwargs)
+        except Exception as exc:
+            if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+                # Same as DRF with session authentication, which sends no
+                # WWW-Authenticate header
+                exc.status_code = status.HTTP_403_FORBIDDEN
+            response = mistakes_were_made(exc, {'view': self, 'request': request})
+            if response is None:
+                raise
+            return StandardJsonResponse(response.data, status=response.status_code)
+
+class FeedView(AsyncReadView):
+    """
+    API endpoint for retrieving/creating post(s).
+
+    GET: get multiple posts
+    Supports optional filtering parameters via query strings when searching.
+    Example: /api/posts/?type=project&tag=web&limit=10&cursor=<next_cursor>
+    ?order=reverse lists newest first, ?order=hot hottest first.
+    ?comments=N adds each post's latest N comments, in one more query.
+
+    POST: create a post (PostView)
+    Endpoint: /api/posts (POST method)
+    """
+    query_budget = 7
+    write_view = PostView
+
+    # Logged in users get their own "liked" flags, so only cache anonymous reads.
+    # A page is retired when posts are added or one of its posts changes; hot
+    # pages also reorder when posts elsewhere get likes, so they expire sooner.
+    @cached_response(
+        lambda **kwargs: [FEED, SUPERS, USERS],
+        anonymous_only=True,
+        contents=lambda data: [post_key(post['id']) for post in data.get('data', {}).get('posts', [])],
+        timeout=lambda request: HOT_FEED_TIMEOUT if request.GET.get('order') == 'hot' else None,
+    )
+    async def get(self, request):
+        """
+        Handle the get multiple posts process. It:
+        1. Interact with the PostService to get queried posts
+        2. Returns all the posts to the user
+        """
+        posts_data = await PostService.aget_multiple_posts(request.GET, request.user)
+
+        if posts_data:
+            return json_standard_response(
+                message="Get posts successful",
+                data=posts_data,
+                status=status.HTTP_200_OK
+            )
+        return json_standard_response(
+            message="No posts found",
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+class PostIDView(AsyncReadView):
+    query_budget = 4
+
+    @cached_response(lambda post_id: [post_key(post_id), SUPERS, USERS])
+    async def get(self, request, **kwargs):
+        """
+        Retrieve a post by ID.
+        """
+        [post_id] = kwargs.values()
+        try:
+            post = await Post.objects.select_related('user', 'project', 'event', 'club').aget(id=post_id)
+            return json_standard_response(
+                message="Retrieved Post",
+                data={'post': post.to_dict()},
+                status=status.HTTP_200_OK
+            )
+
+        except Post.DoesNotExist:
+            return json_standard_response(
+                message="Post not found",
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+class ActivitySearchView(AsyncReadView):
+    """
+    Endpoint for searching/making/editing a super object
+
+    GET: Search for super objects
+    POST: Create a super object (SuperView)
+    PATCH: Update/edit a super object (SuperView)
+    """
+    query_budget = 9
+    login_required = True
+    write_view = SuperView
+
+    @use_replica
+    async def get(self, request, *args, **kwargs):
+        """
+        Handles an activity search which returns one ranked list of projects,
+        events and clubs matching the search term by name, description or
+        tag. Narrow it with ?type= and page through it with ?cursor=.
+        """
+        return json_standard_response(
+            message='Search Results',
+            data=await SuperService.asearch_activities(request.GET),
+            status=status.HTTP_200_OK,
+        )
+
+class TagListView(AsyncReadView):
+    """
+    Tags with how many posts and Supers carry each, the most used first
+    Endpoint: GET /api/tags
+
+    ?prefix= narrows it to tags starting with the prefix, alphabetically.
+    Page through it with ?limit= and ?cursor=.
+    """
+    query_budget = 2
+
+    async def get(self, request, *args, **kwargs):
+        return json_standard_response(
+            message='Tags',
+            data=await TagService.alist_tags(request.GET),
+            status=status.HTTP_200_OK,
+        )
+
+class UserSearchView(AsyncReadView):
+    """
+    API endpoint for searching users and registering (UserRegistrationView).
+    Endpoint: /api/users
+    """
+    query_budget = 8
+    write_view = UserRegistrationView
+
+    async def get(self, request, *args, **kwargs):
+        """
+        Handles a user search which returns the top 10 users based on the
+        search term (such as users with a similar name). Matches the username
+        and display_name through the user search index, case and accent
+        insensitively, with exact and prefix matches ranked first.
+        """
+        search_term = request.GET.get('search', '')
+        users = await asearch_users(search_term, limit=10)
+
+        return json_standard_response(
+            message='Search Results',
+            data={'users': [user.to_dict() for user in users]},
+            status=status.HTTP_200_OK,
+        )
+
+class UserUNameGet(AsyncReadView):
+    query_budget = 4
+    login_required = True
+
+    @use_replica
+    async def get(self, request, **kwargs):
+        [username] = kwargs.values()
+        user = await User.objects.filter(username=username).afirst()
+        return json_standard_response(
+            message='Successfully created Super',
+            data=user.to_dict() if user is not None else {},
+            status=status.HTTP_200_OK
+        )
@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from rest_framework import authentication, exceptions
+from core.tokens import aresolve_token, resolve_token, token_ttl
+
+COOKIE = 'auth_token'
+
+def request_token(request):
+    """
+    The auth token a request carries
+
+    Returns:
+        tuple: (token, from_header), token is None when there isn't one
+    """
+    header = request.META.get('HTTP_AUTHORIZATION', '').split()
+    if len(header) == 2 and header[0].lower() in ('token', 'bearer'):
+        return header[1], True
+    return request.COOKIES.get(COOKIE), False
+
+class TokenAuthentication(authentication.BaseAuthentication):
+    """
+    Authenticates with a signed token from SessionView (see core.tokens)
+
+    API clients send it as "Authorization: Token <token>". The web client
+    gets it as an HttpOnly cookie, so cookie requests are held to the same
+    CSRF check as session authentication. A bad cookie counts as logged
+    out, a bad header token fails the request.
+    """
+    def authenticate(self, request):
+        token, from_header = request_token(request)
+        if not token:
+            return None
+        user = resolve_token(token)
+        if user is None:
+            if from_header:
+                raise exceptions.AuthenticationFailed('Invalid or expired token.')
+            return None
+        if not from_header:
+            authentication.SessionAuthentication().enforce_csrf(request)
+        return (user, token)
+
+async def aauthenticate(request):
+    """
+    TokenAuthentication for async views, reads only (no CSRF check)
+
+    Returns:
+        User: The token's user, or AnonymousUser
+
+    Raises:
+        AuthenticationFailed: If an Authorization header token is invalid
+    """
+    token, from_header = request_token(request)
+    user = await aresolve_token(token) if token else None
+    if user is None:
+        if token and from_header:
+            raise exceptions.AuthenticationFailed('Invalid or expired token.')
+        return AnonymousUser()
+    return user
+
+def set_token_cookie(response, token: str):
+    """Hand the web client its token"""
+    response.set_cookie(
+        COOKIE, token, max_age=token_ttl(), httponly=True, samesite='Lax',
+        secure=getattr(settings, 'SESSION_COOKIE_SECURE', False),
+    )
+    return response
+
+def delete_token_cookie(response):
+    response.delete_cookie(COOKIE, samesite='Lax')
+    return response
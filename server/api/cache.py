@@ -0,0 +1,170 @@
+import hashlib
+import threading
+from functools import wraps
+from typing import Callable, Iterable, Optional
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+from core.cache import WRITES, aget_versions, get_versions
+from core.routers import current_state
+from .utils import StandardJsonResponse
+
+RESPONSE_PREFIX = 'response:'
+# Safety net only: entries are invalidated by version bumps, not by age
+RESPONSE_TIMEOUT = 60 * 60
+# Pages ordered by hotness, which likes on any post can change
+HOT_FEED_TIMEOUT = 30
+
+class CacheStats:
+    """Hit/miss counters for cached_response, per process"""
+    _lock = threading.Lock()
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def record(cls, hit: bool):
+        with cls._lock:
+            if hit:
+                cls.hits += 1
+            else:
+                cls.misses += 1
+
+    @classmethod
+    def to_dict(cls):
+        total = cls.hits + cls.misses
+        return {
+            'hits': cls.hits,
+            'misses': cls.misses,
+            'hit_rate': cls.hits / total if total else None,
+        }
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls.hits = cls.misses = 0
+
+def cached_response(
+        versions: Callable[..., Iterable[str]],
+        anonymous_only: bool = False,
+        contents: Optional[Callable[[dict], Iterable[str]]] = None,
+        timeout: Optional[Callable[[object], Optional[int]]] = None):
+    """
+    Cache successful responses of a view handler under version keys
+
+    The cache key combines the full request path (including the query
+    string) with the current version of every key returned by versions(),
+    so a bump of any of them retires the entry. Responses get an X-Cache
+    header saying whether they were a HIT or a MISS. Works on DRF handlers
+    and on async handlers returning StandardJsonResponse.
+
+    Args:
+        versions: Called with the view's kwargs, returns the version keys
+                  (see core.cache) the response is built from
+        anonymous_only: Only cache for logged out users, for responses
+                        that contain per-user fields
+        contents: Called with the response data, returns the version keys
+                  of the entities in it (e.g. each post on a page). Their
+                  versions are stored with the entry and checked on every
+                  hit, so a write to one of them retires only the entries
+                  that contain it. They can only be read once the response
+                  is built, so the entry isn't stored if any write landed
+                  while it was being built (see core.cache.WRITES).
+        timeout: Called with the request, returns how long its entry may
+                 live at most, or None for the default
+    """
+    def decorator(method):
+        if iscoroutinefunction(method):
+            return _async_cached(method, versions, anonymous_only, contents, timeout)
+
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            if anonymous_only and request.user.is_authenticated:
+                return method(view, request, *args, **kwargs)
+
+            current = get_versions(_version_keys(versions, contents, kwargs))
+            writes = current.pop(WRITES, None)
+            key = _response_key(request, current)
+            cached = cache.get(key)
+            if cached is not None and _fresh(cached, get_versions(cached.get('contents', {}))):
+                CacheStats.record(hit=True)
+                response = Response(cached['data'], status=cached['status'])
+                response['X-Cache'] = 'HIT'
+                return response
+
+            CacheStats.record(hit=False)
+            response = method(view, request, *args, **kwargs)
+            if response.status_code == 200:
+                entry = {'data': response.data, 'status': response.status_code}
+                if contents is not None:
+                    entry['contents'] = get_versions([*contents(response.data), WRITES])
+                if _unchanged(entry, writes):
+                    cache.set(key, entry, _timeout(request, timeout))
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+def _async_cached(method, versions, anonymous_only, contents, timeout):
+    # cached_response() for async views, which return StandardJsonResponse
+    @wraps(method)
+    async def wrapper(view, request, *args, **kwargs):
+        if anonymous_only and request.user.is_authenticated:
+            return await method(view, request, *args, **kwargs)
+
+        current = await aget_versions(_version_keys(versions, contents, kwargs))
+        writes = current.pop(WRITES, None)
+        key = _response_key(request, current)
+        cached = await cache.aget(key)
+        if cached is not None and _fresh(cached, await aget_versions(cached.get('contents', {}))):
+            CacheStats.record(hit=True)
+            response = StandardJsonResponse(cached['data'], status=cached['status'])
+            response['X-Cache'] = 'HIT'
+            return response
+
+        CacheStats.record(hit=False)
+        response = await method(view, request, *args, **kwargs)
+        if response.status_code == 200:
+            entry = {'data': response.data, 'status': response.status_code}
+            if contents is not None:
+                entry['contents'] = await aget_versions([*contents(response.data), WRITES])
+            if _unchanged(entry, writes):
+                await cache.aset(key, entry, _timeout(request, timeout))
+        response['X-Cache'] = 'MISS'
+        return response
+    return wrapper
+
+def _version_keys(versions, contents, kwargs) -> list:
+    # The keys a lookup reads: WRITES too when the entry will record its contents
+    keys = list(versions(**kwargs))
+    return keys + [WRITES] if contents is not None else keys
+
+def _unchanged(entry: dict, writes) -> bool:
+    # Whether no write landed between the lookup and reading the contents'
+    # versions. If one did, the rows may predate it while the versions
+    # don't, and the entry would pass for fresh. Takes WRITES out of the
+    # entry's contents either way.
+    if 'contents' not in entry:
+        return True
+    return entry['contents'].pop(WRITES) == writes
+
+def _fresh(cached: dict, current: dict) -> bool:
+    # Whether none of the entities in an entry changed since it was stored
+    return current == cached.get('contents', {})
+
+def _response_key(request, current) -> str:
+    # The full path (including the query string) plus every version it depends on
+    fingerprint = request.get_full_path() + '|' + '|'.join(
+        f'{key}={version}' for key, version in sorted(current.items())
+    )
+    return RESPONSE_PREFIX + hashlib.sha1(fingerprint.encode()).hexdigest()
+
+def _timeout(request, timeout) -> int:
+    # A lagging replica could have served rows from before the write that
+    # bumped the version, so keep those entries only as long as replicas
+    # are allowed to lag
+    state = current_state()
+    if state is not None and state.used_replica:
+        return getattr(settings, 'READ_YOUR_WRITES_SECONDS', 5)
+    limit = timeout(request) if timeout is not None else None
+    return RESPONSE_TIMEOUT if limit is None else min(limit, RESPONSE_TIMEOUT)
@@ -0,0 +1,232 @@
+import logging
+import threading
+import time
+from contextlib import ExitStack
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from core import routers
+
+logger = logging.getLogger(__name__)
+
+class QueryBudgetExceeded(Exception):
+    """Raised in strict mode when a request runs more queries than its view allows"""
+
+class QueryRecorder:
+    """
+    Counts the SQL queries (and time spent in them) while installed
+
+    Install with connection.execute_wrapper(recorder), or use record_queries()
+    to cover every configured database.
+    """
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+class record_queries:
+    """
+    Context manager recording queries on every database connection
+
+    Example:
+        with record_queries() as recorder:
+            ...
+        print(recorder.count, recorder.duration)
+    """
+    def __enter__(self) -> QueryRecorder:
+        self.recorder = QueryRecorder()
+        self.stack = ExitStack()
+        for connection in connections.all():
+            self.stack.enter_context(connection.execute_wrapper(self.recorder))
+        return self.recorder
+
+    def __exit__(self, *exc):
+        return self.stack.__exit__(*exc)
+
+def view_query_budget(view_class, method: str):
+    """
+    Look up a view's declared query budget for an HTTP method
+
+    Views declare `query_budget` as an int for every method, or a dict of
+    method -> int. Returns None when the view has no budget.
+    """
+    budget = getattr(view_class, 'query_budget', None)
+    if isinstance(budget, dict):
+        return budget.get(method)
+    return budget
+
+class QueryStatsRegistry:
+    """Per-endpoint query statistics for this server process"""
+    _lock = threading.Lock()
+    _stats = {}
+
+    @classmethod
+    def record(cls, endpoint: str, count: int, duration: float, over_budget: bool):
+        with cls._lock:
+            stats = cls._stats.setdefault(endpoint, {
+                'endpoint': endpoint,
+                'requests': 0,
+                'queries': 0,
+                'max_queries': 0,
+                'db_time_ms': 0.0,
+                'over_budget': 0,
+            })
+            stats['requests'] += 1
+            stats['queries'] += count
+            stats['max_queries'] = max(stats['max_queries'], count)
+            stats['db_time_ms'] += duration * 1000
+            stats['over_budget'] += int(over_budget)
+
+    @classmethod
+    def report(cls, limit: int = 20):
+        """
+        The endpoints with the most queries per request, worst first
+
+        Returns:
+            list: One dict per endpoint with request count, mean and max
+                  queries, mean DB time and how often it blew its budget
+        """
+        with cls._lock:
+            rows = [dict(stats) for stats in cls._stats.values()]
+        for row in rows:
+            row['mean_queries'] = row['queries'] / row['requests']
+            row['mean_db_time_ms'] = row.pop('db_time_ms') / row['requests']
+            del row['queries']
+        rows.sort(key=lambda row: (row['mean_queries'], row['max_queries']), reverse=True)
+        return rows[:limit]
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._stats.clear()
+
+class QueryBudgetMiddleware:
+    """
+    Measures the number of SQL queries and the DB time of every request
+
+    - Adds X-Query-Count and X-DB-Time-Ms headers when
+      settings.QUERY_BUDGET_HEADERS is on (it follows DEBUG by default)
+    - Logs a warning when a view runs more queries than its query_budget,
+      or raises QueryBudgetExceeded if settings.QUERY_BUDGET_STRICT is on
+    - Feeds QueryStatsRegistry for the worst endpoints report
+    - Leaves the numbers on response.query_stats for tests
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request._query_budget = None
+        with record_queries() as recorder:
+            response = self.get_response(request)
+        return self.finish(request, response, recorder)
+
+    async def __acall__(self, request):
+        request._query_budget = None
+        # The ORM work of an async request runs on that request's sync
+        # thread, whose connections aren't the event loop's: install the
+        # wrappers over there
+        recording = record_queries()
+        recorder = await sync_to_async(recording.__enter__)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(recording.__exit__)(None, None, None)
+        return self.finish(request, response, recorder)
+
+    def finish(self, request, response, recorder):
+        budget = request._query_budget
+        over_budget = budget is not None and recorder.count > budget
+        match = getattr(request, 'resolver_match', None)
+        endpoint = f'{request.method} /{match.route}' if match else f'{request.method} {request.path}'
+        QueryStatsRegistry.record(endpoint, recorder.count, recorder.duration, over_budget)
+
+        response.query_stats = {
+            'count': recorder.count,
+            'db_time_ms': recorder.duration * 1000,
+            'budget': budget,
+        }
+        if getattr(settings, 'QUERY_BUDGET_HEADERS', settings.DEBUG):
+            response['X-Query-Count'] = str(recorder.count)
+            response['X-DB-Time-Ms'] = f'{recorder.duration * 1000:.2f}'
+            if budget is not None:
+                response['X-Query-Budget'] = str(budget)
+
+        if over_budget:
+            message = f'{endpoint} ran {recorder.count} queries, over its budget of {budget}'
+            if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        if view_class is not None:
+            request._query_budget = view_query_budget(view_class, request.method)
+        return None
+
+class ReplicaRoutingMiddleware:
+    """
+    Scopes database routing (see core.routers) to each request
+
+    A request that writes to the primary sends back a cookie pinning its
+    client to the primary for settings.READ_YOUR_WRITES_SECONDS, so the
+    replica reads that follow can't miss the client's own changes while
+    replication catches up.
+    """
+    COOKIE = 'primary_until'
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = routers.begin(self.pinned(request))
+        try:
+            response = self.get_response(request)
+            wrote = routers.current_state().wrote
+        finally:
+            routers.end(token)
+        return self.finish(response, wrote)
+
+    async def __acall__(self, request):
+        token = routers.begin(self.pinned(request))
+        try:
+            response = await self.get_response(request)
+            wrote = routers.current_state().wrote
+        finally:
+            routers.end(token)
+        return self.finish(response, wrote)
+
+    def pinned(self, request) -> bool:
+        try:
+            return float(request.COOKIES.get(self.COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def finish(self, response, wrote: bool):
+        if wrote and getattr(settings, 'DATABASE_REPLICAS', []):
+            window = getattr(settings, 'READ_YOUR_WRITES_SECONDS', 5)
+            response.set_cookie(
+                self.COOKIE, f'{time.time() + window:.3f}',
+                max_age=window, httponly=True, samesite='Lax',
+            )
+        return response
@@ -132,7 +132,8 @@ class UserUpdateSerializer(serializers.Serializer):
         instance.display_name = validated_data.get('display_name', instance.display_name)
         instance.profile_picture = validated_data.get('profile_picture', instance.profile_picture)
 
-        # Save the instance
-        instance.save()
+        # Save only the profile fields, the instance may be a cached copy
+        # whose token fields are out of date (see core.tokens)
+        instance.save(update_fields=['display_name', 'profile_picture', 'updated_at'])
         
         return instance
\ No newline at end of file
@@ -0,0 +1,114 @@
+import datetime
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from core.models import User, Post, Like, Project, Comment
+from core.services import HotService, PostService
+from core.tokens import PrincipalCache, issue_token
+from .authentication import COOKIE
+from .middleware import record_queries
+
+def token_login(client, user):
+    """Log a test client in as user, with the token cookie SessionView sets"""
+    # Test databases hand out the same ids again after each rollback
+    PrincipalCache.evict(user.id)
+    client.cookies[COOKIE] = issue_token(user)
+
+class QueryBudgetTestMixin:
+    """
+    Test case helpers for keeping query counts in check
+
+    Mix into a TestCase that uses the Django test client. Requests go through
+    QueryBudgetMiddleware, which leaves its numbers on response.query_stats.
+    """
+    def assertWithinQueryBudget(self, response):
+        """Fail if the request ran more queries than its view's query_budget"""
+        stats = getattr(response, 'query_stats', None)
+        self.assertIsNotNone(stats, 'QueryBudgetMiddleware is not installed')
+        self.assertIsNotNone(stats['budget'], 'The view has no query_budget')
+        self.assertLessEqual(
+            stats['count'], stats['budget'],
+            f'{stats["count"]} queries, over the budget of {stats["budget"]}'
+        )
+
+    def assertMaxQueries(self, limit: int):
+        """
+        Context manager failing if the block runs more than `limit` queries
+
+        Unlike assertNumQueries it allows fewer, so it can guard a budget
+        without pinning the exact count.
+        """
+        return _MaxQueries(self, limit)
+
+class _MaxQueries:
+    def __init__(self, test_case, limit):
+        self.test_case = test_case
+        self.limit = limit
+
+    def __enter__(self):
+        self.context = record_queries()
+        self.recorder = self.context.__enter__()
+        return self.recorder
+
+    def __exit__(self, exc_type, exc, tb):
+        self.context.__exit__(exc_type, exc, tb)
+        if exc_type is None:
+            self.test_case.assertLessEqual(
+                self.recorder.count, self.limit,
+                f'{self.recorder.count} queries, over the limit of {self.limit}'
+            )
+
+@override_settings(ALLOWED_HOSTS=['testserver'], QUERY_BUDGET_STRICT=True)
+class APITestCase(QueryBudgetTestMixin, TestCase):
+    """
+    TestCase for the API endpoints, with query budgets enforced
+
+    Sets up self.user (the author) and self.fan, and self.client logged in
+    as whichever of them login_as names (None for logged out).
+    """
+    login_as = 'user'
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='author', password='x', display_name='Author')
+        self.fan = User.objects.create_user(username='fan', password='x', display_name='Fan')
+        self.client = APIClient()
+        if self.login_as:
+            token_login(self.client, getattr(self, self.login_as))
+
+    def add_post(self, title='Post', comments=0, age_days=0, **data):
+        """
+        A post by the author, created like the API creates them
+
+        Args:
+            comments: Number of comments to give it
+            age_days: How many days ago it was posted
+            data: More fields for PostService.create_a_post, e.g. project
+        """
+        post = PostService.create_a_post(self.user, {'title': title, 'text': 'hi', **data})
+        if comments:
+            Comment.objects.bulk_create(
+                Comment(user=self.user, post=post, text=f'Comment {i}') for i in range(comments)
+            )
+            Post.objects.filter(id=post.id).update(comment_count=comments)
+        if age_days:
+            Post.objects.filter(id=post.id).update(created_at=timezone.now() - datetime.timedelta(days=age_days))
+            HotService.refresh([post.id])
+        return post
+
+    def add_rows(self, count):
+        """
+        count projects led by the author and followed by the fan, each with
+        one post liked by both
+
+        Returns:
+            list: The new posts
+        """
+        posts = []
+        for i in range(count):
+            project = Project.objects.create(name=f'Project {i}', leader=self.user)
+            project.followers.add(self.fan)
+            post = self.add_post(f'Post {i}', project=project.id)
+            Like.objects.create(user=self.user, post=post)
+            Like.objects.create(user=self.fan, post=post)
+            posts.append(post)
+        return posts
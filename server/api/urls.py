@@ -1,16 +1,22 @@
 from django.urls import path
 from .views import *
+from .async_views import *
 urlpatterns = [
-    path('users', UserRegistrationView.as_view(), name='user-register'),
+    path('users', UserSearchView.as_view(), name='user-register'),
     path('users/me', CurrentUserView.as_view(), name='current-user'),
     path('sessions', SessionView.as_view(), name='sessions'),
-    path('posts', PostView.as_view(), name='posts'),
+    path('posts', FeedView.as_view(), name='posts'),
+    path('posts/batch', PostBatchView.as_view(), name='post-batch'),
     path('posts/<int:post_id>', PostIDView.as_view(), name='post-detail'),
     path('users/<int:user_id>', UserIDView.as_view(), name='user-detail'),
-    path('super',SuperView.as_view(), name='make edit super'),
+    path('super',ActivitySearchView.as_view(), name='make edit super'),
     path('super/<int:super_id>', SuperIDView.as_view(),name='super-detail'),
     path('likes',LikeView.as_view(),name='likes'),
+    path('likes/state', LikeStateView.as_view(), name='like-state'),
     path('comments',CommentView.as_view(),name='comments'),
+    path('tags', TagListView.as_view(), name='tags'),
+    path('cache/stats', CacheStatsView.as_view(), name='cache-stats'),
+    path('debug/queries', QueryReportView.as_view(), name='query-report'),
     path('users/<str:username>', UserUNameGet.as_view(), name='user-register'),
     path('likes/user/<str:username>', LikesUNameGet.as_view(), name='user-register'),
     path('posts/user/<str:username>', PostsUNameGet.as_view(), name='user-register'),
@@ -1,8 +1,11 @@
+from asgiref.sync import sync_to_async
 from rest_framework.views import exception_handler
 from rest_framework.exceptions import ValidationError
 from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import HttpResponse, StreamingHttpResponse
 from rest_framework.response import Response
 from typing import Any, Optional, Union
+from .renderers import dumps, iter_json, iter_ndjson
 
 def mistakes_were_made(
         exc: Exception,
@@ -62,6 +65,127 @@ def json_standard(
 
     return Response(response_data, status=status)
 
+def json_standard_page(
+        message: Union[str,list[str],None],
+        status: Union[int, None],
+        key: str,
+        rows: list,
+        next_cursor: Optional[str],
+        limit: int):
+    """
+    json_standard() for one page of a list
+
+    The rows go under data[key], next to the same pagination block the
+    feed sends: pass its next_cursor back as ?cursor= for the next page,
+    it is None on the last one.
+
+    Args:
+        message: Words of wisdom to share with the world
+        key: Name of the list in data, e.g. 'posts'
+        rows: The rows on this page
+        next_cursor: Cursor of the next page, None on the last page
+        limit: Most rows a page holds
+        status: HTTP status code
+    """
+    return json_standard(
+        message=message,
+        data={
+            key: rows,
+            'pagination': {
+                'next_cursor': next_cursor,
+                'limit': limit,
+            },
+        },
+        status=status
+    )
+
+class StandardJsonResponse(HttpResponse):
+    """
+    JSON response for plain Django (async) views, in the json_standard shape
+
+    Encoded like DRF responses (see api.renderers). Keeps the payload on
+    .data like a DRF Response, for the response cache and tests.
+    """
+    def __init__(self, data, status: int = 200):
+        super().__init__(dumps(data), status=status, content_type='application/json')
+        self.data = data
+
+def json_standard_response(
+        message: Union[str,list[str],None],
+        status: Union[int, None],
+        data: Union[dict,None] = None) -> StandardJsonResponse:
+    """
+    json_standard() for views that aren't DRF views, such as async views
+
+    Args:
+        message: Words of wisdom to share with the world
+        data: The precious payload that sparked joy
+        status: HTTP status code
+    """
+    response_data = {}
+
+    if message:
+        response_data['detail'] = message
+
+    if data:
+        response_data['data'] = data
+
+    return StandardJsonResponse(response_data, status=status)
+
+class StreamingResponse(StreamingHttpResponse):
+    """
+    StreamingHttpResponse that keeps streaming sync iterators under ASGI
+
+    Django reads a sync iterator into a list before sending it from an
+    async server. This pulls one chunk at a time instead, on the request's
+    sync thread, so iterators running queries stay on its connection.
+    """
+    async def __aiter__(self):
+        if self.is_async:
+            async for part in self.streaming_content:
+                yield part
+            return
+        parts = iter(self.streaming_content)
+        next_part = sync_to_async(next)
+        while (part := await next_part(parts, None)) is not None:
+            yield part
+
+def json_standard_stream(
+        message: Union[str,list[str],None],
+        status: Union[int, None],
+        data: Any = None) -> StreamingResponse:
+    """
+    json_standard(), but the body is streamed while it's encoded
+
+    For very large lists: pass them as iterators (a generator, or a
+    QuerySet.iterator()) and they are encoded a batch at a time instead of
+    being built whole in memory. Queries run by those iterators happen
+    after the view returns, so the query budget doesn't see them.
+
+    Args:
+        message: Words of wisdom to share with the world
+        data: The precious payload that sparked joy, iterators and all
+        status: HTTP status code
+    """
+    response_data = {}
+
+    if message:
+        response_data['detail'] = message
+
+    if data is not None:
+        response_data['data'] = data
+
+    return StreamingResponse(iter_json(response_data), status=status, content_type='application/json')
+
+def ndjson_stream(rows) -> StreamingResponse:
+    """
+    Stream rows as newline delimited JSON, one row per line
+
+    Pass an iterator (such as QuerySet.iterator()) to keep memory flat
+    however many rows there are.
+    """
+    return StreamingResponse(iter_ndjson(rows), content_type='application/x-ndjson')
+
 messages = {
     "successful_id": "successfully found resource by given id",
     "err404": "cannot find resource with the given id/ resource does not exist",
@@ -1,21 +1,34 @@
 from django.shortcuts import render
 from rest_framework import generics
 from rest_framework.views import APIView
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.settings import api_settings
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from .serializers import UserLoginSerializer, UserRegistrationSerializer, UserUpdateSerializer
 
-from core.services import UserService, SuperService, PostService
+from core.services import UserService, SuperService, PostService, HotService
+from core import hot
 from core.models import User, Super, Project, Event, Club, Like, Post, Comment
-from .utils import json_standard
-from django.db.models import Q
+from .utils import json_standard, json_standard_page, json_standard_stream, ndjson_stream
+from .renderers import NDJSONRenderer
+from .authentication import delete_token_cookie, set_token_cookie
+from .cache import CacheStats, cached_response
+from .middleware import QueryStatsRegistry
+from core.routers import use_replica
+from core.pagination import parse_limit
+from core.cache import USERS, bump_versions, post_key, super_key
+from django.db import transaction
+from django.db.models import Q, F
 
 class UserRegistrationView(generics.CreateAPIView):
     """
     API endpoint for user registration.
     Endpoint: POST /api/users/
+
+    User searches (GET /api/users) are served by the async UserSearchView.
     """
+    query_budget = {'POST': 10}
     serializer_class = UserRegistrationSerializer # Handles data validation and user creation
     permission_classes = [AllowAny] # Allows anyone to register (no authentication required)
 
@@ -35,31 +48,11 @@ class UserRegistrationView(generics.CreateAPIView):
         user = serializer.save() # Creates the user
         user_data = UserService.login_user(request, user) # Logs the user in and returns user data
 
-        return json_standard(
+        return set_token_cookie(json_standard(
             message="Registration successful",
             data=user_data,
             status=status.HTTP_201_CREATED
-        )
-        
-    def get(self, request, *args, **kwargs):
-        """
-        Handles a user search which returns the top 10 users based on the
-        search term (such as users with a similar name). Searches the username,
-        display_name, and email fields in a case insentitive way.
-        """
-        
-        search_term = request.query_params.get('search', '')
-        users = User.objects.filter(
-            Q(username__icontains=search_term) |
-            Q(display_name__icontains=search_term)
-        ).distinct()
-        users = users[:10]
-
-        return json_standard(
-            message='Search Results',
-            data={'users': [user.to_dict() for user in users]},
-            status=status.HTTP_200_OK,
-        )
+        ), user_data['token'])
     
 class SessionView(APIView):
     """
@@ -67,7 +60,11 @@ class SessionView(APIView):
 
     POST: Create a new session (login)
     DELETE: Terminate the session (logout)
+
+    Sessions are signed tokens (see core.tokens), returned in the response
+    for API clients and set as an HttpOnly cookie for the web client.
     """
+    query_budget = 8
 
     def get_permissions(self):
         """
@@ -88,20 +85,20 @@ class SessionView(APIView):
         user = serializer.validated_data['user']
         user_data = UserService.login_user(request, user)
 
-        return json_standard(
+        return set_token_cookie(json_standard(
             message="Login successful",
             data=user_data,
             status=status.HTTP_200_OK
-        )
+        ), user_data['token'])
 
     def delete(self, request, *args, **kwargs):
         """End the current session (logout)"""
         UserService.logout_user(request)
 
-        return json_standard(
+        return delete_token_cookie(json_standard(
             message="Logout successful",
             status=status.HTTP_200_OK
-        )
+        ))
 
 class CurrentUserView(APIView):
     """
@@ -110,6 +107,7 @@ class CurrentUserView(APIView):
     GET: Get the current user session
     PATCH: Update the current user
     """
+    query_budget = {'GET': 4, 'PATCH': 10}
     permission_classes = [IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
@@ -119,6 +117,7 @@ class CurrentUserView(APIView):
         """
         user = request.user
         return json_standard(
+            message=None,
             data={
                 'user': user.to_dict()
             },
@@ -134,6 +133,7 @@ class CurrentUserView(APIView):
         serializer = UserUpdateSerializer(user, data=request.data, partial=True)
         if serializer.is_valid():
             updated_user = serializer.save()  # Saves the changes to the user model
+            bump_versions(USERS)  # Names and pictures are shown on cached posts
             return json_standard(
                 message="User information updated successfully",
                 data={
@@ -150,47 +150,13 @@ class CurrentUserView(APIView):
     
 class PostView(APIView):
     """
-    API endpoint for retrieving/creating post(s).
-
-    GET: get multiple posts
-    Supports optional filtering parameters via query strings when searching.
-    Example: /api/posts/?type=project&tag=web&offset=10
-    
-    POST: create a post
+    API endpoint for creating a post.
     Endpoint: /api/posts (POST method)
 
+    GET /api/posts is served by the async FeedView, which hands POSTs here.
     """
+    query_budget = {'POST': 10}
 
-    def get_permissions(self):
-        """
-        Only GET requests do not require authentication.
-        """
-        if self.request.method == 'GET':
-            return [AllowAny()] # Allows anyone to register (no authentication required)
-        return [IsAuthenticated()] 
-    
-    def get(self, request):
-        """
-        Handle the get multiple posts process. It:
-        1. Interact with the PostService to get queried posts
-        2. Returns all the posts to the user
-
-        Raises:
-            ValidationError: If the registration data is invalid
-        """
-        posts_data = PostService.get_multiple_posts(request)
-
-        if posts_data:
-            return json_standard(
-                message="Get posts successful",
-                data=posts_data,
-                status=status.HTTP_200_OK
-            )
-        return json_standard(
-            message="No posts found",
-            status=status.HTTP_404_NOT_FOUND,
-        )
-    
     def post(self, request):
         user = request.user
         data = request.data
@@ -202,34 +168,33 @@ class PostView(APIView):
             status=status.HTTP_200_OK
         )
 
-class PostIDView(APIView):
-    permission_classes = [AllowAny]
+class PostBatchView(APIView):
+    """
+    API endpoint for creating many posts at once.
+    Endpoint: POST /api/posts/batch with {"posts": [{...}, ...]}
 
-    def get(self, request, **kwargs):
-        """
-        Retrieve a post by ID.
-        """
-        [post_id] = kwargs.values()
-        try:
-            post = Post.objects.get(id=post_id)
-            return json_standard(
-                message="Retrieved Post",
-                data={'post': post.to_dict()},
-                status=status.HTTP_200_OK
-            )
+    Each item takes the same fields as POST /api/posts. Valid items are
+    created together; the response lists a result per item, in order,
+    with either the created post or the item's errors.
+    """
+    query_budget = 12
 
-        except Post.DoesNotExist:
-            return json_standard(
-                message="Post not found",
-                status=status.HTTP_404_NOT_FOUND
-            )
-        
-        except ValueError:
+    def post(self, request):
+        if not isinstance(request.data, dict):
             return json_standard(
-                message="Invalid post ID",
+                message='Expected an object with a posts list',
                 status=status.HTTP_400_BAD_REQUEST
-            ) 
+            )
+        results = PostService.create_posts(request.user, request.data.get('posts'))
+        created = sum('post' in result for result in results)
+        return json_standard(
+            message=f'Created {created} of {len(results)} posts',
+            data={'results': results},
+            status=status.HTTP_200_OK if created else status.HTTP_400_BAD_REQUEST
+        )
+
 class UserIDView(APIView):
+    query_budget = 5
     permission_classes = [IsAuthenticated]  # Restrict to authenticated users
 
     def get(self, request, *args, **kwargs):
@@ -256,8 +221,10 @@ class UserIDView(APIView):
             )
 
 class SuperIDView(APIView):
+    query_budget = 8
     permission_classes = [IsAuthenticated]  # Restrict to authenticated users
 
+    @cached_response(lambda super_id: [super_key(super_id)])
     def get(self, request, *args, **kwargs):
         """
         Retrieve a user by their ID.
@@ -285,58 +252,15 @@ class SuperView(APIView):
     """
     Endpoint for making/editing a super object
     
-    GET: Search for super objects
     POST: Create a super object
     PATCH: Update/edit a super object
     
+    Searches (GET /api/super) are served by the async ActivitySearchView,
+    which hands POSTs and PATCHes here.
+    
     TODO: Validate post data
     """
-    
-    def get(self, request, *args, **kwargs):
-        """
-        Handles a user search which returns the top 10 users based on the
-        search term (such as users with a similar name). Searches the username,
-        display_name, and email fields in a case insentitive way.
-        """
-        search_term = request.query_params.get('search', '')
-        type = request.query_params.get('type', '')
-        
-        clubs = Club.objects.filter(
-
-                Q(name__icontains=search_term) |
-                Q(description__icontains=search_term) |
-                Q(tags__tag__icontains=search_term)
-            ).distinct()
-
-        events = Event.objects.filter(
-
-                    Q(name__icontains=search_term) |
-                    Q(description__icontains=search_term) |
-                    Q(tags__tag__icontains=search_term)
-                ).distinct()
-
-        projects = Project.objects.filter(
-                Q(name__icontains=search_term) |
-                Q(description__icontains=search_term) |
-                Q(tags__tag__icontains=search_term)
-            ).distinct()
-        
-        out = None
-        if type == 'project':
-            out = projects[:10]
-        elif type == 'event':
-            out = events[:10]
-        elif type == 'club':
-            out = clubs[:10]
-        else:
-            out = list(clubs[:10]) + list(projects[:10]) + list(events[:10])
-
-                
-        return json_standard(
-            message='Search Results',
-            data={("activities"): [super.to_dict() for super in out]},
-            status=status.HTTP_200_OK,
-        )
+    query_budget = {'POST': 14, 'PATCH': 14}
     
     def post(self, request):
         user = request.user
@@ -384,95 +308,203 @@ class SuperView(APIView):
             status=status.HTTP_200_OK
         )
 
-class UserUNameGet(APIView):
-    def get(self, request, **kwargs):
-        [username] = kwargs.values()
-        user = User.objects.filter(username=username).first()
-        return json_standard(
-            message='Successfully created Super',
-            data=user.to_dict() if user is not None else {},
-            status=status.HTTP_200_OK
-        )
-
 class LikeView(APIView):
+    """
+    Like or unlike a post
+    Endpoint: /api/likes
+
+    Both are idempotent: liking a liked post or unliking a post that isn't
+    liked succeeds without changing anything.
+    """
+    query_budget = {'POST': 6, 'DELETE': 8}
     def post(self, request):
-        data = request.data
-        user = request.user
-        post = Post.objects.get(id=data.get('post'))
-        Like.objects.create(post=post,user=user)
+        try:
+            added = PostService.like_post(request.user, request.data.get('post'))
+        except Post.DoesNotExist:
+            return json_standard(
+                message="Post not found",
+                status=status.HTTP_404_NOT_FOUND
+            )
         return json_standard(
-            message="Successfully liked post",
+            message="Successfully liked post" if added else "Post already liked",
+            data={'liked': True},
             status=status.HTTP_200_OK
         )
     
     def delete(self, request):
-        data = request.data
-        user = request.user
-        like = Like.objects.get(post__id=data.get('post'),user=user)
-        like.delete()
+        removed = PostService.unlike_post(request.user, request.data.get('post'))
         return json_standard(
-            message="Successfully liked post",
+            message="Successfully unliked post" if removed else "Post wasn't liked",
+            data={'liked': False},
+            status=status.HTTP_200_OK
+        )
+
+class LikeStateView(APIView):
+    """
+    Which of a list of posts the user has liked
+    Endpoint: POST /api/likes/state {"posts": [1, 2, 3]}
+    """
+    query_budget = 2
+    @use_replica
+    def post(self, request):
+        liked = PostService.liked_post_ids(request.user, request.data.get('posts', []))
+        return json_standard(
+            message="Liked posts",
+            data={'liked': liked},
             status=status.HTTP_200_OK
         )
 
 class CommentView(APIView):
+    query_budget = {'GET': 3, 'POST': 8}
+    PAGE_SIZE = 50
     def post(self, request):
         data = request.data
         user = request.user
         post = Post.objects.get(id=data.get('post'))
-        Comment.objects.create(post=post, text=data.get('text'),user=user)
+        with transaction.atomic():
+            comment = Comment.objects.create(post=post, text=data.get('text'),user=user)
+            Post.objects.filter(id=post.id).update(comment_count=F('comment_count') + 1)
+            HotService.add_event(post.id, hot.COMMENT_WEIGHT, comment.created_at)
+            bump_versions(post_key(post.id))
         return json_standard(
             message="Successfully liked post",
             status=status.HTTP_200_OK
         )
     def get(self, request):
+        """
+        A page of a post's comments, oldest first: ?id=<post id>, with
+        ?limit= and ?cursor= (from data.pagination.next_cursor) like the
+        user listings
+        """
         id = request.query_params.get("id", "")
-        post = Post.objects.get(id=id)
-        comments = Comment.objects.filter(post=post)
-        return json_standard(
+        limit = parse_limit(request.query_params.get('limit'), default=self.PAGE_SIZE)
+        comments, next_cursor = PostService.comments_page(
+            id,
+            request.query_params.get('cursor', ''),
+            limit,
+        )
+        return json_standard_page(
             message="Successfully liked post",
-            data=[comment.to_dict() for comment in comments],
+            key='comments',
+            rows=comments,
+            next_cursor=next_cursor,
+            limit=limit,
             status=status.HTTP_200_OK
         )
 
-class LikesUNameGet(APIView):
+class UserExportView(APIView):
+    """
+    Base for the views listing everything a user has of something
+
+    Lists come a page at a time: ?limit= rows (PAGE_SIZE by default) under
+    data[key], with the next page's cursor in data.pagination.next_cursor,
+    to pass back as ?cursor=. Exports stream the whole list instead: ?stream=true streams
+    it as one JSON document, and ?format=ndjson as one JSON object per
+    line. Both keep memory flat, the rows are read from the database in
+    chunks as the body is sent.
+    """
+    PAGE_SIZE = 50
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
+
+    def list_response(self, request, message: str, key: str, export, page):
+        """
+        Args:
+            key: Name of the list in a page's data
+            export: Returns an iterator of every row, for the streamed exports
+            page: Called with (cursor, limit), returns (rows, next cursor)
+        """
+        if request.accepted_renderer.format == 'ndjson':
+            return ndjson_stream(export())
+        if request.query_params.get('stream', '') == 'true':
+            return json_standard_stream(
+                message=message,
+                data=export(),
+                status=status.HTTP_200_OK
+            )
+        limit = parse_limit(request.query_params.get('limit'), default=self.PAGE_SIZE)
+        rows, next_cursor = page(request.query_params.get('cursor', ''), limit)
+        return json_standard_page(
+            message=message,
+            key=key,
+            rows=rows,
+            next_cursor=next_cursor,
+            limit=limit,
+            status=status.HTTP_200_OK
+        )
+
+class LikesUNameGet(UserExportView):
+    """
+    The posts a user liked
+    Endpoint: GET /api/likes/user/<username>
+    """
+    query_budget = 3
+    @use_replica
     def get(self, request, **kwargs):
         [username] = kwargs.values()
-        likes = Like.objects.filter(user__username=username)
-        posts = []
-        for like in likes:
-            posts.append(like.post)
-        return json_standard(
-            message='Likes',
-            data=[user.to_dict() for user in posts],
-            status=status.HTTP_200_OK
+        return self.list_response(
+            request, 'Likes', 'posts',
+            export=lambda: PostService.liked_posts(username),
+            page=lambda cursor, limit: PostService.liked_posts_page(username, cursor, limit),
         )
 
-class PostsUNameGet(APIView):
+class PostsUNameGet(UserExportView):
+    """
+    The posts a user wrote
+    Endpoint: GET /api/posts/user/<username>
+
+    Pages take ?comments=N to inline each post's latest N comments.
+    """
+    query_budget = 4
+    @use_replica
     def get(self, request, **kwargs):
         [username] = kwargs.values()
-        results = Post.objects.filter(user__username=username)
-        posts = []
-        for post in results:
-            post_dict = post.to_dict()
-            # Check if the request has a user and if that user is authenticated
-            if request.user.is_authenticated:
-                # Add the "liked" field based on whether a Like exists for this post and user
-                post_dict["liked"] = Like.objects.filter(post=post, user=request.user).exists()
-            posts.append(post_dict)
-        return json_standard(
-            message='Successfully created Super',
-            data=posts,
-            status=status.HTTP_200_OK
+        previews = PostService.preview_size(request.query_params)
+        return self.list_response(
+            request, 'Successfully created Super', 'posts',
+            export=lambda: PostService.user_posts(username, request.user),
+            page=lambda cursor, limit: PostService.user_posts_page(username, request.user, cursor, limit, previews),
         )
 
-class SupersUNameGet(APIView):
+class SupersUNameGet(UserExportView):
+    """
+    The activities a user leads
+    Endpoint: GET /api/super/user/<username>
+    """
+    query_budget = 6
+    @use_replica
     def get(self, request, **kwargs):
         [username] = kwargs.values()
-        projects = Super.objects.filter(leader__username=username)
-        
+        return self.list_response(
+            request, 'Successfully created Super', 'activities',
+            export=lambda: SuperService.led_supers(username),
+            page=lambda cursor, limit: SuperService.led_supers_page(username, cursor, limit),
+        )
+
+class CacheStatsView(APIView):
+    """
+    Hit/miss counters for the response cache in this server process
+    Endpoint: GET /api/cache/stats (staff only)
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
         return json_standard(
-            message='Successfully created Super',
-            data=[user.to_dict() for user in projects],
+            message='Cache stats',
+            data=CacheStats.to_dict(),
+            status=status.HTTP_200_OK
+        )
+
+class QueryReportView(APIView):
+    """
+    The endpoints with the most SQL queries per request in this server process
+    Endpoint: GET /api/debug/queries?limit=20 (staff only)
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        limit = request.query_params.get('limit', '20')
+        return json_standard(
+            message='Query report',
+            data=QueryStatsRegistry.report(int(limit) if limit.isdigit() else 20),
             status=status.HTTP_200_OK
-        )
\ No newline at end of file
+        )
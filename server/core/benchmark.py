@@ -0,0 +1,594 @@
+# Synthetic dataset generator and endpoint benchmark runner
+#
+# generate_dataset() fills the database with a deterministic, production
+# shaped dataset whose size follows a scale factor, and run_benchmark()
+# drives the real API routes against it in-process, reporting latency
+# percentiles, queries per request and throughput per endpoint.
+import datetime
+import json
+import random
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection, connections, transaction
+from django.db.models import Count
+from django.test import Client
+from django.utils import timezone
+from .models import (
+    User, Super, Project, Event, Club, Tag, Post, Like, Comment, TimelineEntry,
+)
+from .search import rebuild_user_index
+from .services import HotService, TagService, TimelineService
+
+# Row counts at scale 1.0; every other scale is a linear fraction of these
+SCALE_ONE = {
+    'users': 100_000,
+    'supers': 5_000,
+    'posts': 1_000_000,
+    'likes': 10_000_000,
+    'comments': 2_000_000,
+}
+# Smallest sizes that still exercise every endpoint
+MINIMUM = {
+    'users': 10,
+    'supers': 3,
+    'posts': 10,
+    'likes': 0,
+    'comments': 0,
+}
+# Average number of Supers each user follows
+FOLLOWS_PER_USER = 5
+# Share of posts attached to a Super
+POSTS_IN_SUPERS = 0.7
+# Posts are spread over this many days before the time of generation, so
+# time-decayed rankings like ?order=hot see a realistic mix of ages
+WINDOW_DAYS = 30
+# Zipf exponents: higher means more skew towards the most popular items
+FOLLOWER_SKEW = 1.0
+AUTHOR_SKEW = 1.0
+POPULARITY_SKEW = 0.9
+
+BATCH_SIZE = 5000
+PASSWORD = 'benchmark'
+
+WORDS = [
+    'robot', 'garden', 'music', 'chess', 'hackathon', 'python', 'design', 'film',
+    'climbing', 'solar', 'rocket', 'poetry', 'data', 'startup', 'volunteer', 'art',
+    'coffee', 'research', 'game', 'hiking', 'photo', 'theatre', 'soccer', 'cloud',
+    'maker', 'kitchen', 'language', 'history', 'drone', 'band', 'yoga', 'study',
+]
+FIRST_NAMES = [
+    'Alex', 'Sam', 'Jordan', 'Taylor', 'Casey', 'Riley', 'Morgan', 'Jamie',
+    'Avery', 'Quinn', 'Rowan', 'Parker', 'Skyler', 'Drew', 'Reese', 'Emerson',
+]
+LAST_NAMES = [
+    'Garcia', 'Smith', 'Nguyen', 'Johnson', 'Lee', 'Martinez', 'Brown', 'Patel',
+    'Kim', 'Lopez', 'Wilson', 'Chen', 'Davis', 'Singh', 'Moore', 'Clark',
+]
+
+def dataset_size(scale: float) -> Dict[str, int]:
+    """
+    Row counts for a scale factor
+
+    Args:
+        scale: 1.0 is the full production sized dataset, 0.01 is 1% of it
+
+    Returns:
+        dict: users, supers, posts, likes and comments to create
+    """
+    return {
+        name: max(MINIMUM[name], round(count * scale))
+        for name, count in SCALE_ONE.items()
+    }
+
+def power_law_counts(rng: random.Random, n: int, total: int, exponent: float, cap: int) -> List[int]:
+    """
+    Split `total` over n items with Zipf weights 1 / rank ** exponent
+
+    Ranks are shuffled, so the popular items are spread through the table
+    rather than all being the oldest rows. Counts are capped (e.g. a post
+    can't be liked by more users than exist), so the sum can fall short of
+    total for very skewed settings.
+    """
+    weights = [1 / rank ** exponent for rank in range(1, n + 1)]
+    factor = total / sum(weights)
+    counts = []
+    for weight in weights:
+        expected = weight * factor
+        count = int(expected)
+        # Round randomly so small expectations still add up to the total
+        if rng.random() < expected - count:
+            count += 1
+        counts.append(min(count, cap))
+    rng.shuffle(counts)
+    return counts
+
+def cumulative(weights: List[float]) -> List[float]:
+    """Cumulative weights for random.choices(cum_weights=...)"""
+    total = 0
+    out = []
+    for weight in weights:
+        total += weight
+        out.append(total)
+    return out
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+def reset_dataset():
+    """Delete everything the generator creates, keeping superusers"""
+    with transaction.atomic():
+        TimelineEntry.objects.all().delete()
+        Comment.objects.all().delete()
+        Like.objects.all().delete()
+        Post.objects.all().delete()
+        Super.objects.all().delete()
+        Tag.objects.all().delete()
+        User.objects.filter(is_superuser=False).delete()
+
+def generate_dataset(
+        scale: float,
+        seed: int = 0,
+        timelines: bool = True,
+        days: float = WINDOW_DAYS,
+        log: Callable[[str], None] = lambda message: None) -> Dict[str, int]:
+    """
+    Fill the database with a synthetic dataset
+
+    The same scale and seed always produce the same rows (on an empty
+    database). Follower, author and like/comment distributions follow
+    power laws, so a handful of Supers, authors and posts get most of the
+    activity, like in production. Denormalized data (counters, timelines,
+    search indexes) is filled in as the API would have. Post times are
+    spread over the `days` before now, rising with the post id, and every
+    comment comes after its post.
+
+    Args:
+        scale: Size relative to SCALE_ONE
+        seed: Random seed
+        timelines: Also materialize the following timelines (the largest
+                   table at full scale)
+        days: Width of the window post and comment times are spread over
+        log: Called with progress messages
+
+    Returns:
+        dict: Number of rows created per table
+    """
+    rng = random.Random(seed)
+    size = dataset_size(scale)
+    now = timezone.now()
+    window = datetime.timedelta(days=days).total_seconds()
+    created = {}
+    started = time.perf_counter()
+
+    def done(name, count):
+        created[name] = count
+        log(f'{name}: {count} rows ({time.perf_counter() - started:.1f}s)')
+
+    # Users, all sharing one password hash (hashing is deliberately slow)
+    password = make_password(PASSWORD)
+    user_ids = []
+    for start in range(0, size['users'], BATCH_SIZE):
+        users = [
+            User(
+                username=f'bench{i:07d}',
+                display_name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                password=password,
+            )
+            for i in range(start, min(start + BATCH_SIZE, size['users']))
+        ]
+        user_ids += [user.id for user in User.objects.bulk_create(users)]
+    done('users', len(user_ids))
+    rebuild_user_index(batch_size=BATCH_SIZE)
+
+    tags = Tag.objects.bulk_create([Tag(tag=word) for word in WORDS])
+    done('tags', len(tags))
+
+    # Supers: multi-table inheritance rules out bulk_create, but there are
+    # few enough of them to insert one by one
+    follower_counts = power_law_counts(
+        rng, size['supers'], size['users'] * FOLLOWS_PER_USER, FOLLOWER_SKEW, size['users'])
+    supers = []
+    tag_rows = []
+    with transaction.atomic():
+        first_day = datetime.date(2025, 1, 1)
+        for i in range(size['supers']):
+            model = (Project, Club, Event)[i % 3] if i < 3 else rng.choices(
+                (Project, Club, Event), weights=(6, 2.5, 1.5))[0]
+            fields = {
+                'name': f'{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {i}',
+                'description': _sentence(rng, 12),
+                'leader_id': rng.choice(user_ids),
+                'follower_count': follower_counts[i],
+            }
+            if model is Event:
+                start = first_day + datetime.timedelta(days=rng.randrange(365))
+                fields.update(start_time=start, end_time=start, location=rng.choice(WORDS).title() + ' Hall')
+            instance = model.objects.create(**fields)
+            supers.append(instance)
+            tag_rows += [
+                Super.tags.through(super_id=instance.id, tag_id=tag.id)
+                for tag in rng.sample(tags, rng.randint(1, 3))
+            ]
+        Super.tags.through.objects.bulk_create(tag_rows, batch_size=BATCH_SIZE)
+    done('supers', len(supers))
+
+    follows = []
+    for instance, count in zip(supers, follower_counts):
+        follows += [
+            Super.followers.through(super_id=instance.id, user_id=user_ids[index])
+            for index in rng.sample(range(len(user_ids)), count)
+        ]
+    Super.followers.through.objects.bulk_create(follows, batch_size=BATCH_SIZE)
+    done('follows', len(follows))
+    del follows
+
+    # Posts: prolific authors and popular Supers get most of them. Likes and
+    # comments share one popularity ranking, so viral posts get both.
+    author_weights = cumulative([1 / rank ** AUTHOR_SKEW for rank in range(1, len(user_ids) + 1)])
+    authors = user_ids[:]
+    rng.shuffle(authors)
+    super_weights = cumulative([count + 1 for count in follower_counts])
+    like_counts = power_law_counts(rng, size['posts'], size['likes'], POPULARITY_SKEW, len(user_ids))
+    comments_per_like = size['comments'] / max(size['likes'], 1)
+    comment_counts = [int(count * comments_per_like + rng.random()) for count in like_counts]
+    # Seconds before now, oldest first so ids and times rise together
+    post_ages = sorted((rng.random() * window for _ in range(size['posts'])), reverse=True)
+    post_ids = []
+    for start in range(0, size['posts'], BATCH_SIZE):
+        posts = []
+        for i in range(start, min(start + BATCH_SIZE, size['posts'])):
+            post = Post(
+                user_id=rng.choices(authors, cum_weights=author_weights)[0],
+                title=_sentence(rng, 4).capitalize(),
+                text=_sentence(rng, rng.randint(5, 40)),
+                like_count=like_counts[i],
+                comment_count=comment_counts[i],
+                created_at=now - datetime.timedelta(seconds=post_ages[i]),
+            )
+            if rng.random() < POSTS_IN_SUPERS:
+                instance = rng.choices(supers, cum_weights=super_weights)[0]
+                setattr(post, instance.super_type, instance)
+            posts.append(post)
+        post_ids += [post.id for post in Post.objects.bulk_create(posts)]
+    done('posts', len(post_ids))
+
+    post_tags = [
+        Post.tag.through(post_id=post_id, tag_id=rng.choice(tags).id)
+        for post_id in post_ids if rng.random() < 0.3
+    ]
+    Post.tag.through.objects.bulk_create(post_tags, batch_size=BATCH_SIZE)
+    done('post tags', len(post_tags))
+    # Bulk inserts skip the m2m_changed handler behind the tag counters
+    TagService.recount(tag.id for tag in tags)
+
+    likes = 0
+    comments = 0
+    like_rows = []
+    comment_rows = []
+    for post_id, like_count, comment_count, age in zip(post_ids, like_counts, comment_counts, post_ages):
+        like_rows += [
+            Like(post_id=post_id, user_id=user_ids[index])
+            for index in rng.sample(range(len(user_ids)), like_count)
+        ]
+        comment_rows += [
+            Comment(
+                post_id=post_id, user_id=rng.choice(user_ids), text=_sentence(rng, rng.randint(2, 12)),
+                created_at=now - datetime.timedelta(seconds=age * rng.random()),
+            )
+            for _ in range(comment_count)
+        ]
+        if len(like_rows) >= BATCH_SIZE:
+            Like.objects.bulk_create(like_rows)
+            likes += len(like_rows)
+            like_rows = []
+        if len(comment_rows) >= BATCH_SIZE:
+            Comment.objects.bulk_create(comment_rows)
+            comments += len(comment_rows)
+            comment_rows = []
+    Like.objects.bulk_create(like_rows, batch_size=BATCH_SIZE)
+    Comment.objects.bulk_create(comment_rows, batch_size=BATCH_SIZE)
+    done('likes', likes + len(like_rows))
+    done('comments', comments + len(comment_rows))
+
+    done('hot scores', HotService.recompute(batch_size=BATCH_SIZE))
+    if timelines:
+        done('timeline entries', materialize_timelines())
+    return created
+
+def materialize_timelines() -> int:
+    """
+    Copy every post of a pushed Super into its followers' timelines
+
+    Equivalent to TimelineService.fan_out() for every existing post, done
+    as one INSERT ... SELECT in the database. Generated posts belong to at
+    most one Super, so no (user, post) pair comes up twice.
+
+    Returns:
+        int: Number of timeline entries created
+    """
+    timeline = TimelineEntry._meta.db_table
+    post = Post._meta.db_table
+    follower = Super.followers.through._meta.db_table
+    super_table = Super._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            INSERT INTO {timeline} (user_id, post_id)
+            SELECT f.user_id, p.id
+            FROM {post} p
+            JOIN {follower} f
+              ON f.super_id = COALESCE(p.project_id, p.event_id, p.club_id, p.misc_id)
+            JOIN {super_table} s ON s.id = f.super_id
+            WHERE s.follower_count <= %s
+        """, [TimelineService.FANOUT_LIMIT])
+        return cursor.rowcount
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+# name -> (log in first, URL built from a sample of the dataset)
+SCENARIOS = {
+    'feed': (False, lambda s: '/api/posts'),
+    'feed_logged_in': (True, lambda s: '/api/posts'),
+    'feed_following': (True, lambda s: '/api/posts?feed=following'),
+    'feed_hot': (True, lambda s: '/api/posts?order=hot'),
+    'tags': (False, lambda s: '/api/tags'),
+    'post_search': (False, lambda s: f'/api/posts?search={s.word()}'),
+    'post_detail': (False, lambda s: f'/api/posts/{s.post_id()}'),
+    'comments': (True, lambda s: f'/api/comments?id={s.post_id()}'),
+    'activity_search': (True, lambda s: f'/api/super?search={s.word()}'),
+    'activity_detail': (True, lambda s: f'/api/super/{s.super_id()}'),
+    'user_search': (True, lambda s: f'/api/users?search={s.username()[:7]}'),
+    'user_profile': (True, lambda s: f'/api/users/{s.username()}'),
+    'user_posts': (True, lambda s: f'/api/posts/user/{s.username()}'),
+    'user_likes': (True, lambda s: f'/api/likes/user/{s.username()}'),
+    'user_supers': (True, lambda s: f'/api/super/user/{s.username()}'),
+}
+
+class Sampler:
+    """Deterministic random picks of existing rows for benchmark URLs"""
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.post_ids = list(Post.objects.order_by('id').values_list('id', flat=True))
+        self.super_ids = list(Super.objects.order_by('id').values_list('id', flat=True))
+        self.usernames = list(User.objects.order_by('id').values_list('username', flat=True))
+
+    def post_id(self):
+        return self.rng.choice(self.post_ids)
+
+    def super_id(self):
+        return self.rng.choice(self.super_ids)
+
+    def username(self):
+        return self.rng.choice(self.usernames)
+
+    def word(self):
+        return self.rng.choice(WORDS)
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmark(
+        requests: int = 100,
+        warmup: int = 5,
+        seed: int = 0,
+        cold: bool = False,
+        concurrency: int = 1,
+        scenarios: Optional[List[str]] = None,
+        log: Callable[[str], None] = lambda message: None) -> dict:
+    """
+    Drive the API routes in-process and measure each endpoint
+
+    Requests go through the full middleware stack and URL routing with the
+    Django test client, so latency includes everything but the network.
+    The measured requests of a scenario are shared out between
+    `concurrency` clients, each in its own thread, and throughput is the
+    number of requests over the wall-clock time they took together. Logged
+    in scenarios run as the user following the most Supers, which makes
+    their following feed the most expensive.
+
+    Args:
+        requests: Measured requests per scenario
+        warmup: Unmeasured requests per scenario, to fill caches
+        seed: Random seed for picking URLs
+        cold: Clear the cache before every request, to measure misses
+        concurrency: Clients sending requests at the same time; with 1 the
+                     requests run one at a time in the calling thread
+        scenarios: Names from SCENARIOS to run (default: all)
+        log: Called with one summary line per scenario
+
+    Returns:
+        dict: 'meta' describing the run and 'endpoints' with the stats for
+              each scenario
+    """
+    sampler = Sampler(seed)
+    if not sampler.post_ids:
+        raise ValueError('The database is empty, run generate_benchmark_data first')
+    viewer = User.objects.filter(is_superuser=False).annotate(
+        following=Count('super_users')).order_by('-following', 'id').first()
+    concurrency = max(1, min(concurrency, requests))
+
+    results = {}
+    for name in scenarios or SCENARIOS:
+        needs_login, build_url = SCENARIOS[name]
+        user = viewer if needs_login else None
+        _measure(_client(user), [build_url(sampler) for _ in range(warmup)], cold)
+        urls = [build_url(sampler) for _ in range(requests)]
+
+        start = time.perf_counter()
+        if concurrency == 1:
+            samples = _measure(_client(user), urls, cold)
+        else:
+            with ThreadPoolExecutor(concurrency) as pool:
+                parts = pool.map(
+                    lambda part: _measure_in_thread(user, part, cold),
+                    [urls[i::concurrency] for i in range(concurrency)],
+                )
+                samples = [sample for part in parts for sample in part]
+        wall_seconds = time.perf_counter() - start
+
+        latencies = sorted(latency for latency, _, _ in samples)
+        queries = [count for _, count, _ in samples]
+        results[name] = {
+            'requests': requests,
+            'errors': sum(error for _, _, error in samples),
+            'p50_ms': percentile(latencies, 50),
+            'p95_ms': percentile(latencies, 95),
+            'p99_ms': percentile(latencies, 99),
+            'mean_queries': sum(queries) / len(queries) if queries else None,
+            'max_queries': max(queries, default=None),
+            'throughput_rps': requests / wall_seconds if wall_seconds else None,
+        }
+        stats = results[name]
+        log(
+            f'{name:<16} p50 {stats["p50_ms"]:8.2f}ms  p95 {stats["p95_ms"]:8.2f}ms  '
+            f'p99 {stats["p99_ms"]:8.2f}ms  {stats["mean_queries"]:6.1f} queries  '
+            f'{stats["throughput_rps"]:8.1f} req/s'
+        )
+
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'date': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'rows': {
+                'users': len(sampler.usernames),
+                'supers': len(sampler.super_ids),
+                'posts': len(sampler.post_ids),
+                'likes': Like.objects.count(),
+                'comments': Comment.objects.count(),
+            },
+            'requests': requests,
+            'warmup': warmup,
+            'seed': seed,
+            'cold': cold,
+            'concurrency': concurrency,
+        },
+        'endpoints': results,
+    }
+
+def _client(user: Optional[User] = None) -> Client:
+    from api.testing import token_login
+    client = Client(SERVER_NAME='localhost')
+    if user is not None:
+        token_login(client, user)
+    return client
+
+def _measure(client: Client, urls: List[str], cold: bool) -> List[tuple]:
+    # (latency in ms, queries, whether it failed) for each url, one at a time
+    from api.middleware import record_queries
+    samples = []
+    for url in urls:
+        if cold:
+            cache.clear()
+        with record_queries() as recorder:
+            start = time.perf_counter()
+            response = client.get(url)
+            elapsed = time.perf_counter() - start
+        samples.append((elapsed * 1000, recorder.count, response.status_code >= 500))
+    return samples
+
+def _measure_in_thread(user: Optional[User], urls: List[str], cold: bool) -> List[tuple]:
+    # A worker thread opens its own database connections, close them after
+    try:
+        return _measure(_client(user), urls, cold)
+    finally:
+        connections.close_all()
+
+def compare_results(old: dict, new: dict) -> List[str]:
+    """
+    Describe how each endpoint changed between two run_benchmark() results
+
+    A stat missing from either run (e.g. no successful samples) shows as
+    n/a, with no percentage.
+
+    Returns:
+        list: One line per endpoint present in both runs
+    """
+    lines = []
+    for name, stats in new['endpoints'].items():
+        before = old['endpoints'].get(name)
+        if before is None:
+            continue
+        changes = []
+        for field in ('p50_ms', 'p95_ms', 'p99_ms', 'mean_queries'):
+            was, now = before.get(field), stats.get(field)
+            line = f'{field} {_stat(was)} -> {_stat(now)}'
+            if was and now is not None:
+                line += f' ({(now - was) / was * 100:+.0f}%)'
+            changes.append(line)
+        lines.append(f'{name:<16} ' + '  '.join(changes))
+    return lines
+
+def _stat(value: Optional[float]) -> str:
+    return 'n/a' if value is None else f'{value:.1f}'
+
+def render_benchmark(posts: int = 1000, repeat: int = 20, log: Callable[[str], None] = print) -> Dict[str, dict]:
+    """
+    Time encoding a feed page of `posts` posts, per JSON renderer
+
+    Compares DRF's stock JSONRenderer with api.renderers.FastJSONRenderer,
+    both with orjson and on its stdlib fallback, and with the streaming
+    encoder. The posts are built in memory, the database isn't involved.
+
+    Returns:
+        dict: Renderer name -> p50 and best time in ms, and body size
+    """
+    from unittest import mock
+    from rest_framework.renderers import JSONRenderer
+    from api import renderers
+
+    user = User(id=1, username='author', display_name='Author Name')
+    project = Project(id=1, name='Robots')
+    rows = [
+        Post(id=i, user=user, project=project, title=f'Post {i}', text=' '.join(WORDS), like_count=i).to_dict()
+        for i in range(posts)
+    ]
+    payload = {
+        'detail': 'Get posts successful',
+        'data': {'posts': rows, 'pagination': {'next_cursor': None, 'limit': posts}},
+    }
+    streamed = lambda: {**payload, 'data': {**payload['data'], 'posts': iter(rows)}}
+
+    candidates = {
+        'drf': lambda: JSONRenderer().render(payload),
+        'fast': lambda: renderers.FastJSONRenderer().render(payload),
+        'fast_stdlib': lambda: renderers.FastJSONRenderer().render(payload),
+        'stream': lambda: b''.join(renderers.iter_json(streamed())),
+    }
+    results = {}
+    for name, render in candidates.items():
+        if name == 'fast' and renderers.orjson is None:
+            continue
+        with mock.patch.object(renderers, 'orjson', None) if name == 'fast_stdlib' else nullcontext():
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                body = render()
+                timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        results[name] = {'p50_ms': percentile(timings, 50), 'min_ms': timings[0], 'bytes': len(body)}
+        log(f'{name:<12} p50 {results[name]["p50_ms"]:8.2f}ms  min {timings[0]:8.2f}ms  {len(body):>9} bytes')
+    return results
+
+def save_results(results: dict, path: str):
+    Path(path).write_text(json.dumps(results, indent=2))
+
+def load_results(path: str) -> dict:
+    return json.loads(Path(path).read_text())
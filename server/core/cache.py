@@ -0,0 +1,88 @@
+# Version keys for cached reads
+#
+# Every cached response is stored under the current version of each entity
+# it was built from. Writes bump those versions instead of deleting entries,
+# so stale entries simply stop being looked up and age out of the LRU.
+import time
+from typing import Dict, Iterable
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_PREFIX = 'version:'
+
+# Which posts are in the feed, bumped when posts are added. Likes and
+# comments only bump the post's own key: cached feed pages record the
+# version of every post on them and are retired when one of those changes.
+FEED = 'feed'
+# Activity names shown on posts
+SUPERS = 'supers'
+# Author names and pictures shown on posts
+USERS = 'users'
+# Bumped along with every other key, so a reader can tell whether any write
+# landed while it was building a response (see api.cache.cached_response)
+WRITES = 'writes'
+
+def post_key(post_id) -> str:
+    """Version key for a single post"""
+    return f'post:{post_id}'
+
+def super_key(super_id) -> str:
+    """Version key for a single Super"""
+    return f'super:{super_id}'
+
+def _fresh_version() -> int:
+    # Versions start from the clock rather than 1, so a version key that was
+    # evicted and recreated can never collide with one from before
+    return time.time_ns()
+
+def get_versions(keys: Iterable[str]) -> Dict[str, int]:
+    """
+    Look up the current version of each key, creating any that are missing
+
+    Args:
+        keys: Version keys, e.g. [FEED, post_key(3)]
+
+    Returns:
+        dict: key -> version
+    """
+    keys = list(keys)
+    found = cache.get_many([VERSION_PREFIX + key for key in keys])
+    versions = {}
+    for key in keys:
+        version = found.get(VERSION_PREFIX + key)
+        if version is None:
+            version = _fresh_version()
+            if not cache.add(VERSION_PREFIX + key, version, timeout=None):
+                version = cache.get(VERSION_PREFIX + key, version)
+        versions[key] = version
+    return versions
+
+async def aget_versions(keys: Iterable[str]) -> Dict[str, int]:
+    """Async version of get_versions()"""
+    keys = list(keys)
+    found = await cache.aget_many([VERSION_PREFIX + key for key in keys])
+    versions = {}
+    for key in keys:
+        version = found.get(VERSION_PREFIX + key)
+        if version is None:
+            version = _fresh_version()
+            if not await cache.aadd(VERSION_PREFIX + key, version, timeout=None):
+                version = await cache.aget(VERSION_PREFIX + key, version)
+        versions[key] = version
+    return versions
+
+def _bump(keys):
+    for key in (*keys, WRITES):
+        try:
+            cache.incr(VERSION_PREFIX + key)
+        except ValueError:
+            cache.set(VERSION_PREFIX + key, _fresh_version(), timeout=None)
+
+def bump_versions(*keys: str):
+    """
+    Invalidate everything cached under the given version keys
+
+    Runs once the surrounding transaction commits, so a concurrent reader
+    can't cache pre-commit data under the new version.
+    """
+    transaction.on_commit(lambda: _bump(keys))
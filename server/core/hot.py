@@ -0,0 +1,53 @@
+# "Hot" ranking scores for posts
+#
+# A post is as hot as the sum of what happened to it: being posted, every
+# like and every comment, each weighted and worth half as much for every
+# HALF_LIFE_DAYS since it happened. Decaying from "now" would change every
+# score all the time, so events are instead measured from a fixed EPOCH and
+# grow with time:
+#
+#     score = ln(sum(weight * 2 ** (days since EPOCH / HALF_LIFE_DAYS)))
+#
+# Taking out 2 ** (days until now / HALF_LIFE_DAYS), the same factor for
+# every post, gives back the decayed sum, so ordering by score is ordering
+# by hotness at any moment. A score only changes when something happens to
+# its post, a new event is a log-add onto the stored value, and working in
+# logs keeps the exponentials from overflowing.
+import datetime
+import math
+from functools import reduce
+from typing import Iterable
+
+EPOCH = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+HALF_LIFE_DAYS = 1.0
+
+POST_WEIGHT = 3.0
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0
+
+def event_score(weight: float, when) -> float:
+    """
+    The score of a single event
+
+    Args:
+        weight: The event's weight, e.g. LIKE_WEIGHT, or n * LIKE_WEIGHT
+                for n likes at the same time
+        when: A datetime, or a date (taken as midnight UTC) for likes,
+              whose time stamp is only a date
+
+    Returns:
+        float: ln(weight) plus the event's growth since EPOCH
+    """
+    if not isinstance(when, datetime.datetime):
+        when = datetime.datetime.combine(when, datetime.time(), tzinfo=datetime.timezone.utc)
+    days = (when - EPOCH).total_seconds() / 86400
+    return math.log(weight) + days / HALF_LIFE_DAYS * math.log(2)
+
+def log_add(a: float, b: float) -> float:
+    """ln(e ** a + e ** b), without computing either power"""
+    high, low = max(a, b), min(a, b)
+    return high + math.log1p(math.exp(low - high))
+
+def combine(scores: Iterable[float]) -> float:
+    """The score of several events together"""
+    return reduce(log_add, scores)
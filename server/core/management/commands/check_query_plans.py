@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.query_plans import check_query_plans
+
+class Command(BaseCommand):
+    help = 'Explains the hot queries and fails if any of them scans a table or sorts without an index'
+
+    def handle(self, *args, **options):
+        results = check_query_plans()
+        failed = 0
+        for name, result in results.items():
+            if result['problems']:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f'{name}: {"; ".join(result["problems"])}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{name}: ok'))
+            if options['verbosity'] > 1:
+                self.stdout.write(result['plan'])
+
+        if failed:
+            raise CommandError(f'{failed} of {len(results)} queries don\'t use an index')
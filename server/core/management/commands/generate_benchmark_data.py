@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from core.benchmark import SCALE_ONE, WINDOW_DAYS, dataset_size, generate_dataset, reset_dataset
+
+class Command(BaseCommand):
+    help = (
+        'Fills the database with a deterministic synthetic dataset for benchmarks. '
+        f'Scale 1.0 is {SCALE_ONE["users"]:,} users, {SCALE_ONE["supers"]:,} Supers, '
+        f'{SCALE_ONE["posts"]:,} posts, {SCALE_ONE["likes"]:,} likes and '
+        f'{SCALE_ONE["comments"]:,} comments'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=0.01,
+            help='Dataset size relative to scale 1.0 (default: 0.01)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed; the same scale and seed give the same data (default: 0)',
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Delete existing data (except superusers) before generating',
+        )
+        parser.add_argument(
+            '--days',
+            type=float,
+            default=WINDOW_DAYS,
+            help=f'Spread post and comment times over this many days before now (default: {WINDOW_DAYS})',
+        )
+        parser.add_argument(
+            '--skip-timelines',
+            action='store_true',
+            help="Don't materialize the following timelines",
+        )
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            self.stdout.write(self.style.WARNING('Deleting existing data...'))
+            reset_dataset()
+
+        size = dataset_size(options['scale'])
+        self.stdout.write(
+            f'Generating scale {options["scale"]}: ' +
+            ', '.join(f'{count} {name}' for name, count in size.items())
+        )
+        generate_dataset(
+            options['scale'],
+            seed=options['seed'],
+            timelines=not options['skip_timelines'],
+            days=options['days'],
+            log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS('Generated benchmark data'))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from core.models import Super
+from core.search import fts_available, rebuild_super_index
+
+class Command(BaseCommand):
+    help = 'Drops and rebuilds the full-text search index over activity names, descriptions and tags'
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            self.stdout.write(self.style.WARNING(
+                'The database backend has no FTS5 index, search uses substring matching'
+            ))
+            return
+        
+        rebuild_super_index()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt the activity search index ({Super.objects.count()} activities)'
+        ))
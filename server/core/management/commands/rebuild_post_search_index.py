@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from core.models import Post
+from core.search import fts_available, rebuild_post_index
+
+class Command(BaseCommand):
+    help = 'Drops and rebuilds the full-text search index over post titles and text'
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            self.stdout.write(self.style.WARNING(
+                'The database backend has no FTS5 index, search uses substring matching'
+            ))
+            return
+        
+        rebuild_post_index()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt the post search index ({Post.objects.count()} posts)'
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from core.services import TagService
+
+class Command(BaseCommand):
+    help = 'Recounts the posts and Supers carrying each tag and fixes any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of tags to recount per batch (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        result = TagService.rebuild_counts(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {result["checked"]} tags, fixed drift on {result["fixed"]}'
+        ))
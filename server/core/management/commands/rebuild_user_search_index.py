@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from core.search import rebuild_user_index
+
+class Command(BaseCommand):
+    help = 'Rebuilds the username/display name search index for every user'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of users to index per bulk insert (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_user_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the user search index ({count} users)'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from core.services import HotService
+
+class Command(BaseCommand):
+    help = 'Recomputes every post\'s hot ranking score from its likes and comments'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of posts to rescore per transaction (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        rescored = HotService.recompute(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rescored {rescored} posts'))
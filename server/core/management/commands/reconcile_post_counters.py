@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from core.services import PostService
+
+class Command(BaseCommand):
+    help = 'Recomputes the denormalized like/comment counters on posts and reports drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of posts to reconcile per batch (default: 1000)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drift without fixing it',
+        )
+
+    def handle(self, *args, **options):
+        result = PostService.reconcile_counters(
+            batch_size=options['batch_size'],
+            fix=not options['dry_run'],
+        )
+        
+        for post_id, field, stored, actual in result['drift']:
+            self.stdout.write(self.style.WARNING(
+                f'Post {post_id}: {field} was {stored}, actually {actual}'
+            ))
+        
+        drifted = len({post_id for post_id, *_ in result['drift']})
+        action = 'found' if options['dry_run'] else 'fixed'
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {result["checked"]} posts, {action} drift on {drifted}'
+        ))
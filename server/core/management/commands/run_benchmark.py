@@ -0,0 +1,80 @@
+import logging
+from django.core.management.base import BaseCommand, CommandError
+from core.benchmark import SCENARIOS, compare_results, load_results, run_benchmark, save_results
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks the API routes against the current database and reports '
+        'p50/p95/p99 latency, queries per request and throughput per endpoint'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=100,
+            help='Measured requests per endpoint (default: 100)',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=5,
+            help='Unmeasured requests per endpoint before measuring (default: 5)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed for picking URLs (default: 0)',
+        )
+        parser.add_argument(
+            '--cold',
+            action='store_true',
+            help='Clear the cache before every request',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=1,
+            help='Clients sending requests at the same time (default: 1)',
+        )
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            choices=sorted(SCENARIOS),
+            help='Only run this scenario (can be repeated)',
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='Save the results as JSON to this file',
+        )
+        parser.add_argument(
+            '--compare',
+            type=str,
+            help='JSON results of an earlier run to compare against',
+        )
+
+    def handle(self, *args, **options):
+        # Over-budget warnings would drown the report, which has the counts
+        logging.getLogger('api.middleware').setLevel(logging.ERROR)
+        try:
+            results = run_benchmark(
+                requests=options['requests'],
+                warmup=options['warmup'],
+                seed=options['seed'],
+                cold=options['cold'],
+                concurrency=options['concurrency'],
+                scenarios=options['scenario'],
+                log=self.stdout.write,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['output']:
+            save_results(results, options['output'])
+            self.stdout.write(self.style.SUCCESS(f'Saved results to {options["output"]}'))
+        if options['compare']:
+            self.stdout.write(f'Compared with {options["compare"]}:')
+            for line in compare_results(load_results(options['compare']), results):
+                self.stdout.write(line)
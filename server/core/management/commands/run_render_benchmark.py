@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from core.benchmark import render_benchmark
+
+class Command(BaseCommand):
+    help = 'Times JSON rendering of a large feed page with each renderer'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts',
+            type=int,
+            default=1000,
+            help='Posts in the rendered payload (default: 1000)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Renders per renderer (default: 20)',
+        )
+
+    def handle(self, *args, **options):
+        render_benchmark(posts=options['posts'], repeat=options['repeat'], log=self.stdout.write)
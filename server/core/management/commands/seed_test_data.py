@@ -1,11 +1,16 @@
 import json
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from django.core.management.base import BaseCommand
 from django.contrib.auth.hashers import make_password
-from django.db import transaction
+from django.db import connection, transaction
 from django.conf import settings
 from django.utils import timezone
+from core.management.hashing import hash_password
 from core.models import User, Project, Link, Tag, Club, Event, Super
+from core.search import index_users
+from core.services import TagService
 
 class Command(BaseCommand):
     help = 'Seeds the database with initial data from JSON files'
@@ -22,6 +27,23 @@ class Command(BaseCommand):
             default='seed_data',
             help='Directory containing JSON seed files (default: seed_data)',
         )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Insert rows in batches instead of one at a time',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows per bulk insert in --bulk mode (default: 1000)',
+        )
+        parser.add_argument(
+            '--hash-workers',
+            type=int,
+            default=1,
+            help='Processes hashing distinct passwords in --bulk mode (default: 1)',
+        )
 
     def handle(self, *args, **options):
         data_dir = options['data_dir']
@@ -49,10 +71,13 @@ class Command(BaseCommand):
                 proj_data = self.load_json_file(seed_path / 'projects.json')
                 event_data = self.load_json_file(seed_path / 'events.json')
                 club_data = self.load_json_file(seed_path / 'clubs.json')
-                self.seed_users(user_data)
-                self.seed_projects(proj_data)
-                self.seed_events(event_data)
-                self.seed_clubs(club_data)
+                if options['bulk']:
+                    self.bulk_seed(user_data, proj_data, event_data, club_data, options)
+                else:
+                    self.seed_users(user_data)
+                    self.seed_projects(proj_data)
+                    self.seed_events(event_data)
+                    self.seed_clubs(club_data)
                 self.stdout.write(self.style.SUCCESS('Successfully seeded database'))
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'Error seeding database: {str(e)}'))
@@ -112,7 +137,7 @@ class Command(BaseCommand):
                     project.tags.add(tag_obj)
                 
                 status = 'Created' if created else 'Updated'
-                self.stdout.write(self.style.SUCCESS(f'{status} {data.get('name','')}'))
+                self.stdout.write(self.style.SUCCESS(f'{status} {data.get("name", "")}'))
 
     def seed_clubs(self, club_data):
         self.stdout.write('Seeding clubs...')
@@ -162,4 +187,146 @@ class Command(BaseCommand):
                 event.tags.add(tag_obj)
             
             status = 'Created' if created else 'Updated'
-            self.stdout.write(self.style.SUCCESS(f'{status} {data.get("name", "")}'))
\ No newline at end of file
+            self.stdout.write(self.style.SUCCESS(f'{status} {data.get("name", "")}'))
+
+    def bulk_seed(self, user_data, proj_data, event_data, club_data, options):
+        """
+        Seed everything with batched inserts
+
+        Rows that already exist (users by username, Supers by name and
+        description) are updated or skipped, so reseeding is idempotent.
+        """
+        batch_size = options['batch_size']
+        started = time.perf_counter()
+        total = 0
+        for name, seed in [
+            ('users', lambda: self.bulk_seed_users(user_data, batch_size, options['hash_workers'])),
+            ('projects', lambda: self.bulk_seed_supers(Project, proj_data, batch_size)),
+            ('events', lambda: self.bulk_seed_supers(Event, event_data, batch_size)),
+            ('clubs', lambda: self.bulk_seed_supers(Club, club_data, batch_size)),
+        ]:
+            stage_started = time.perf_counter()
+            rows = seed()
+            total += rows
+            self.report(name, rows, time.perf_counter() - stage_started)
+        self.report('total', total, time.perf_counter() - started)
+
+    def report(self, name, rows, seconds):
+        rate = rows / seconds if seconds else 0
+        self.stdout.write(self.style.SUCCESS(f'{name}: {rows} rows in {seconds:.2f}s ({rate:,.0f} rows/sec)'))
+
+    def hash_passwords(self, passwords, workers):
+        """
+        Map each password to its hash, hashing every distinct one only once
+
+        Hashing is deliberately slow, so identical passwords share one hash
+        and distinct ones can be spread over worker processes.
+        """
+        plain = sorted({password for password in passwords if not password.startswith('pbkdf2_sha256')})
+        if workers > 1 and len(plain) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                hashed = list(pool.map(hash_password, plain, chunksize=max(1, len(plain) // workers)))
+        else:
+            hashed = [hash_password(password) for password in plain]
+        hashes = dict(zip(plain, hashed))
+        return {password: hashes.get(password, password) for password in passwords}
+
+    def bulk_seed_users(self, user_data, batch_size, workers):
+        hashes = self.hash_passwords([data['password'] for data in user_data], workers)
+        existing = User.objects.in_bulk([data['username'] for data in user_data], field_name='username')
+        fields = ['password', 'display_name', 'profile_picture', 'is_staff', 'is_superuser']
+
+        created = []
+        updated = []
+        for data in user_data:
+            values = {
+                'password': hashes[data['password']],
+                'display_name': data.get('display_name', ''),
+                'profile_picture': data.get('profile_picture', ''),
+                'is_staff': data.get('is_staff', False),
+                'is_superuser': data.get('is_superuser', False),
+            }
+            user = existing.get(data['username'])
+            if user is None:
+                created.append(User(username=data['username'], **values))
+            else:
+                for field, value in values.items():
+                    setattr(user, field, value)
+                updated.append(user)
+
+        User.objects.bulk_create(created, batch_size=batch_size)
+        User.objects.bulk_update(updated, fields, batch_size=batch_size)
+        # bulk_create skips the post_save handler that keeps these up to date
+        index_users(created + updated, batch_size=batch_size)
+        return len(created) + len(updated)
+
+    def bulk_insert_children(self, model, children, batch_size):
+        """
+        Insert only the subclass rows of multi-table inherited instances
+
+        The Super rows they point at must already exist. Only the subclass
+        table's own columns are written, in executemany batches.
+        """
+        fields = model._meta.local_concrete_fields
+        quote = connection.ops.quote_name
+        sql = (
+            f'INSERT INTO {quote(model._meta.db_table)} ({", ".join(quote(field.column) for field in fields)}) '
+            f'VALUES ({", ".join(["%s"] * len(fields))})'
+        )
+        with connection.cursor() as cursor:
+            for start in range(0, len(children), batch_size):
+                cursor.executemany(sql, [
+                    [field.get_db_prep_save(field.pre_save(child, True), connection) for field in fields]
+                    for child in children[start:start + batch_size]
+                ])
+
+    def bulk_seed_supers(self, model, rows, batch_size):
+        """
+        Create the Supers of one type, with their links and tags
+
+        Multi-table inheritance rules out bulk_create for the subclass, so
+        the shared Super rows go in as one bulk insert and the subclass rows,
+        pointing at them, as another (no parent lookups or per-tag queries).
+        """
+        existing = set(model.objects.values_list('name', 'description'))
+        rows = [data for data in rows if (data.get('name', ''), data.get('description', '')) not in existing]
+        if not rows:
+            return 0
+
+        link_ids = TagService.resolve(Link, 'link', [link for data in rows for link in data.get('links', [])])
+        tag_ids = TagService.resolve(Tag, 'tag', [tag for data in rows for tag in data.get('tags', [])])
+        clubs = Club.objects.in_bulk([data['club_ref'] for data in rows if data.get('club_ref')])
+
+        parents = Super.objects.bulk_create([
+            Super(
+                name=data.get('name', ''),
+                description=data.get('description', ''),
+                super_type=model.SUPER_TYPE,
+            )
+            for data in rows
+        ], batch_size=batch_size)
+
+        children = []
+        for parent, data in zip(parents, rows):
+            child = model(super_ptr_id=parent.id)
+            if model is Event:
+                child.start_time = data.get('start_time', timezone.now())
+                child.end_time = data.get('end_time', timezone.now())
+                child.location = data.get('location', '')
+                child.club_ref = clubs.get(data.get('club_ref'))
+            children.append(child)
+        self.bulk_insert_children(model, children, batch_size)
+
+        Super.links.through.objects.bulk_create([
+            Super.links.through(super_id=parent.id, link_id=link_ids[link])
+            for parent, data in zip(parents, rows)
+            for link in data.get('links', [])
+        ], batch_size=batch_size, ignore_conflicts=True)
+        Super.tags.through.objects.bulk_create([
+            Super.tags.through(super_id=parent.id, tag_id=tag_ids[tag])
+            for parent, data in zip(parents, rows)
+            for tag in data.get('tags', [])
+        ], batch_size=batch_size, ignore_conflicts=True)
+        # bulk_create skips the m2m_changed handler that keeps these up to date
+        TagService.recount(tag_ids.values())
+        return len(parents)
@@ -0,0 +1,8 @@
+# Password hashing for seed_test_data's worker processes
+from django.contrib.auth.hashers import make_password
+
+# Under the spawn and forkserver start methods every worker imports this
+# module fresh, before Django's app registry is set up, so it must not pull
+# in models. make_password only needs settings, which load lazily.
+def hash_password(password):
+    return make_password(password)
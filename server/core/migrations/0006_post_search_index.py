@@ -0,0 +1,44 @@
+from django.db import migrations
+
+# Frozen copy of the index as this migration created it. The triggers that
+# keep it in sync are installed by the post_migrate handler in core.signals.
+CREATE_POST_INDEX_SQL = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS core_post_fts USING fts5(
+        title, text,
+        content='core_post', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+"""
+
+DROP_POST_INDEX_SQL = [
+    'DROP TRIGGER IF EXISTS core_post_fts_ai',
+    'DROP TRIGGER IF EXISTS core_post_fts_ad',
+    'DROP TRIGGER IF EXISTS core_post_fts_au',
+    'DROP TABLE IF EXISTS core_post_fts',
+]
+
+
+def create_post_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_POST_INDEX_SQL)
+    # Index the posts that already exist
+    schema_editor.execute("INSERT INTO core_post_fts(core_post_fts) VALUES ('rebuild')")
+
+
+def drop_post_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_POST_INDEX_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_post_like_count_comment_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_post_index, drop_post_index),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:07
+
+from django.db import migrations, models
+
+
+def backfill_super_type(apps, schema_editor):
+    Super = apps.get_model('core', 'Super')
+    for model_name, super_type in (('Project', 'project'), ('Event', 'event'), ('Club', 'club')):
+        model = apps.get_model('core', model_name)
+        Super.objects.filter(id__in=model.objects.values('super_ptr_id')).update(super_type=super_type)
+
+
+# Frozen copy of the index as this migration created it. The triggers that
+# keep it in sync are installed by the post_migrate handler in core.signals.
+CREATE_SUPER_INDEX_SQL = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS core_super_fts USING fts5(
+        name, description, tags,
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+"""
+
+FILL_SUPER_INDEX_SQL = """
+    INSERT INTO core_super_fts(rowid, name, description, tags)
+    SELECT s.id, s.name, s.description, (
+        SELECT group_concat(t.tag, ' ') FROM core_super_tags st
+        JOIN core_tag t ON t.id = st.tag_id WHERE st.super_id = s.id
+    ) FROM core_super s
+"""
+
+DROP_SUPER_INDEX_SQL = [
+    'DROP TRIGGER IF EXISTS core_super_fts_ai',
+    'DROP TRIGGER IF EXISTS core_super_fts_au',
+    'DROP TRIGGER IF EXISTS core_super_fts_ad',
+    'DROP TRIGGER IF EXISTS core_super_fts_tags_ai',
+    'DROP TRIGGER IF EXISTS core_super_fts_tags_ad',
+    'DROP TRIGGER IF EXISTS core_super_fts_tag_au',
+    'DROP TABLE IF EXISTS core_super_fts',
+]
+
+
+def create_super_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_SUPER_INDEX_SQL)
+    # Index the activities that already exist
+    schema_editor.execute(FILL_SUPER_INDEX_SQL)
+
+
+def drop_super_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_SUPER_INDEX_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_post_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='super',
+            name='super_type',
+            field=models.CharField(choices=[('project', 'project'), ('event', 'event'), ('club', 'club'), ('super', 'super')], default='super', max_length=7),
+        ),
+        migrations.AddIndex(
+            model_name='super',
+            index=models.Index(fields=['super_type', 'id'], name='core_super_type_id_idx'),
+        ),
+        migrations.RunPython(backfill_super_type, migrations.RunPython.noop),
+        migrations.RunPython(create_super_index, drop_super_index),
+    ]
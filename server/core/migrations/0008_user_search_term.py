@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:09
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Frozen copy of core.search.user_search_terms as of this migration, with
+# the kinds spelled out: 0 username, 1 display name, 2 infix
+def normalize_name(value):
+    value = unicodedata.normalize('NFKD', value or '')
+    value = ''.join(ch for ch in value if not unicodedata.combining(ch))
+    return ' '.join(value.casefold().split())
+
+
+def user_search_terms(username, display_name):
+    username = normalize_name(username)
+    display_name = normalize_name(display_name)
+    words = re.findall(r'\w+', display_name)
+
+    terms = set()
+    if username:
+        terms.add((username, 0))
+    if display_name:
+        terms.add((display_name, 1))
+    for word in words:
+        terms.add((word, 1))
+    for word in [username] + words:
+        for start in range(1, len(word)):
+            terms.add((word[start:], 2))
+    return [(term[:150], kind) for term, kind in terms]
+
+
+def index_existing_users(apps, schema_editor):
+    User = apps.get_model('core', 'User')
+    UserSearchTerm = apps.get_model('core', 'UserSearchTerm')
+    rows = []
+    for user_id, username, display_name in User.objects.values_list('id', 'username', 'display_name').iterator():
+        rows += [
+            UserSearchTerm(user_id=user_id, term=term, kind=kind)
+            for term, kind in user_search_terms(username, display_name)
+        ]
+    UserSearchTerm.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_super_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=150)),
+                ('kind', models.PositiveSmallIntegerField(choices=[(0, 'username'), (1, 'display name'), (2, 'infix')])),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'term', 'user'], name='core_usersearch_lookup_idx')],
+            },
+        ),
+        migrations.RunPython(index_existing_users, migrations.RunPython.noop),
+    ]
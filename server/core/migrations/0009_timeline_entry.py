@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_follower_count(apps, schema_editor):
+    Super = apps.get_model('core', 'Super')
+    Follow = Super.followers.through
+    Super.objects.update(follower_count=Coalesce(Subquery(
+        Follow.objects.filter(super_id=OuterRef('pk')).order_by().values('super_id')
+        .annotate(total=Count('*')).values('total')
+    ), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_user_search_term'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='super',
+            name='follower_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_follower_count, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.post')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'post'), name='core_timeline_user_post_uniq')],
+            },
+        ),
+    ]
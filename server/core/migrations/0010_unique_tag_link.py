@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:29
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+# (model, field, [(owner model, m2m field), ...])
+NAMED_ROWS = [
+    ('Tag', 'tag', [('Super', 'tags'), ('Post', 'tag')]),
+    ('Link', 'link', [('Super', 'links')]),
+]
+
+
+def merge_duplicates(apps, schema_editor):
+    """
+    Fold rows sharing a name into the oldest one before making names unique
+
+    Through rows pointing at a duplicate are moved to the kept row, or
+    dropped where the owner is already linked to it.
+    """
+    for model_name, field, relations in NAMED_ROWS:
+        Model = apps.get_model('core', model_name)
+        duplicates = (
+            Model.objects.exclude(**{f'{field}__isnull': True})
+            .values(field).annotate(rows=Count('id'), keep=Min('id')).filter(rows__gt=1)
+        )
+        for row in duplicates:
+            keep = row['keep']
+            others = list(
+                Model.objects.filter(**{field: row[field]}).exclude(id=keep).values_list('id', flat=True)
+            )
+            for owner, relation in relations:
+                Through = getattr(apps.get_model('core', owner), relation).through
+                target = f'{model_name.lower()}_id'
+                source = f'{owner.lower()}_id'
+                for other in others:
+                    linked = Through.objects.filter(**{target: keep}).values(source)
+                    Through.objects.filter(**{target: other, f'{source}__in': linked}).delete()
+                    Through.objects.filter(**{target: other}).update(**{target: keep})
+            Model.objects.filter(id__in=others).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_timeline_entry'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='link',
+            constraint=models.UniqueConstraint(fields=('link',), name='core_link_link_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='tag',
+            constraint=models.UniqueConstraint(fields=('tag',), name='core_tag_tag_uniq'),
+        ),
+    ]
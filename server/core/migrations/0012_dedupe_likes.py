@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:01
+
+from django.db import migrations, transaction
+from django.db.models import Count, Min
+
+# Posts checked per transaction, so a big like table is never locked in one go
+BATCH_SIZE = 1000
+
+
+def dedupe_likes(apps, schema_editor):
+    """
+    Drop repeated likes of a post by the same user before making them unique
+
+    The oldest like is kept. Walks the posts in id order BATCH_SIZE at a
+    time, each batch in its own transaction, and recounts like_count for
+    the posts it touched.
+    """
+    Post = apps.get_model('core', 'Post')
+    Like = apps.get_model('core', 'Like')
+    last_id = 0
+    while True:
+        ids = list(
+            Post.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:BATCH_SIZE]
+        )
+        if not ids:
+            break
+        last_id = ids[-1]
+        duplicates = list(
+            Like.objects.filter(post_id__in=ids).order_by().values('post_id', 'user_id')
+            .annotate(rows=Count('id'), keep=Min('id')).filter(rows__gt=1)
+        )
+        if not duplicates:
+            continue
+        with transaction.atomic(using=schema_editor.connection.alias):
+            for row in duplicates:
+                Like.objects.filter(post_id=row['post_id'], user_id=row['user_id']).exclude(id=row['keep']).delete()
+            for post_id in {row['post_id'] for row in duplicates}:
+                Post.objects.filter(id=post_id).update(like_count=Like.objects.filter(post_id=post_id).count())
+
+
+class Migration(migrations.Migration):
+    # Each batch commits on its own
+    atomic = False
+
+    dependencies = [
+        ('core', '0011_user_token_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_likes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Each index is built and committed on its own, so a large table is
+    # never locked for the whole migration
+    atomic = False
+
+    dependencies = [
+        ('core', '0012_dedupe_likes'),
+    ]
+
+    # The single column foreign key indexes stay, the composites only add
+    # the ordering by id
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'id'], name='core_comment_post_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='like',
+            index=models.Index(fields=['user', 'id'], name='core_like_user_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['user', 'id'], name='core_post_user_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='super',
+            index=models.Index(fields=['leader', 'id'], name='core_super_leader_id_idx'),
+        ),
+        # AddConstraint rebuilds the whole table on SQLite, a unique index
+        # enforces the same thing without copying any rows
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name='like',
+                    constraint=models.UniqueConstraint(fields=('post', 'user'), name='core_like_post_user_uniq'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    'CREATE UNIQUE INDEX core_like_post_user_uniq ON core_like (post_id, user_id)',
+                    reverse_sql='DROP INDEX core_like_post_user_uniq',
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:12
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.CreateModel(
+            name='PostHotScore',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='hot', serialize=False, to='core.post')),
+                ('score', models.FloatField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['score', 'post'], name='core_hot_score_post_idx')],
+            },
+        ),
+    ]
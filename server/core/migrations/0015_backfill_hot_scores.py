@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:12
+
+from django.db import migrations, transaction
+from django.db.models import Count
+
+# Posts scored per transaction, so a big post table is never locked in one go
+BATCH_SIZE = 1000
+
+
+def backfill_hot_scores(apps, schema_editor):
+    """
+    Score every existing post, the way HotService.refresh() does
+
+    Existing posts and comments all got the time of 0014 as their
+    created_at, so each post's comments are scored as one event at that time.
+    """
+    from core import hot
+    Post = apps.get_model('core', 'Post')
+    Like = apps.get_model('core', 'Like')
+    Comment = apps.get_model('core', 'Comment')
+    PostHotScore = apps.get_model('core', 'PostHotScore')
+    last_id = 0
+    while True:
+        posts = list(
+            Post.objects.filter(id__gt=last_id).order_by('id').values_list('id', 'created_at')[:BATCH_SIZE]
+        )
+        if not posts:
+            break
+        last_id = posts[-1][0]
+        created = dict(posts)
+        terms = {post_id: [hot.event_score(hot.POST_WEIGHT, created_at)] for post_id, created_at in posts}
+        likes = (
+            Like.objects.filter(post_id__in=terms).order_by().values('post_id', 'time_stamp')
+            .annotate(total=Count('*')).values_list('post_id', 'time_stamp', 'total')
+        )
+        for post_id, time_stamp, total in likes:
+            terms[post_id].append(hot.event_score(total * hot.LIKE_WEIGHT, time_stamp))
+        comments = (
+            Comment.objects.filter(post_id__in=terms).order_by().values('post_id')
+            .annotate(total=Count('*')).values_list('post_id', 'total')
+        )
+        for post_id, total in comments:
+            terms[post_id].append(hot.event_score(total * hot.COMMENT_WEIGHT, created[post_id]))
+        with transaction.atomic(using=schema_editor.connection.alias):
+            PostHotScore.objects.bulk_create(
+                [PostHotScore(post_id=post_id, score=hot.combine(scores)) for post_id, scores in terms.items()],
+                ignore_conflicts=True,
+            )
+
+
+class Migration(migrations.Migration):
+    # Each batch commits on its own
+    atomic = False
+
+    dependencies = [
+        ('core', '0014_hot_scores'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_hot_scores, migrations.RunPython.noop),
+    ]
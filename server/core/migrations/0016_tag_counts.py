@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:18
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_tags(apps, schema_editor):
+    """Count the posts and Supers carrying each existing tag"""
+    Tag = apps.get_model('core', 'Tag')
+    counts = {}
+    relations = {
+        'post_count': apps.get_model('core', 'Post').tag,
+        'super_count': apps.get_model('core', 'Super').tags,
+    }
+    for field, relation in relations.items():
+        counts[field] = Coalesce(Subquery(
+            relation.through.objects.filter(tag_id=OuterRef('pk')).order_by().values('tag_id')
+            .annotate(total=Count('*')).values('total')
+        ), 0)
+    Tag.objects.update(**counts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_backfill_hot_scores'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='super_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['post_count', 'id'], name='core_tag_post_count_idx'),
+        ),
+        migrations.RunPython(count_tags, migrations.RunPython.noop),
+    ]
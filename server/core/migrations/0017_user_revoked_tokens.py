@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_tag_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='revoked_tokens',
+            field=models.JSONField(default=dict),
+        ),
+    ]
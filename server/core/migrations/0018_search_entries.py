@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_user_revoked_tokens'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSearchEntry',
+            fields=[
+                ('post', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='core.post')),
+            ],
+            options={
+                'db_table': 'core_post_fts',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='SuperSearchEntry',
+            fields=[
+                ('super', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='core.super')),
+            ],
+            options={
+                'db_table': 'core_super_fts',
+                'managed': False,
+            },
+        ),
+    ]
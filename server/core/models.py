@@ -41,6 +41,12 @@ class User(AbstractUser):
     # Automatically set when the user is created and updated
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    # Part of every auth token, bumping it revokes them all (see core.tokens)
+    token_version = models.PositiveIntegerField(default=0)
+    # Ids of single tokens retired before they expire, mapped to their
+    # expiry as a unix timestamp (see core.tokens.revoke_token)
+    revoked_tokens = models.JSONField(default=dict)
     
     # This is not data we collect, its ugly but the other option is to inherit 
     # from AbstractBaseUser and all the stuff that comes with that
@@ -63,28 +69,72 @@ class User(AbstractUser):
         }
         
 class Link(models.Model):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['link'], name='core_link_link_uniq'),
+        ]
+
     link = models.CharField(max_length=1000,null=True,blank=True)
     def to_dict(self):
         return self.link
     
 class Tag(models.Model):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['tag'], name='core_tag_tag_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['post_count', 'id'], name='core_tag_post_count_idx'),
+        ]
+
     tag = models.CharField(max_length=1000,null=True,blank=True)
+    # How many posts and Supers carry the tag, kept in step with the tag
+    # relations (see core/signals.py). Run `manage.py rebuild_tag_counts`
+    # to repair any drift.
+    post_count = models.PositiveIntegerField(default=0)
+    super_count = models.PositiveIntegerField(default=0)
     def to_dict(self):
         return self.tag
     
 class Super(models.Model):
+    class SuperType(models.TextChoices):
+        PROJECT = 'project', 'project'
+        EVENT = 'event', 'event'
+        CLUB = 'club', 'club'
+        SUPER = 'super', 'super'
+    
+    # Which subclass table holds the rest of this row, so searches over
+    # Super can filter and hydrate by type without joining every child table
+    SUPER_TYPE = SuperType.SUPER
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['super_type', 'id'], name='core_super_type_id_idx'),
+            # A leader's Supers by id
+            models.Index(fields=['leader', 'id'], name='core_super_leader_id_idx'),
+        ]
+    
     name = models.CharField(max_length=200, null=True, blank=True)
     leader = models.ForeignKey(User, on_delete=models.CASCADE,related_name="super_leader", blank=True, null=True)
     followers = models.ManyToManyField(User,related_name="super_users")
     description = models.CharField(max_length=1000,null=True,blank=True)
     links = models.ManyToManyField(Link)
     tags = models.ManyToManyField(Tag)
+    super_type = models.CharField(max_length=7, choices=SuperType.choices, default=SuperType.SUPER)
+    # Kept in step with the followers relation (see core/signals.py), so the
+    # timeline can tell push from pull Supers without counting followers
+    follower_count = models.PositiveIntegerField(default=0)
+    
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            self.super_type = self.SUPER_TYPE
+        super().save(*args, **kwargs)
     
     def to_dict(self):
         return {
             'id': self.id,
             'name': self.name,
-            'leader': self.leader.id if self.leader else None,
+            'leader': self.leader_id,
             'followers': [user.id for user in self.followers.all()],
             'description': self.description,
             'links': [link.to_dict() for link in self.links.all()],
@@ -92,6 +142,7 @@ class Super(models.Model):
         }
 
 class Project(Super):
+    SUPER_TYPE = Super.SuperType.PROJECT
     active = models.BooleanField(default=True)
     
     def to_dict(self):
@@ -101,12 +152,15 @@ class Project(Super):
         return out
 
 class Club(Super):
+    SUPER_TYPE = Super.SuperType.CLUB
+    
     def to_dict(self):
         out = super().to_dict()
         out['type'] = 'club'
         return out
 
 class Event(Super):
+    SUPER_TYPE = Super.SuperType.EVENT
     start_time = models.DateField(default=timezone.now)
     end_time = models.DateField(default=timezone.now)
     location = models.CharField(max_length=200, null=True, blank=True)
@@ -115,10 +169,10 @@ class Event(Super):
     def to_dict(self):
         out = super().to_dict()
         out.update({
-            'start_time': self.start_time.isoformat(),
-            'end_time': self.end_time.isoformat(),
+            'start_time': self.start_time,
+            'end_time': self.end_time,
             'location': self.location,
-            'club_ref': self.club_ref.id if self.club_ref else None,
+            'club_ref': self.club_ref_id,
             'type': 'event'
         })
         return out
@@ -129,6 +183,12 @@ class Post(models.Model):
         TEXT = 'text', 'text'
         IMAGE = 'image', 'image'
     
+    class Meta:
+        indexes = [
+            # A user's posts by id
+            models.Index(fields=['user', 'id'], name='core_post_user_id_idx'),
+        ]
+    
     user = models.ForeignKey(User,on_delete=models.CASCADE)
     title = models.CharField(max_length=200, null=True, blank=True)
     text = models.TextField(max_length=1000,null=True,blank=True)
@@ -143,6 +203,11 @@ class Post(models.Model):
     club = models.ForeignKey(Club, null=True, blank=True, on_delete=models.CASCADE, related_name="post_club")
     misc = models.ForeignKey(Super, null=True, blank=True, on_delete=models.CASCADE, related_name="post_misc")
     tag = models.ManyToManyField(Tag)
+    # Denormalized counters, kept in step with F() updates on every like/comment
+    # write. Run `manage.py reconcile_post_counters` to repair any drift.
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
     
     def to_dict(self):
         return {
@@ -166,10 +231,20 @@ class Post(models.Model):
                 'id': self.club.id if self.club is not None else None,
                 'name': self.club.name if self.club is not None else None
             },
-            'like_number': Like.objects.filter(post=self).count(),
+            'like_number': self.like_count,
+            'comment_count': self.comment_count,
         }
     
 class Like(models.Model):
+    class Meta:
+        constraints = [
+            # Also the index for "has this user liked this post"
+            models.UniqueConstraint(fields=['post', 'user'], name='core_like_post_user_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'id'], name='core_like_user_id_idx'),
+        ]
+    
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     post = models.ForeignKey(Post, on_delete=models.CASCADE)
     time_stamp = models.DateField(default=timezone.now)
@@ -180,9 +255,15 @@ class Like(models.Model):
         }
 
 class Comment(models.Model):
+    class Meta:
+        indexes = [
+            models.Index(fields=['post', 'id'], name='core_comment_post_id_idx'),
+        ]
+    
     text = models.CharField(max_length=200, null=True, blank=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     post = models.ForeignKey(Post, on_delete=models.CASCADE, default=None)
+    created_at = models.DateTimeField(default=timezone.now)
     def to_dict(self):
         return {
             'id': self.id,
@@ -190,8 +271,92 @@ class Comment(models.Model):
             'username': self.user.username,
             'display_name': self.user.display_name,
             "profile_picture": self.user.profile_picture,
-            'post': self.post.id}
+            'post': self.post_id}
+    
+
+class PostHotScore(models.Model):
+    """
+    A post's "hot" ranking score (see core/hot.py)
+    
+    Kept in a table of its own so ?order=hot is a range scan over the
+    (score, post) index rather than a sort over scores computed per request.
+    Updated as likes and comments arrive, and rebuilt in batches by
+    `manage.py recompute_hot_scores`.
+    """
+    class Meta:
+        indexes = [
+            models.Index(fields=['score', 'post'], name='core_hot_score_post_idx'),
+        ]
+    
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, primary_key=True, related_name='hot')
+    score = models.FloatField()
+
+
+class TimelineEntry(models.Model):
+    """
+    One post in one user's "following" timeline
+    
+    Written when a post is attached to a Super the user follows (fan-out on
+    write), so reading the timeline is a range scan over (user, post)
+    instead of a join through every follower relation.
+    """
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'post'], name='core_timeline_user_post_uniq'),
+        ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='timeline')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='+')
+
+
+class UserSearchTerm(models.Model):
+    """
+    Normalized prefix index over usernames and display names
+    
+    Each user gets one row per searchable term. A search is then an indexed
+    range scan (term >= q AND term < q + max char) per kind, instead of a
+    LIKE '%q%' over the whole user table. Rows are rewritten whenever the
+    username or display name changes (see core/signals.py).
+    """
+    class Kind(models.IntegerChoices):
+        USERNAME = 0, 'username'
+        DISPLAY_NAME = 1, 'display name'
+        # Every suffix of every word, so substrings still match
+        INFIX = 2, 'infix'
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['kind', 'term', 'user'], name='core_usersearch_lookup_idx'),
+        ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='search_terms')
+    term = models.CharField(max_length=150)
+    kind = models.PositiveSmallIntegerField(choices=Kind.choices)
+
+
+
+class PostSearchEntry(models.Model):
+    """
+    A post's row in the core_post_fts full-text index (see core/search.py)
+    
+    The table is an FTS5 virtual table created by migration 0006 and kept in
+    sync by triggers, so Django never writes to it. It is mapped only so a
+    search can join it on rowid and read bm25() off the joined row.
+    """
+    class Meta:
+        managed = False
+        db_table = 'core_post_fts'
+    
+    post = models.OneToOneField(Post, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid', related_name='search_entry')
+
+
+class SuperSearchEntry(models.Model):
+    """An activity's row in the core_super_fts full-text index, see PostSearchEntry"""
+    class Meta:
+        managed = False
+        db_table = 'core_super_fts'
     
+    super = models.OneToOneField(Super, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid', related_name='search_entry')
 
 class SuperUserData(models.Model):
     class SuperType(models.TextChoices):
@@ -0,0 +1,132 @@
+# Keyset (cursor) pagination helpers
+import base64
+import binascii
+import json
+from typing import List, Optional, Sequence, Tuple
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+# Upper bound on any single page, regardless of what the client asks for
+MAX_PAGE_SIZE = 500
+
+def encode_cursor(values: Sequence) -> str:
+    """
+    Turn the sort key of the last row on a page into an opaque cursor string
+
+    Args:
+        values: The ordering field values of the last row, in ordering order
+
+    Returns:
+        str: URL-safe cursor
+    """
+    raw = json.dumps(list(values), separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor: The opaque cursor string from the client
+        size: How many sort key values the cursor must contain
+
+    Returns:
+        list: The sort key values
+
+    Raises:
+        ValidationError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise ValidationError({'cursor': 'Invalid cursor'})
+    if not isinstance(values, list) or len(values) != size:
+        raise ValidationError({'cursor': 'Invalid cursor'})
+    return values
+
+def parse_limit(value, default: int = 10) -> int:
+    """
+    Parse a client supplied page size, clamped to [1, MAX_PAGE_SIZE]
+
+    Raises:
+        ValidationError: If the limit is not an integer
+    """
+    try:
+        limit = int(value) if value not in (None, '') else default
+    except (TypeError, ValueError):
+        raise ValidationError({'limit': 'limit must be an integer'})
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+def _row_value(row, field: str):
+    value = row
+    for part in field.split('__'):
+        value = getattr(value, part)
+    return value
+
+def keyset_page(
+        querySet,
+        ordering: Sequence[str],
+        cursor: Optional[str],
+        limit: int) -> Tuple[List, Optional[str]]:
+    """
+    Fetch one page of a queryset using keyset pagination
+
+    Instead of OFFSET, each page starts strictly after the sort key of the
+    previous page's last row, so page 1000 is as cheap as page 1 as long as
+    an index covers the ordering. The last field of the ordering must be
+    unique (normally 'id' or '-id') so rows with equal leading keys are not
+    skipped or repeated.
+
+    Args:
+        querySet: The filtered queryset to paginate
+        ordering: Order fields, e.g. ['-id'] or ['-hot__score', '-id']
+        cursor: Cursor from the previous page's next_cursor, or None
+        limit: Page size
+
+    Returns:
+        tuple: (rows on this page, cursor for the next page or None)
+    """
+    rows = list(_page_query(querySet, ordering, cursor, limit))
+    return _split_page(rows, ordering, limit)
+
+async def akeyset_page(
+        querySet,
+        ordering: Sequence[str],
+        cursor: Optional[str],
+        limit: int) -> Tuple[List, Optional[str]]:
+    """Async version of keyset_page()"""
+    rows = [row async for row in _page_query(querySet, ordering, cursor, limit)]
+    return _split_page(rows, ordering, limit)
+
+def _page_query(querySet, ordering, cursor, limit):
+    # One row more than the page, to know whether there is a next page
+    fields = [field.lstrip('-') for field in ordering]
+    querySet = querySet.order_by(*ordering)
+
+    if cursor:
+        values = decode_cursor(cursor, len(fields))
+        # (a, b) > (x, y)  ==  a > x OR (a = x AND b > y), per field direction
+        after = Q()
+        for i, field in enumerate(ordering):
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            step = Q(**{f'{fields[i]}__{lookup}': values[i]})
+            for j in range(i):
+                step &= Q(**{fields[j]: values[j]})
+            after |= step
+        if len(ordering) > 1:
+            # Implied by the above, but a plain bound on the leading field is
+            # what lets the database start its index range scan at the cursor
+            lookup = 'lte' if ordering[0].startswith('-') else 'gte'
+            after &= Q(**{f'{fields[0]}__{lookup}': values[0]})
+        querySet = querySet.filter(after)
+
+    return querySet[:limit + 1]
+
+def _split_page(rows, ordering, limit):
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        fields = [field.lstrip('-') for field in ordering]
+        next_cursor = encode_cursor([_row_value(rows[-1], field) for field in fields])
+    return rows, next_cursor
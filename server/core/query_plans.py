@@ -0,0 +1,124 @@
+# EXPLAIN checks for the hot read paths
+#
+# HOT_QUERIES builds the query each hot endpoint or service runs, as it runs
+# it for a deep page (with a cursor applied), and check_query_plans() asks
+# the database how it would execute each one. On SQLite a plan that scans a
+# whole table or sorts rows in a temporary b-tree is reported, since both
+# cost time in proportion to the table rather than to the page.
+from typing import Callable, Dict, List
+from django.db import connection, connections
+from django.db.models import Count
+from django.http import QueryDict
+from .models import User, Post, Like, Comment, Super, Tag, Link
+from .pagination import _page_query, encode_cursor
+from .services import PostService, SuperService, TagService, TimelineService
+
+# Any existing or missing id does; plans don't depend on the values
+CURSOR = encode_cursor([1])
+HOT_CURSOR = encode_cursor([1.0, 1])
+
+def _feed(query: str, viewer):
+    querySet, ordering, cursor, limit = PostService.posts_query(QueryDict(query), viewer)
+    return _page_query(querySet, ordering, cursor, limit)
+
+def _activities(query: str):
+    querySet, ordering, cursor, limit = SuperService.activities_query(QueryDict(query))
+    return _page_query(querySet, ordering, cursor, limit)
+
+def _tags(query: str):
+    querySet, ordering, cursor, limit = TagService.tags_query(QueryDict(query))
+    return _page_query(querySet, ordering, cursor, limit)
+
+def _page(querySet, ordering=('id',)):
+    return _page_query(querySet, ordering, CURSOR, 50)
+
+# name -> function of the viewing user returning the QuerySet to explain
+HOT_QUERIES: Dict[str, Callable] = {
+    'feed': lambda viewer: _feed(f'cursor={CURSOR}', viewer),
+    'feed, newest first': lambda viewer: _feed(f'order=reverse&cursor={CURSOR}', viewer),
+    'feed by tag': lambda viewer: _feed(f'tag=art&cursor={CURSOR}', viewer),
+    'feed, hottest first': lambda viewer: _feed(f'order=hot&cursor={HOT_CURSOR}', viewer),
+    'timeline': lambda viewer: TimelineService._pushed_ids(viewer, 1, 10),
+    'timeline posts': lambda viewer: TimelineService._page({1, 2}, 10, viewer)[0],
+    'posts by user': lambda viewer: _page(PostService.user_posts_query('author', viewer)),
+    'likes by user': lambda viewer: _page(PostService.liked_posts_query('author')),
+    'like by user and post': lambda viewer: Like.objects.filter(post_id=1, user=viewer),
+    'liked set': lambda viewer: (
+        Like.objects.filter(user=viewer, post_id__in=[1, 2, 3]).order_by('post_id').values_list('post_id')
+    ),
+    'comments on post': lambda viewer: _page(Comment.objects.filter(post_id=1).select_related('user')),
+    'comment previews': lambda viewer: PostService.comment_previews_query([1, 2, 3], 3),
+    'activities': lambda viewer: _activities(f'cursor={CURSOR}'),
+    'activities by type': lambda viewer: _activities(f'type=event&cursor={CURSOR}'),
+    'supers by leader': lambda viewer: _page(Super.objects.filter(leader__username='author')),
+    'tags by name': lambda viewer: Tag.objects.filter(tag__in=['art']).values_list('tag', 'id'),
+    'tags, most used first': lambda viewer: _tags(f'cursor={encode_cursor([1, 1])}'),
+    'tags by prefix': lambda viewer: _tags(f'prefix=ar&cursor={encode_cursor(["art"])}'),
+    'links by name': lambda viewer: Link.objects.filter(link__in=['a']).values_list('link', 'id'),
+    'like counts': lambda viewer: (
+        Like.objects.filter(post_id__in=[1, 2]).order_by().values('post_id').annotate(total=Count('*'))
+    ),
+    'comment counts': lambda viewer: (
+        Comment.objects.filter(post_id__in=[1, 2]).order_by().values('post_id').annotate(total=Count('*'))
+    ),
+}
+
+# Queries whose sort is expected: posts with any of several tags can't come
+# out of one index in id order, and the comment preview window ranks each
+# post's comments newest first
+SORTED = {'feed by tag', 'comment previews'}
+
+def plan_problems(plan: str, allow_sort: bool = False) -> List[str]:
+    """
+    The lines of an SQLite EXPLAIN QUERY PLAN that don't use an index
+
+    Args:
+        plan: QuerySet.explain() output
+        allow_sort: Don't report sorting in a temporary b-tree
+
+    Returns:
+        list: Full table scans and, unless allowed, sorts
+    """
+    problems = []
+    # Reading back a subquery's rows isn't a table scan
+    derived = set()
+    for line in plan.splitlines():
+        detail = line.split(' ', 3)[-1]
+        if detail.startswith(('CO-ROUTINE ', 'MATERIALIZE ')):
+            derived.add(detail.split(' ', 1)[1])
+        elif detail.startswith('SCAN ') and ' INDEX ' not in detail:
+            if detail.split(' ', 1)[1] not in derived:
+                problems.append(detail)
+        elif detail.startswith('USE TEMP B-TREE') and not allow_sort:
+            problems.append(detail)
+    return problems
+
+def explain(querySet) -> str:
+    """
+    QuerySet.explain(), which on SQLite fails for queries filtered on a
+    window function
+    """
+    sql, params = querySet.query.sql_with_params()
+    with connections[querySet.db].cursor() as cursor:
+        cursor.execute(f'{cursor.db.ops.explain_query_prefix()} {sql}', params)
+        return '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+
+def check_query_plans() -> Dict[str, dict]:
+    """
+    Explain every query in HOT_QUERIES
+
+    Only SQLite plans are judged; on other databases the plans are returned
+    with no problems listed.
+
+    Returns:
+        dict: name -> {'plan': plan text, 'problems': list of plan lines}
+    """
+    viewer = User(id=1, username='viewer')
+    results = {}
+    for name, build in HOT_QUERIES.items():
+        plan = explain(build(viewer))
+        problems = []
+        if connection.vendor == 'sqlite':
+            problems = plan_problems(plan, allow_sort=name in SORTED)
+        results[name] = {'plan': plan, 'problems': problems}
+    return results
@@ -0,0 +1,105 @@
+# Read/write database routing
+#
+# Every write and, by default, every read goes to the 'default' (primary)
+# database. Code that can tolerate replication lag opts in with
+# @use_replica, which sends its reads to one of settings.DATABASE_REPLICAS.
+# Once the current request writes anything, or if the client wrote within
+# the last READ_YOUR_WRITES_SECONDS (see api.middleware.ReplicaRoutingMiddleware),
+# reads stay on the primary so users always see their own changes.
+import random
+from asgiref.sync import iscoroutinefunction
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Optional
+from django.conf import settings
+
+PRIMARY = 'default'
+
+class RoutingState:
+    """Routing decisions for the current request (or command)"""
+    def __init__(self, pinned: bool = False):
+        # Reads must see the primary, because this client wrote recently
+        self.pinned = pinned
+        # Inside a @use_replica block
+        self.replica_reads = False
+        # Some read was actually served by a replica
+        self.used_replica = False
+        # Something was written to the primary
+        self.wrote = False
+
+_state: ContextVar[Optional[RoutingState]] = ContextVar('db_routing', default=None)
+
+def current_state() -> Optional[RoutingState]:
+    return _state.get()
+
+def begin(pinned: bool = False):
+    """Start a fresh routing state, returning a token for end()"""
+    return _state.set(RoutingState(pinned))
+
+def end(token):
+    _state.reset(token)
+
+def use_replica(func):
+    """
+    Let the reads inside func go to a read replica
+
+    Only for reads that can show data a few seconds old. Has no effect when
+    no replicas are configured or the current client is pinned to the
+    primary. Works on regular and async functions.
+    """
+    if iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with _replica_reads():
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with _replica_reads():
+            return func(*args, **kwargs)
+    return wrapper
+
+@contextmanager
+def _replica_reads():
+    token = begin() if current_state() is None else None
+    state = current_state()
+    previous = state.replica_reads
+    state.replica_reads = True
+    try:
+        yield
+    finally:
+        state.replica_reads = previous
+        if token is not None:
+            end(token)
+
+class ReplicaRouter:
+    """Routes opted-in reads to replicas and everything else to the primary"""
+
+    def db_for_read(self, model, **hints):
+        state = current_state()
+        replicas = getattr(settings, 'DATABASE_REPLICAS', [])
+        if state is None or not state.replica_reads or state.pinned or not replicas:
+            return PRIMARY
+        state.used_replica = True
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = current_state()
+        if state is not None:
+            # Read your own writes for the rest of this request
+            state.pinned = True
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        databases = {PRIMARY, *getattr(settings, 'DATABASE_REPLICAS', [])}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema through replication
+        return db == PRIMARY
@@ -0,0 +1,478 @@
+# Full-text search over posts and activities, backed by SQLite FTS5
+import re
+import unicodedata
+from typing import List, Optional, Tuple
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+POST_FTS_TABLE = 'core_post_fts'
+SUPER_FTS_TABLE = 'core_super_fts'
+
+# External-content FTS5 table: it stores only the inverted index and reads
+# title/text back from core_post. The prefix option pre-builds 2 and 3
+# character prefix indexes so "rob*" style queries don't walk the vocabulary.
+_POST_INDEX_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {POST_FTS_TABLE} USING fts5(
+        title, text,
+        content='core_post', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {POST_FTS_TABLE}_ai AFTER INSERT ON core_post BEGIN
+        INSERT INTO {POST_FTS_TABLE}(rowid, title, text) VALUES (new.id, new.title, new.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {POST_FTS_TABLE}_ad AFTER DELETE ON core_post BEGIN
+        INSERT INTO {POST_FTS_TABLE}({POST_FTS_TABLE}, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {POST_FTS_TABLE}_au AFTER UPDATE OF title, text ON core_post BEGIN
+        INSERT INTO {POST_FTS_TABLE}({POST_FTS_TABLE}, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+        INSERT INTO {POST_FTS_TABLE}(rowid, title, text) VALUES (new.id, new.title, new.text);
+    END
+    """,
+]
+
+_DROP_POST_TRIGGERS_SQL = [
+    f'DROP TRIGGER IF EXISTS {POST_FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {POST_FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {POST_FTS_TABLE}_au',
+]
+
+_DROP_POST_INDEX_SQL = _DROP_POST_TRIGGERS_SQL + [
+    f'DROP TABLE IF EXISTS {POST_FTS_TABLE}',
+]
+
+# bm25() weights per column: a hit in the title counts for more than the body
+_POST_RANK_SQL = f'bm25({POST_FTS_TABLE}, 2.0, 1.0)'
+
+def fts_available(conn=None) -> bool:
+    """Whether the database backend has the FTS5 search indexes"""
+    return (conn or connection).vendor == 'sqlite'
+
+def install_post_index(conn=None, rebuild: bool = False, triggers: bool = True):
+    """
+    Create the post FTS table and the triggers that keep it in sync
+
+    Safe to call repeatedly.
+
+    Args:
+        conn: Database connection, defaults to the default connection
+        rebuild: Re-read every post into the index afterwards
+        triggers: Also create the triggers; migrations leave them to the
+                  post_migrate handler, see reinstall_search_triggers()
+    """
+    conn = conn or connection
+    if not fts_available(conn):
+        return
+    with conn.cursor() as cursor:
+        # The first statement creates the table, the rest are triggers
+        for sql in _POST_INDEX_SQL if triggers else _POST_INDEX_SQL[:1]:
+            cursor.execute(sql)
+        if rebuild:
+            cursor.execute(f"INSERT INTO {POST_FTS_TABLE}({POST_FTS_TABLE}) VALUES ('rebuild')")
+
+def rebuild_post_index(conn=None):
+    """Drop and recreate the post FTS index and triggers from scratch"""
+    conn = conn or connection
+    if not fts_available(conn):
+        return
+    with conn.cursor() as cursor:
+        for sql in _DROP_POST_INDEX_SQL:
+            cursor.execute(sql)
+    install_post_index(conn, rebuild=True)
+
+def match_expression(search: str) -> Optional[str]:
+    """
+    Turn free text from the search box into an FTS5 MATCH expression
+
+    Every word must match (implicit AND), and each word also matches as a
+    prefix so results show up while the user is still typing. Words are
+    quoted so FTS5 operators in user input are treated as plain text.
+
+    Returns:
+        str: The MATCH expression, or None if the text has no words
+    """
+    words: List[str] = re.findall(r'\w+', search.lower())
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
+
+def search_posts(querySet, search: str, ordering: List[str]) -> Tuple[object, List[str]]:
+    """
+    Restrict a Post queryset to posts matching search, ranked by relevance
+
+    On SQLite this goes through the FTS5 index, so the cost depends on the
+    number of matches rather than the size of the posts table. Other
+    backends fall back to a substring match ordered by id.
+
+    Args:
+        querySet: The Post queryset to filter
+        search: Free text from the client
+        ordering: The caller's keyset ordering, kept if search has no words
+
+    Returns:
+        tuple: (filtered queryset, keyset ordering for it)
+    """
+    if not fts_available():
+        return (
+            querySet.filter(Q(title__icontains=search) | Q(text__icontains=search)),
+            ['id'],
+        )
+
+    expression = match_expression(search)
+    if expression is None:
+        return querySet, ordering
+    return _fts_join(querySet, POST_FTS_TABLE, _POST_RANK_SQL, expression), ['search_rank', 'id']
+
+def _fts_join(querySet, table: str, rank_sql: str, expression: str):
+    # Join the FTS table once through the search_entry relation and read
+    # bm25() off the joined row. Ranking with a correlated subquery instead
+    # would run the MATCH again for every matching row, making a search
+    # quadratic in its matches.
+    querySet = querySet.filter(
+        RawSQL(f'{table} MATCH %s', (expression,), output_field=BooleanField()),
+        search_entry__isnull=False,
+    )
+    # bm25() is lower for better matches, so ascending order is best first
+    return querySet.annotate(search_rank=RawSQL(rank_sql, (), output_field=FloatField()))
+
+# Activities are indexed with their tag names folded into a third column, so
+# a tag search is an FTS lookup instead of a LIKE over core_tag. Because tags
+# live in another table this is a regular (self-contained) FTS5 table, and
+# every trigger that touches a super's indexed text rewrites its whole row.
+def _refresh_super_sql(super_id: str) -> str:
+    return f"""
+        DELETE FROM {SUPER_FTS_TABLE} WHERE rowid = {super_id};
+        INSERT INTO {SUPER_FTS_TABLE}(rowid, name, description, tags)
+        SELECT s.id, s.name, s.description, (
+            SELECT group_concat(t.tag, ' ') FROM core_super_tags st
+            JOIN core_tag t ON t.id = st.tag_id WHERE st.super_id = s.id
+        ) FROM core_super s WHERE s.id = {super_id};
+    """
+
+_SUPER_INDEX_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SUPER_FTS_TABLE} USING fts5(
+        name, description, tags,
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SUPER_FTS_TABLE}_ai AFTER INSERT ON core_super BEGIN
+        {_refresh_super_sql('new.id')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SUPER_FTS_TABLE}_au AFTER UPDATE OF name, description ON core_super BEGIN
+        {_refresh_super_sql('new.id')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SUPER_FTS_TABLE}_ad AFTER DELETE ON core_super BEGIN
+        DELETE FROM {SUPER_FTS_TABLE} WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SUPER_FTS_TABLE}_tags_ai AFTER INSERT ON core_super_tags BEGIN
+        {_refresh_super_sql('new.super_id')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SUPER_FTS_TABLE}_tags_ad AFTER DELETE ON core_super_tags BEGIN
+        {_refresh_super_sql('old.super_id')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SUPER_FTS_TABLE}_tag_au AFTER UPDATE OF tag ON core_tag BEGIN
+        DELETE FROM {SUPER_FTS_TABLE} WHERE rowid IN (
+            SELECT super_id FROM core_super_tags WHERE tag_id = new.id
+        );
+        INSERT INTO {SUPER_FTS_TABLE}(rowid, name, description, tags)
+        SELECT s.id, s.name, s.description, (
+            SELECT group_concat(t.tag, ' ') FROM core_super_tags st
+            JOIN core_tag t ON t.id = st.tag_id WHERE st.super_id = s.id
+        ) FROM core_super s
+        WHERE s.id IN (SELECT super_id FROM core_super_tags WHERE tag_id = new.id);
+    END
+    """,
+]
+
+_DROP_SUPER_TRIGGERS_SQL = [
+    f'DROP TRIGGER IF EXISTS {SUPER_FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {SUPER_FTS_TABLE}_au',
+    f'DROP TRIGGER IF EXISTS {SUPER_FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {SUPER_FTS_TABLE}_tags_ai',
+    f'DROP TRIGGER IF EXISTS {SUPER_FTS_TABLE}_tags_ad',
+    f'DROP TRIGGER IF EXISTS {SUPER_FTS_TABLE}_tag_au',
+]
+
+_DROP_SUPER_INDEX_SQL = _DROP_SUPER_TRIGGERS_SQL + [
+    f'DROP TABLE IF EXISTS {SUPER_FTS_TABLE}',
+]
+
+_SUPER_REBUILD_SQL = f"""
+    INSERT INTO {SUPER_FTS_TABLE}(rowid, name, description, tags)
+    SELECT s.id, s.name, s.description, (
+        SELECT group_concat(t.tag, ' ') FROM core_super_tags st
+        JOIN core_tag t ON t.id = st.tag_id WHERE st.super_id = s.id
+    ) FROM core_super s
+"""
+
+# A name hit beats a tag hit, which beats a description hit
+_SUPER_RANK_SQL = f'bm25({SUPER_FTS_TABLE}, 3.0, 1.0, 2.0)'
+
+def install_super_index(conn=None, rebuild: bool = False, triggers: bool = True):
+    """
+    Create the activity FTS table and the triggers that keep it in sync
+
+    Safe to call repeatedly.
+
+    Args:
+        conn: Database connection, defaults to the default connection
+        rebuild: Re-read every activity into the index afterwards
+        triggers: Also create the triggers; migrations leave them to the
+                  post_migrate handler, see reinstall_search_triggers()
+    """
+    conn = conn or connection
+    if not fts_available(conn):
+        return
+    with conn.cursor() as cursor:
+        # The first statement creates the table, the rest are triggers
+        for sql in _SUPER_INDEX_SQL if triggers else _SUPER_INDEX_SQL[:1]:
+            cursor.execute(sql)
+        if rebuild:
+            cursor.execute(f'DELETE FROM {SUPER_FTS_TABLE}')
+            cursor.execute(_SUPER_REBUILD_SQL)
+
+def rebuild_super_index(conn=None):
+    """Drop and recreate the activity FTS index and triggers from scratch"""
+    conn = conn or connection
+    if not fts_available(conn):
+        return
+    with conn.cursor() as cursor:
+        for sql in _DROP_SUPER_INDEX_SQL:
+            cursor.execute(sql)
+    install_super_index(conn, rebuild=True)
+
+# The triggers are raw SQL that Django's schema editor doesn't know about,
+# and a migration that rebuilds core_post, core_super, core_super_tags or
+# core_tag on SQLite either drops them silently or fails on them (the
+# activity triggers reference those tables across each other, which breaks
+# the rename step of a rebuild). Instead of every such migration working
+# around them, the pre_migrate and post_migrate handlers in signals.py take
+# them down for the whole run of core's migrations.
+def drop_search_triggers(conn=None) -> bool:
+    """
+    Drop the triggers behind both search indexes, leaving the indexes alone
+
+    Returns:
+        bool: Whether there were any triggers to drop
+    """
+    conn = conn or connection
+    if not fts_available(conn):
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' "
+            f"AND (name LIKE '{POST_FTS_TABLE}_%' OR name LIKE '{SUPER_FTS_TABLE}_%')"
+        )
+        (dropped,) = cursor.fetchone()
+        for sql in _DROP_POST_TRIGGERS_SQL + _DROP_SUPER_TRIGGERS_SQL:
+            cursor.execute(sql)
+    return dropped > 0
+
+def reinstall_search_triggers(conn=None, reindex: bool = True):
+    """
+    Recreate the search triggers, and reindex whatever changed without them
+
+    Indexes whose table doesn't exist, e.g. after migrating back past the
+    migration that creates it, are left alone.
+
+    Args:
+        conn: Database connection, defaults to the default connection
+        reindex: Re-read every post and activity into the indexes. Only
+                 needed if writes may have happened while the triggers
+                 were down.
+    """
+    conn = conn or connection
+    if not fts_available(conn):
+        return
+    tables = set(conn.introspection.table_names())
+    if POST_FTS_TABLE in tables:
+        install_post_index(conn, rebuild=reindex)
+    if SUPER_FTS_TABLE in tables:
+        install_super_index(conn, rebuild=reindex)
+
+def search_supers(querySet, search: str) -> Tuple[object, List[str]]:
+    """
+    Restrict a Super queryset to activities matching search, ranked by relevance
+
+    Name, description and tag names are all matched through the FTS5 index.
+    Other backends fall back to substring matches ordered by id.
+
+    Args:
+        querySet: The Super queryset to filter
+        search: Free text from the client
+
+    Returns:
+        tuple: (filtered queryset, keyset ordering for it)
+    """
+    if not fts_available():
+        return (
+            querySet.filter(
+                Q(name__icontains=search) |
+                Q(description__icontains=search) |
+                Q(tags__tag__icontains=search)
+            ).distinct(),
+            ['id'],
+        )
+
+    expression = match_expression(search)
+    if expression is None:
+        return querySet, ['id']
+
+    return _fts_join(querySet, SUPER_FTS_TABLE, _SUPER_RANK_SQL, expression), ['search_rank', 'id']
+
+# Highest code point, used as the exclusive upper bound of a prefix range
+PREFIX_END = '\U0010ffff'
+
+def normalize_name(value: str) -> str:
+    """Lowercase, strip accents and collapse whitespace for name matching"""
+    value = unicodedata.normalize('NFKD', value or '')
+    value = ''.join(ch for ch in value if not unicodedata.combining(ch))
+    return ' '.join(value.casefold().split())
+
+def user_search_terms(username: str, display_name: str) -> List[Tuple[str, int]]:
+    """
+    Build the (term, kind) rows indexed for one user
+
+    Args:
+        username: The user's username
+        display_name: The user's display name
+
+    Returns:
+        list: Distinct (term, UserSearchTerm.Kind) pairs
+    """
+    from .models import UserSearchTerm
+    Kind = UserSearchTerm.Kind
+
+    username = normalize_name(username)
+    display_name = normalize_name(display_name)
+    words = re.findall(r'\w+', display_name)
+
+    terms = set()
+    if username:
+        terms.add((username, Kind.USERNAME))
+    if display_name:
+        terms.add((display_name, Kind.DISPLAY_NAME))
+    for word in words:
+        terms.add((word, Kind.DISPLAY_NAME))
+    for word in [username] + words:
+        for start in range(1, len(word)):
+            terms.add((word[start:], Kind.INFIX))
+    return [(term[:150], kind) for term, kind in terms]
+
+def index_user(user):
+    """Rewrite the search terms for a single user"""
+    from .models import UserSearchTerm
+    UserSearchTerm.objects.filter(user=user).delete()
+    UserSearchTerm.objects.bulk_create([
+        UserSearchTerm(user=user, term=term, kind=kind)
+        for term, kind in user_search_terms(user.username, user.display_name)
+    ])
+
+def index_users(users, batch_size: int = 1000):
+    """Rewrite the search terms for many users with one delete and bulk inserts"""
+    from .models import UserSearchTerm
+    users = list(users)
+    for start in range(0, len(users), batch_size):
+        batch = users[start:start + batch_size]
+        UserSearchTerm.objects.filter(user__in=[user.id for user in batch]).delete()
+        UserSearchTerm.objects.bulk_create([
+            UserSearchTerm(user_id=user.id, term=term, kind=kind)
+            for user in batch
+            for term, kind in user_search_terms(user.username, user.display_name)
+        ])
+
+def rebuild_user_index(batch_size: int = 1000) -> int:
+    """
+    Recreate every user's search terms from scratch
+
+    Args:
+        batch_size: Users to index per bulk insert
+
+    Returns:
+        int: Number of users indexed
+    """
+    from .models import User, UserSearchTerm
+    UserSearchTerm.objects.all().delete()
+    count = 0
+    rows = []
+    for user_id, username, display_name in User.objects.order_by('id').values_list(
+            'id', 'username', 'display_name').iterator(chunk_size=batch_size):
+        rows += [
+            UserSearchTerm(user_id=user_id, term=term, kind=kind)
+            for term, kind in user_search_terms(username, display_name)
+        ]
+        count += 1
+        if count % batch_size == 0:
+            UserSearchTerm.objects.bulk_create(rows, batch_size=batch_size)
+            rows = []
+    UserSearchTerm.objects.bulk_create(rows, batch_size=batch_size)
+    return count
+
+async def asearch_users(search: str, limit: int = 10) -> list:
+    """
+    Find users by username or display name, best matches first
+
+    Results come in tiers: username matches, then display name matches,
+    then substring matches, with exact terms ahead of longer prefixes in
+    each tier. Every tier is a LIMITed range scan over the
+    (kind, term, user) index, so the cost is bounded by the page size and
+    not by the number of users. Tiers are read one after another, stopping
+    at the first that fills the page.
+
+    Args:
+        search: Free text from the search box
+        limit: Maximum number of users to return
+
+    Returns:
+        list: User instances
+    """
+    from .models import User, UserSearchTerm
+
+    q = normalize_name(search)
+    if not q:
+        return [user async for user in User.objects.order_by('id')[:limit]]
+
+    user_ids = []
+    for kind in UserSearchTerm.Kind.values:
+        user_ids = _merge_tier(user_ids, [user_id async for user_id in _tier_query(kind, q, limit)])
+        if len(user_ids) >= limit:
+            break
+
+    user_ids = user_ids[:limit]
+    users = await User.objects.ain_bulk(user_ids)
+    return [users[user_id] for user_id in user_ids if user_id in users]
+
+def _tier_query(kind: int, q: str, limit: int):
+    from .models import UserSearchTerm
+    # A user can match several terms of the same kind (e.g. many
+    # suffixes), so read a few extra rows to fill the page after dedup
+    return UserSearchTerm.objects.filter(
+        kind=kind, term__gte=q, term__lt=q + PREFIX_END,
+    ).order_by('term', 'user_id').values_list('user_id', flat=True)[:limit * 5]
+
+def _merge_tier(user_ids: list, rows) -> list:
+    for user_id in rows:
+        if user_id not in user_ids:
+            user_ids.append(user_id)
+    return user_ids
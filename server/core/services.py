@@ -1,13 +1,20 @@
 # Business logic
 from typing import List
-from django.db import transaction
-from django.contrib.auth import login, logout
+from django.db import connection, transaction
+from django.middleware.csrf import rotate_token
 from django.contrib.auth.password_validation import validate_password
-from django.core.exceptions import ValidationError
-from .models import Super, User, Project, Link, Tag, Event, Club, Post, Like
+from django.core.exceptions import PermissionDenied, ValidationError
+from .cache import FEED, SUPERS, bump_versions, post_key, super_key
+from .routers import use_replica
+from .tokens import issue_token, revoke_token
+from .pagination import MAX_PAGE_SIZE, akeyset_page, decode_cursor, encode_cursor, keyset_page, parse_limit
+from .search import PREFIX_END, search_posts, search_supers
+from .models import Super, User, Project, Link, Tag, Event, Club, Post, Like, Comment, PostHotScore, TimelineEntry
+from . import hot
 from datetime import datetime
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import F, Q, Count, Exists, OuterRef, Prefetch, Subquery, Value, Window, aprefetch_related_objects, prefetch_related_objects
+from django.db.models.functions import Abs, Coalesce, Exp, Greatest, Ln, RowNumber
 
 class UserService:
     @staticmethod
@@ -51,111 +58,488 @@ class UserService:
     @staticmethod
     def login_user(request, user: User):
         """
-        Log in a user and create a session
+        Log in a user and issue an authentication token
         
         Args:
             request: The HTTP request object
             user: The authenticated user instance
             
         Returns:
-            dict: User data including authentication token if used
-
-        Raises:
-            ValidationError: If login fails
+            dict: User data and the signed authentication token (see core.tokens)
         """
-        try:
-            # Log the user in (validates with HTTP session storage)
-            login(request, user)
-
-            return {
-                'user': user.to_dict()
-            }
-        except Exception as e:
-            raise ValidationError('login failed. Please try again.')
+        # A fresh CSRF token for the new login, which also sets the cookie
+        # the web client echoes back on writes
+        rotate_token(request)
+        user.last_login = timezone.now()
+        user.save(update_fields=['last_login'])
+        
+        return {
+            'user': user.to_dict(),
+            'token': issue_token(user),
+        }
         
     @staticmethod
     def logout_user(request):
         """
-        Log out a user and destroy the session
+        Log out a user by revoking the token the request came with
+        
+        Only this device is logged out, tokens held by the user's other
+        devices keep working.
         
         Args:
             request: The HTTP request object
-            
-        Returns:
-            dict: User data including authentication token if used
         """
-        try:
-            # Log the user out (validates with HTTP session storage)
-            logout(request)
-        except Exception as e:
-            raise ValidationError('logout failed. Please try again.')
+        revoke_token(request.user, request.auth)
         
 class PostService:
+    # Rows per database round trip when streaming a user's posts or likes
+    EXPORT_CHUNK_SIZE = 500
+    # Most comments ?comments=N inlines per post
+    COMMENT_PREVIEW_MAX = 10
+    
     @staticmethod
-    def get_multiple_posts(request):
+    @use_replica
+    async def aget_multiple_posts(params, user):
         """
         Get multiple posts based on query parameters
         
+        Pages are keyset paginated: pass the previous page's next_cursor as
+        ?cursor= to continue. ?search= goes through the full-text index and
+        orders results by relevance. ?feed=following switches to the
+        requesting user's timeline (see TimelineService). The exact total is
+        only counted when asked for with ?total=exact, since it costs a scan
+        of every matching post.
+        ?comments=N inlines each post's latest N comments (see
+        attach_comment_previews()).
+        
         Args:
-            request: The HTTP request object
+            params: The request's query parameters
+            user: The requesting user (may be anonymous)
             
         Returns:
             dict: Posts data
         """
-        try:
-            search: str = request.query_params.get("search", "")
-            tag_list: List[str] = request.query_params.getlist("tag", [])
-            type: str = request.query_params.get("type", "")
-            offset: int = int(request.query_params.get('offset', 0))
-            limit: int = int(request.query_params.get('limit', 10))
+        if params.get("feed", "") == "following":
+            return await TimelineService.aget_following(params, user)
+        
+        previews = PostService.preview_size(params)
+        querySet, ordering, cursor, limit = PostService.posts_query(params, user)
+        total = None
+        if params.get("total", "") == "exact":
+            total = await querySet.acount()
+        results, next_cursor = await akeyset_page(querySet, ordering, cursor, limit)
+        page = PostService.posts_page(results, next_cursor, limit, total, user)
+        await PostService.aattach_comment_previews(page['posts'], previews)
+        return page
+    
+    @staticmethod
+    def posts_query(params, user):
+        """
+        Build the filtered, ordered post queryset for a feed request
+        
+        Args:
+            params: The request's query parameters
+            user: The requesting user (may be anonymous)
+        
+        Returns:
+            tuple: (querySet, ordering, cursor, limit) for keyset_page()
+        """
+        search: str = params.get("search", "")
+        tag_list: List[str] = params.getlist("tag", [])
+        type: str = params.get("type", "")
+        cursor: str = params.get("cursor", "")
+        limit: int = parse_limit(params.get('limit'))
 
-            querySet = Post.objects.all()
-            
-            if request.query_params.get("order", "") == "reverse":
-                querySet = querySet.order_by('-id')
+        querySet = PostService.feed_queryset(Post.objects.all(), user)
+        
+        ordering = ['id']
+        if params.get("order", "") == "reverse":
+            ordering = ['-id']
+        elif params.get("order", "") == "hot":
+            # Hottest first, walking the (score, post) index of PostHotScore
+            querySet = querySet.filter(hot__isnull=False).select_related('hot')
+            ordering = ['-hot__score', '-hot__post_id']
 
-            if search:
-                querySet = querySet.filter(Q(title__icontains=search) | Q(text__icontains=search))
-            
-            if tag_list:
-                # Match all queries with at least one matching tag
-                querySet = querySet.filter(tag__tag__in=tag_list)
+        if search:
+            # Search results come back best match first, whatever the order,
+            # unless the text has no words to search for
+            querySet, ordering = search_posts(querySet, search, ordering)
+        
+        if tag_list:
+            # Match all queries with at least one matching tag
+            querySet = querySet.filter(tag__tag__in=tag_list)
 
-            if type == "project":
-                querySet = querySet.filter(project__isnull=False)
-            
-            if type == "event":
-                querySet = querySet.filter(event__isnull=False)
+        if type == "project":
+            querySet = querySet.filter(project__isnull=False)
+        
+        if type == "event":
+            querySet = querySet.filter(event__isnull=False)
 
-            if type == "club":
-                querySet = querySet.filter(club__isnull=False)
+        if type == "club":
+            querySet = querySet.filter(club__isnull=False)
 
-            if type == "misc":
-                querySet = querySet.filter(misc__isnull=False)
-            
-            # if no posts fit the filter, return None
-            results = None if querySet is None else querySet[offset: offset+limit]
-            
-            posts = []
-            for post in results:
-                post_dict = post.to_dict()
-                # Check if the request has a user and if that user is authenticated
-                if request.user.is_authenticated:
-                    # Add the "liked" field based on whether a Like exists for this post and user
-                    post_dict["liked"] = Like.objects.filter(post=post, user=request.user).exists()
-                posts.append(post_dict)
-            
-            return {
-                'posts': posts,
-                'pagination': {
-                    'total': querySet.count() if querySet is not None else 0,
-                    'offset': offset,
-                    'limit': limit
-                }
-            }
+        if type == "misc":
+            querySet = querySet.filter(misc__isnull=False)
+        
+        return querySet, ordering, cursor, limit
+    
+    @staticmethod
+    def posts_page(results, next_cursor, limit, total, user) -> dict:
+        """Shape a page of posts from posts_query() into the feed response"""
+        pagination = {
+            'next_cursor': next_cursor,
+            'limit': limit,
+        }
+        if total is not None:
+            pagination['total'] = total
+        
+        return {
+            'posts': PostService.serialize_posts(results, user),
+            'pagination': pagination,
+        }
+    
+    @staticmethod
+    def feed_queryset(querySet, user):
+        """
+        Prepare a post queryset so a whole page serializes in one query
+        
+        Joins the author and the attached project/event/club, and annotates
+        the viewer's own like (when logged in) so that to_dict() never has to
+        go back to the database per post.
+        
+        Args:
+            querySet: The Post queryset to decorate
+            user: The requesting user (may be anonymous)
             
-        except KeyError as e:
-            raise ValidationError(f'Missing required field: {str(e)}') from e
+        Returns:
+            QuerySet: The decorated queryset
+        """
+        querySet = querySet.select_related('user', 'project', 'event', 'club')
+        if user is not None and user.is_authenticated:
+            querySet = querySet.annotate(
+                liked=Exists(Like.objects.filter(post=OuterRef('pk'), user=user))
+            )
+        return querySet
+    
+    @staticmethod
+    def serialize_posts(posts, user) -> List[dict]:
+        """
+        Serialize posts from feed_queryset() into the feed JSON shape
+        
+        Args:
+            posts: Iterable of posts built with feed_queryset()
+            user: The requesting user (may be anonymous)
+            
+        Returns:
+            list: Post dicts, with a "liked" field for authenticated users
+        """
+        out = []
+        for post in posts:
+            post_dict = post.to_dict()
+            # Check if the request has a user and if that user is authenticated
+            if user is not None and user.is_authenticated:
+                post_dict["liked"] = post.liked
+            out.append(post_dict)
+        return out
+    
+    @staticmethod
+    def preview_size(params) -> int:
+        """
+        How many of each post's latest comments a request wants inlined
+        (?comments=N), clamped to COMMENT_PREVIEW_MAX; 0 when not asked for
+        
+        Raises:
+            ValidationError: If comments is not an integer
+        """
+        value = params.get('comments')
+        try:
+            size = int(value) if value not in (None, '') else 0
+        except (TypeError, ValueError):
+            raise ValidationError({'comments': 'comments must be an integer'})
+        return max(0, min(size, PostService.COMMENT_PREVIEW_MAX))
+    
+    @staticmethod
+    def comment_previews_query(post_ids, size: int):
+        """
+        The latest size comments of every post in post_ids, in one query
+        
+        ROW_NUMBER() OVER (PARTITION BY post ORDER BY id DESC) ranks each
+        post's comments newest first and only the top size are kept, so a
+        post with thousands of comments still sends back size rows.
+        Commenters are joined in.
+        
+        Returns:
+            QuerySet: Comments ordered by post, then oldest first
+        """
+        return Comment.objects.filter(post_id__in=post_ids).annotate(
+            rank=Window(RowNumber(), partition_by=F('post_id'), order_by=F('id').desc())
+        ).filter(rank__lte=size).select_related('user').order_by('post_id', 'id')
+    
+    @staticmethod
+    def attach_comment_previews(post_dicts: List[dict], size: int) -> List[dict]:
+        """
+        Add a "comments" list of each post's latest size comments, oldest
+        first, to serialized posts
+        
+        Args:
+            post_dicts: Posts from serialize_posts()
+            size: Comments per post; nothing is added when 0
+            
+        Returns:
+            list: post_dicts, changed in place
+        """
+        if size and post_dicts:
+            comments = PostService.comment_previews_query([post['id'] for post in post_dicts], size)
+            return PostService._add_previews(post_dicts, comments)
+        return post_dicts
+    
+    @staticmethod
+    async def aattach_comment_previews(post_dicts: List[dict], size: int) -> List[dict]:
+        """Async version of attach_comment_previews()"""
+        if size and post_dicts:
+            comments = PostService.comment_previews_query([post['id'] for post in post_dicts], size)
+            return PostService._add_previews(post_dicts, [comment async for comment in comments])
+        return post_dicts
+    
+    @staticmethod
+    def _add_previews(post_dicts, comments):
+        previews = {post['id']: [] for post in post_dicts}
+        for comment in comments:
+            previews[comment.post_id].append(comment.to_dict())
+        for post in post_dicts:
+            post['comments'] = previews[post['id']]
+        return post_dicts
+    
+    @staticmethod
+    def user_posts(username: str, viewer, chunk_size: int = EXPORT_CHUNK_SIZE):
+        """
+        Every post a user wrote, oldest first, serialized as they are read
+        
+        Rows come from the database chunk_size at a time, so memory stays
+        flat however many posts there are.
+        
+        Args:
+            username: Whose posts
+            viewer: The requesting user, for the "liked" flags
+            chunk_size: Rows fetched per database round trip
+            
+        Returns:
+            iterator: Post dicts, as serialize_posts() makes them
+        """
+        posts = PostService.user_posts_query(username, viewer).order_by('id')
+        for post in posts.iterator(chunk_size=chunk_size):
+            yield from PostService.serialize_posts([post], viewer)
+    
+    @staticmethod
+    def user_posts_page(username: str, viewer, cursor: str, limit: int, previews: int = 0):
+        """
+        One page of the posts a user wrote, oldest first, in one query, plus
+        one for the latest previews comments of each when asked for
+        
+        Returns:
+            tuple: (post dicts, cursor for the next page or None)
+        """
+        results, next_cursor = keyset_page(PostService.user_posts_query(username, viewer), ['id'], cursor, limit)
+        posts = PostService.serialize_posts(results, viewer)
+        return PostService.attach_comment_previews(posts, previews), next_cursor
+    
+    @staticmethod
+    def user_posts_query(username: str, viewer):
+        return PostService.feed_queryset(Post.objects.filter(user__username=username), viewer)
+    
+    @staticmethod
+    def liked_posts(username: str, chunk_size: int = EXPORT_CHUNK_SIZE):
+        """
+        Every post a user liked, in the order they liked them, serialized as
+        they are read chunk_size rows at a time
+        
+        Returns:
+            iterator: Post to_dict() results
+        """
+        likes = PostService.liked_posts_query(username).order_by('id')
+        for like in likes.iterator(chunk_size=chunk_size):
+            yield like.post.to_dict()
+    
+    @staticmethod
+    def liked_posts_page(username: str, cursor: str, limit: int):
+        """
+        One page of the posts a user liked, in the order they liked them,
+        in one query
+        
+        Returns:
+            tuple: (post dicts, cursor for the next page or None)
+        """
+        likes, next_cursor = keyset_page(PostService.liked_posts_query(username), ['id'], cursor, limit)
+        return [like.post.to_dict() for like in likes], next_cursor
+    
+    @staticmethod
+    def liked_posts_query(username: str):
+        return Like.objects.filter(user__username=username).select_related(
+            'post__user', 'post__project', 'post__event', 'post__club'
+        )
+    
+    @staticmethod
+    def comments_page(post_id, cursor: str, limit: int):
+        """
+        One page of a post's comments, oldest first, in one query
+        
+        Returns:
+            tuple: (comment dicts, cursor for the next page or None)
+        """
+        comments = Comment.objects.filter(post_id=post_id).select_related('user')
+        comments, next_cursor = keyset_page(comments, ['id'], cursor, limit)
+        return [comment.to_dict() for comment in comments], next_cursor
+    
+    @staticmethod
+    def reconcile_counters(batch_size: int = 1000, fix: bool = True):
+        """
+        Recompute Post.like_count and Post.comment_count from the source tables
+        
+        Walks the posts table in primary key order, batch_size posts at a time,
+        so it can run against a live database without one huge transaction.
+        
+        Args:
+            batch_size: Number of posts to check per batch
+            fix: Write the recomputed counts back when they have drifted
+            
+        Returns:
+            dict: 'checked' post count and a 'drift' list of
+                  (post_id, field, stored, actual) tuples
+        """
+        checked = 0
+        drift = []
+        last_id = 0
+        while True:
+            batch = list(
+                Post.objects.filter(id__gt=last_id).order_by('id')
+                .values_list('id', 'like_count', 'comment_count')[:batch_size]
+            )
+            if not batch:
+                break
+            ids = [row[0] for row in batch]
+            last_id = ids[-1]
+            likes = dict(
+                Like.objects.filter(post_id__in=ids).order_by().values('post_id')
+                .annotate(total=Count('*')).values_list('post_id', 'total')
+            )
+            comments = dict(
+                Comment.objects.filter(post_id__in=ids).order_by().values('post_id')
+                .annotate(total=Count('*')).values_list('post_id', 'total')
+            )
+            
+            stale = []
+            for post_id, like_count, comment_count in batch:
+                actual_likes = likes.get(post_id, 0)
+                actual_comments = comments.get(post_id, 0)
+                if like_count != actual_likes:
+                    drift.append((post_id, 'like_count', like_count, actual_likes))
+                if comment_count != actual_comments:
+                    drift.append((post_id, 'comment_count', comment_count, actual_comments))
+                if like_count != actual_likes or comment_count != actual_comments:
+                    stale.append(Post(id=post_id, like_count=actual_likes, comment_count=actual_comments))
+            
+            if fix and stale:
+                with transaction.atomic():
+                    Post.objects.bulk_update(stale, ['like_count', 'comment_count'])
+            checked += len(batch)
+        
+        return {'checked': checked, 'drift': drift}
+    
+    @staticmethod
+    def like_post(user: User, post_id) -> bool:
+        """
+        Like a post, unless the user already has
+        
+        The row is written by a single INSERT ... ON CONFLICT DO NOTHING
+        against the (post, user) unique constraint, so double taps and
+        concurrent requests can't add a second like. The counter and the feed
+        cache are only touched when a row was actually inserted.
+        
+        Args:
+            user: Who likes the post
+            post_id: The post's id
+            
+        Returns:
+            bool: Whether a like was added
+            
+        Raises:
+            ValidationError: If post_id isn't an id
+            Post.DoesNotExist: If there is no such post
+        """
+        post_id = Post._meta.pk.to_python(post_id)
+        like_table = connection.ops.quote_name(Like._meta.db_table)
+        post_table = connection.ops.quote_name(Post._meta.db_table)
+        today = timezone.localdate()
+        time_stamp = Like._meta.get_field('time_stamp').get_db_prep_save(today, connection)
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                # Selecting from the post table inserts nothing for a missing post
+                cursor.execute(
+                    f'INSERT INTO {like_table} (post_id, user_id, time_stamp) '
+                    f'SELECT id, %s, %s FROM {post_table} WHERE id = %s '
+                    'ON CONFLICT (post_id, user_id) DO NOTHING RETURNING id',
+                    [user.id, time_stamp, post_id],
+                )
+                added = cursor.fetchone() is not None
+            if added:
+                Post.objects.filter(id=post_id).update(like_count=F('like_count') + 1)
+                HotService.add_event(post_id, hot.LIKE_WEIGHT, today)
+                bump_versions(post_key(post_id))
+        
+        if not added and not Post.objects.filter(id=post_id).exists():
+            raise Post.DoesNotExist('Post not found')
+        return added
+    
+    @staticmethod
+    def unlike_post(user: User, post_id) -> bool:
+        """
+        Take back a user's like of a post, if there is one
+        
+        A single DELETE; the counter and the feed cache are only touched when
+        a row was actually removed.
+        
+        Returns:
+            bool: Whether a like was removed
+            
+        Raises:
+            ValidationError: If post_id isn't an id
+        """
+        post_id = Post._meta.pk.to_python(post_id)
+        with transaction.atomic():
+            removed, _ = Like.objects.filter(post_id=post_id, user=user).delete()
+            if removed:
+                # A counter that has drifted to 0 stays there instead of
+                # failing its CHECK constraint; reconcile_post_counters fixes it
+                Post.objects.filter(id=post_id, like_count__gt=0).update(like_count=F('like_count') - 1)
+                HotService.refresh([post_id])
+                bump_versions(post_key(post_id))
+        return bool(removed)
+    
+    @staticmethod
+    def liked_post_ids(user: User, post_ids) -> List[int]:
+        """
+        Which of the given posts the user has liked, in one indexed query
+        
+        Args:
+            user: The viewer
+            post_ids: Up to MAX_PAGE_SIZE post ids
+            
+        Returns:
+            list: The liked post ids, ascending
+            
+        Raises:
+            ValidationError: If post_ids isn't a list of ids, or is too long
+        """
+        if not isinstance(post_ids, list):
+            raise ValidationError({'posts': 'posts must be a list of post ids'})
+        if len(post_ids) > MAX_PAGE_SIZE:
+            raise ValidationError({'posts': f'At most {MAX_PAGE_SIZE} posts at a time'})
+        ids = {Post._meta.pk.to_python(post_id) for post_id in post_ids}
+        if not ids:
+            return []
+        return list(
+            Like.objects.filter(user=user, post_id__in=ids).order_by('post_id').values_list('post_id', flat=True)
+        )
     
     @staticmethod
     @transaction.atomic
@@ -212,12 +596,712 @@ class PostService:
                 misc=misc,
             )
             post.save()
+            TimelineService.fan_out(post)
+            HotService.add_posts([post])
+            bump_versions(FEED)
             return post
         
         except ValidationError as e:
                 raise ValidationError({'post': e.messages})
+    
+    # Most posts accepted by one create_posts() call
+    MAX_BATCH_SIZE = 100
+    # Post field -> the Super model it references
+    SUPER_FIELDS = {'project': Project, 'event': Event, 'club': Club, 'misc': Super}
+    
+    @staticmethod
+    def create_posts(user: User, items: list) -> list:
+        """
+        Create many posts at once
+        
+        Every referenced Super is looked up with one IN query per type and
+        all valid posts are inserted together in one transaction. Invalid
+        items don't stop the others from being created.
+        
+        Args:
+            user: The author of every post
+            items: Post data dicts, as accepted by create_a_post
+        
+        Returns:
+            list: One result per item, in order: {'index', 'post'} when it
+                  was created or {'index', 'errors'} when it was not
+        
+        Raises:
+            ValidationError: If items isn't a list of 1 to MAX_BATCH_SIZE posts
+        """
+        if not isinstance(items, list) or not items:
+            raise ValidationError({'posts': 'Expected a non-empty list of posts'})
+        if len(items) > PostService.MAX_BATCH_SIZE:
+            raise ValidationError({'posts': f'At most {PostService.MAX_BATCH_SIZE} posts per batch'})
+        
+        # Collect the referenced ids per type first, so each type is one query
+        wanted = {field: set() for field in PostService.SUPER_FIELDS}
+        errors = [{} for _ in items]
+        for index, data in enumerate(items):
+            if not isinstance(data, dict):
+                errors[index]['post'] = ['Expected an object']
+                continue
+            for field in PostService.SUPER_FIELDS:
+                if data.get(field):
+                    try:
+                        wanted[field].add(int(data[field]))
+                    except (TypeError, ValueError):
+                        errors[index][field] = [f'Invalid {field} id']
+        found = {
+            field: model.objects.in_bulk(wanted[field]) if wanted[field] else {}
+            for field, model in PostService.SUPER_FIELDS.items()
+        }
+        
+        posts = []
+        for index, data in enumerate(items):
+            if errors[index]:
+                continue
+            contentType = data.get('contentType', 'TEXT')
+            text = data.get('text') if contentType == 'TEXT' else None
+            image_url = data.get('image_url') if contentType == 'IMAGE' else None
+            post = Post(
+                title=data.get('title', ''),
+                user=user,
+                text=text,
+                image_url=image_url,
+                contentType=Post.PostType.TEXT if text else Post.PostType.IMAGE,
+            )
+            for field in PostService.SUPER_FIELDS:
+                if data.get(field):
+                    instance = found[field].get(int(data[field]))
+                    if instance is None:
+                        errors[index][field] = [f'{field.capitalize()} {data[field]} does not exist']
+                    setattr(post, field, instance)
+            try:
+                post.full_clean(exclude=list(PostService.SUPER_FIELDS) + ['user'], validate_unique=False)
+            except ValidationError as e:
+                errors[index].update(e.message_dict)
+            if not errors[index]:
+                posts.append((index, post))
+        
+        if posts:
+            with transaction.atomic():
+                Post.objects.bulk_create([post for _, post in posts])
+                TimelineService.fan_out_many([post for _, post in posts])
+                HotService.add_posts([post for _, post in posts])
+                bump_versions(FEED)
+        
+        results = [{'index': index, 'errors': error} for index, error in enumerate(errors)]
+        for index, post in posts:
+            results[index] = {'index': index, 'post': post.to_dict()}
+        return results
          
+class TimelineService:
+    # Supers with more followers than this are read at query time (pull)
+    # instead of being copied into every follower's timeline (push)
+    FANOUT_LIMIT = 1000
+    # How much of a Super's history a new follower gets in their timeline
+    BACKFILL_POSTS = 200
+    
+    @staticmethod
+    def fan_out(post: Post):
+        """
+        Copy a new post into the timeline of everyone following its Supers
+        
+        Supers over FANOUT_LIMIT followers are skipped; aget_following()
+        pulls their posts directly instead.
+        
+        Args:
+            post: The newly created post
+        """
+        TimelineService.fan_out_many([post])
+    
+    @staticmethod
+    def fan_out_many(posts: List[Post]):
+        """
+        fan_out() for many new posts, with a fixed number of queries
+        
+        Args:
+            posts: The newly created posts
+        """
+        post_supers = {
+            post.id: {
+                super_id for super_id in (post.project_id, post.event_id, post.club_id, post.misc_id)
+                if super_id is not None
+            }
+            for post in posts
+        }
+        super_ids = set().union(*post_supers.values())
+        if not super_ids:
+            return
+        
+        push_ids = Super.objects.filter(
+            id__in=super_ids, follower_count__lte=TimelineService.FANOUT_LIMIT
+        ).values('id')
+        followers = {}
+        for super_id, user_id in Super.followers.through.objects.filter(
+                super_id__in=push_ids).values_list('super_id', 'user_id'):
+            followers.setdefault(super_id, set()).add(user_id)
+        
+        entries = []
+        for post_id, supers in post_supers.items():
+            user_ids = set().union(*(followers.get(super_id, ()) for super_id in supers))
+            entries += [TimelineEntry(user_id=user_id, post_id=post_id) for user_id in user_ids]
+        TimelineEntry.objects.bulk_create(entries, batch_size=500, ignore_conflicts=True)
+    
+    @staticmethod
+    def followed(user_ids, super_ids):
+        """
+        Backfill timelines after users start following Supers
+        
+        The newest BACKFILL_POSTS posts of each Super still under
+        FANOUT_LIMIT are copied into each user's timeline, so following
+        shows a Super's recent history and not only what it posts next.
+        Larger Supers are pulled at read time and need nothing.
+        
+        Args:
+            user_ids: The users who now follow super_ids
+            super_ids: The Supers they follow
+        """
+        push_ids = Super.objects.filter(
+            id__in=super_ids, follower_count__lte=TimelineService.FANOUT_LIMIT
+        ).values_list('id', flat=True)
+        entries = []
+        for super_id in push_ids:
+            post_ids = TimelineService._super_posts([super_id]).order_by('-id').values_list(
+                'id', flat=True)[:TimelineService.BACKFILL_POSTS]
+            entries += [
+                TimelineEntry(user_id=user_id, post_id=post_id) for post_id in post_ids for user_id in user_ids
+            ]
+        TimelineEntry.objects.bulk_create(entries, batch_size=500, ignore_conflicts=True)
+    
+    @staticmethod
+    def unfollowed(user_ids, super_ids):
+        """
+        Take a Super's posts out of the timelines of users who stopped following it
+        
+        Posts that also belong to another Super the user still follows stay.
+        
+        Args:
+            user_ids: The users who no longer follow super_ids
+            super_ids: The Supers they stopped following
+        """
+        Follow = Super.followers.through
+        still_followed = Follow.objects.filter(
+            Q(super_id=OuterRef('post__project_id')) | Q(super_id=OuterRef('post__event_id')) |
+            Q(super_id=OuterRef('post__club_id')) | Q(super_id=OuterRef('post__misc_id')),
+            user_id=OuterRef('user_id'),
+        )
+        TimelineEntry.objects.filter(
+            user_id__in=user_ids, post__in=TimelineService._super_posts(super_ids)
+        ).exclude(Exists(still_followed)).delete()
+    
+    @staticmethod
+    def shrunk(super_ids):
+        """
+        Backfill the followers of Supers that fell back under FANOUT_LIMIT
+        
+        Their posts were pulled at read time while they were over the limit,
+        so none of those are in their followers' timelines yet.
+        """
+        Follow = Super.followers.through
+        for super_id in Super.objects.filter(
+                id__in=super_ids, follower_count__lte=TimelineService.FANOUT_LIMIT).values_list('id', flat=True):
+            user_ids = list(Follow.objects.filter(super_id=super_id).values_list('user_id', flat=True))
+            TimelineService.followed(user_ids, [super_id])
+    
+    @staticmethod
+    def _super_posts(super_ids):
+        return Post.objects.filter(
+            Q(project_id__in=super_ids) | Q(event_id__in=super_ids) |
+            Q(club_id__in=super_ids) | Q(misc_id__in=super_ids)
+        )
+    
+    @staticmethod
+    async def aget_following(params, user):
+        """
+        Get posts from the Supers the requesting user follows, newest first
+        
+        Merges the user's materialized timeline with posts pulled live from
+        the few very large Supers they follow. Both sides
+        are keyset range scans capped at one page, so deep pages cost the
+        same as page one.
+        
+        Args:
+            params: The request's query parameters
+            user: The requesting user
+        
+        Returns:
+            dict: Posts data
+        
+        Raises:
+            PermissionDenied: If the user isn't logged in
+        """
+        if not user.is_authenticated:
+            raise PermissionDenied('You must be logged in to see your timeline')
+        
+        cursor: str = params.get("cursor", "")
+        limit: int = parse_limit(params.get('limit'))
+        previews = PostService.preview_size(params)
+        before = decode_cursor(cursor, 1)[0] if cursor else None
+        
+        pushed_ids = [post_id async for post_id in TimelineService._pushed_ids(user, before, limit)]
+        pull_ids = [super_id async for super_id in TimelineService._pull_super_ids(user)]
+        pulled_ids = []
+        if pull_ids:
+            pulled_ids = [post_id async for post_id in TimelineService._pulled_ids(pull_ids, before, limit)]
+        results, next_cursor = TimelineService._page(set(pushed_ids) | set(pulled_ids), limit, user)
+        page = TimelineService._response([post async for post in results], next_cursor, limit, user)
+        await PostService.aattach_comment_previews(page['posts'], previews)
+        return page
+    
+    @staticmethod
+    def _pushed_ids(user, before, limit):
+        pushed = TimelineEntry.objects.filter(user=user)
+        if before is not None:
+            pushed = pushed.filter(post_id__lt=before)
+        return pushed.order_by('-post_id').values_list('post_id', flat=True)[:limit + 1]
+    
+    @staticmethod
+    def _pull_super_ids(user):
+        return user.super_users.filter(
+            follower_count__gt=TimelineService.FANOUT_LIMIT
+        ).values_list('id', flat=True)
+    
+    @staticmethod
+    def _pulled_ids(pull_ids, before, limit):
+        pulled = TimelineService._super_posts(pull_ids)
+        if before is not None:
+            pulled = pulled.filter(id__lt=before)
+        return pulled.order_by('-id').values_list('id', flat=True)[:limit + 1]
+    
+    @staticmethod
+    def _page(post_ids, limit, user):
+        # The merged ids of both sides, cut down to one page
+        page_ids = sorted(post_ids, reverse=True)[:limit + 1]
+        next_cursor = None
+        if len(page_ids) > limit:
+            page_ids = page_ids[:limit]
+            next_cursor = encode_cursor([page_ids[-1]])
+        
+        results = PostService.feed_queryset(Post.objects.filter(id__in=page_ids), user).order_by('-id')
+        return results, next_cursor
+    
+    @staticmethod
+    def _response(results, next_cursor, limit, user):
+        return {
+            'posts': PostService.serialize_posts(results, user),
+            'pagination': {
+                'next_cursor': next_cursor,
+                'limit': limit,
+            }
+        }
+
+class HotService:
+    """
+    Keeps the materialized PostHotScore table in step with likes and
+    comments; see core/hot.py for how scores are computed
+    """
+    @staticmethod
+    def add_posts(posts: List[Post]):
+        """Give new posts the score of just having been posted"""
+        PostHotScore.objects.bulk_create([
+            PostHotScore(post_id=post.id, score=hot.event_score(hot.POST_WEIGHT, post.created_at))
+            for post in posts
+        ], batch_size=500, ignore_conflicts=True)
+    
+    @staticmethod
+    def add_event(post_id: int, weight: float, when):
+        """
+        Log-add one like or comment onto a post's stored score
+        
+        A single UPDATE computing ln(e ** score + e ** event) in the database
+        as max + ln(1 + e ** -|score - event|), so concurrent events on the
+        same post can't overwrite each other.
+        
+        Args:
+            post_id: The post
+            weight: hot.LIKE_WEIGHT or hot.COMMENT_WEIGHT
+            when: When it happened (see hot.event_score())
+        """
+        event = Value(hot.event_score(weight, when))
+        PostHotScore.objects.filter(post_id=post_id).update(
+            score=Greatest(F('score'), event) + Ln(Value(1.0) + Exp(-Abs(F('score') - event)))
+        )
+    
+    @staticmethod
+    def refresh(post_ids) -> int:
+        """
+        Recompute the scores of some posts from their likes and comments
+        
+        Used where an event is taken back (an unlike), which can't be
+        subtracted from a log-space sum reliably, and by recompute().
+        Likes are read grouped by day, the resolution of Like.time_stamp.
+        
+        Args:
+            post_ids: The posts to rescore
+            
+        Returns:
+            int: Number of posts rescored
+        """
+        terms = {
+            post_id: [hot.event_score(hot.POST_WEIGHT, created_at)]
+            for post_id, created_at in Post.objects.filter(id__in=post_ids).values_list('id', 'created_at')
+        }
+        likes = (
+            Like.objects.filter(post_id__in=terms).order_by().values('post_id', 'time_stamp')
+            .annotate(total=Count('*')).values_list('post_id', 'time_stamp', 'total')
+        )
+        for post_id, time_stamp, total in likes:
+            terms[post_id].append(hot.event_score(total * hot.LIKE_WEIGHT, time_stamp))
+        comments = Comment.objects.filter(post_id__in=terms).values_list('post_id', 'created_at')
+        for post_id, created_at in comments.iterator():
+            terms[post_id].append(hot.event_score(hot.COMMENT_WEIGHT, created_at))
+        
+        PostHotScore.objects.bulk_create(
+            [PostHotScore(post_id=post_id, score=hot.combine(scores)) for post_id, scores in terms.items()],
+            batch_size=500, update_conflicts=True, unique_fields=['post'], update_fields=['score'],
+        )
+        return len(terms)
+    
+    @staticmethod
+    def recompute(batch_size: int = 1000) -> int:
+        """
+        Rebuild every post's score, batch_size posts per transaction
+        
+        Repairs drift (likes and comments written in bulk, posts created
+        before their score row) and adds rows for posts that have none.
+        
+        Returns:
+            int: Number of posts rescored
+        """
+        rescored = 0
+        last_id = 0
+        while True:
+            ids = list(
+                Post.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                return rescored
+            last_id = ids[-1]
+            with transaction.atomic():
+                rescored += HotService.refresh(ids)
+
+class TagService:
+    @staticmethod
+    def resolve(model, field: str, values) -> dict:
+        """
+        Map names to row ids, creating the rows that don't exist yet
+        
+        One IN query finds the existing rows and one conflict-ignoring bulk
+        insert adds the rest, so concurrent callers creating the same name
+        both end up with the single row the unique constraint allows.
+        
+        Args:
+            model: Tag or Link
+            field: The unique name column, 'tag' or 'link'
+            values: Names, duplicates and None are ignored
+        
+        Returns:
+            dict: name -> id
+        """
+        values = {value for value in values if value is not None}
+        if not values:
+            return {}
+        ids = dict(model.objects.filter(**{f'{field}__in': values}).values_list(field, 'id'))
+        missing = values - ids.keys()
+        if missing:
+            model.objects.bulk_create([model(**{field: value}) for value in missing], ignore_conflicts=True)
+            # ignore_conflicts leaves ids unset, and some may have been inserted concurrently
+            ids.update(model.objects.filter(**{f'{field}__in': missing}).values_list(field, 'id'))
+        return ids
+    
+    @staticmethod
+    def add_to_super(super: Super, links=(), tags=()):
+        """
+        Attach links and tags to a Super by name, creating missing ones
+        
+        Costs a fixed handful of queries however many names are given.
+        
+        Args:
+            super: The Super (or Project/Event/Club) to attach them to
+            links: Link URLs
+            tags: Tag names
+        """
+        for relation, model, field, values in [
+            (Super.links, Link, 'link', links),
+            (Super.tags, Tag, 'tag', tags),
+        ]:
+            ids = TagService.resolve(model, field, values)
+            if ids:
+                column = f'{field}_id'
+                relation.through.objects.bulk_create(
+                    [relation.through(super_id=super.id, **{column: id}) for id in ids.values()],
+                    ignore_conflicts=True,
+                )
+                if model is Tag:
+                    # bulk_create skips the m2m_changed handler that keeps these up to date
+                    TagService.recount(ids.values())
+    
+    # Tag counter -> the tag relation it counts
+    COUNTERS = {'post_count': Post.tag, 'super_count': Super.tags}
+    
+    @staticmethod
+    def _counts() -> dict:
+        return {
+            field: Coalesce(Subquery(
+                relation.through.objects.filter(tag_id=OuterRef('pk')).order_by().values('tag_id')
+                .annotate(total=Count('*')).values('total')
+            ), 0)
+            for field, relation in TagService.COUNTERS.items()
+        }
+    
+    @staticmethod
+    def adjust(field: str, tag_ids, delta: int) -> int:
+        """
+        Move one of the counters of some tags by delta, in one UPDATE
+        
+        Used by the signal handlers as tags are linked and unlinked. Never
+        goes below 0, so a counter that already drifted low stays usable
+        until rebuild_counts() repairs it.
+        
+        Args:
+            field: 'post_count' or 'super_count'
+            tag_ids: Ids of the tags to change, or a query of them
+            delta: Amount to add, negative to subtract
+            
+        Returns:
+            int: Number of tags updated
+        """
+        if not delta:
+            return 0
+        return Tag.objects.filter(id__in=tag_ids).update(**{field: Greatest(F(field) + delta, 0)})
+    
+    @staticmethod
+    def recount(tag_ids) -> int:
+        """
+        Recount Tag.post_count and Tag.super_count for some tags, in one UPDATE
+        
+        For code that writes tag links in bulk, which bypasses the
+        m2m_changed handler.
+        
+        Returns:
+            int: Number of tags updated
+        """
+        return Tag.objects.filter(id__in=list(tag_ids)).update(**TagService._counts())
+    
+    @staticmethod
+    def rebuild_counts(batch_size: int = 1000) -> dict:
+        """
+        Recount every tag's counters, batch_size tags at a time
+        
+        Only tags whose stored counts have drifted are written.
+        
+        Returns:
+            dict: 'checked' tag count and 'fixed' count of drifted tags
+        """
+        checked = 0
+        fixed = 0
+        last_id = 0
+        while True:
+            ids = list(Tag.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return {'checked': checked, 'fixed': fixed}
+            last_id = ids[-1]
+            drifted = Tag.objects.filter(id__in=ids).annotate(**{
+                f'actual_{field}': count for field, count in TagService._counts().items()
+            }).exclude(post_count=F('actual_post_count'), super_count=F('actual_super_count'))
+            fixed += Tag.objects.filter(id__in=drifted.values('id')).update(**TagService._counts())
+            checked += len(ids)
+    
+    @staticmethod
+    def tags_query(params):
+        """
+        Build the tag listing queryset from the request's query parameters
+        
+        Tags on no post or Super are left out. With ?prefix= the tags
+        starting with it come back alphabetically, through the unique index
+        on the name; otherwise the tags on the most posts come first,
+        through the (post_count, id) index.
+        
+        Returns:
+            tuple: (querySet, ordering, cursor, limit) for keyset_page()
+        """
+        prefix: str = params.get('prefix', '')
+        cursor: str = params.get('cursor', '')
+        limit: int = parse_limit(params.get('limit'), default=20)
+        
+        querySet = Tag.objects.filter(Q(post_count__gt=0) | Q(super_count__gt=0))
+        if prefix:
+            querySet = querySet.filter(tag__gte=prefix, tag__lt=prefix + PREFIX_END)
+            ordering = ['tag']
+        else:
+            ordering = ['-post_count', '-id']
+        return querySet, ordering, cursor, limit
+    
+    @staticmethod
+    @use_replica
+    async def alist_tags(params) -> dict:
+        """
+        One page of tags with how many posts and Supers carry each
+        
+        Args:
+            params: The request's query parameters (see tags_query())
+            
+        Returns:
+            dict: Tags and pagination data
+        """
+        querySet, ordering, cursor, limit = TagService.tags_query(params)
+        tags, next_cursor = await akeyset_page(querySet, ordering, cursor, limit)
+        return {
+            'tags': [
+                {'tag': tag.tag, 'posts': tag.post_count, 'supers': tag.super_count}
+                for tag in tags
+            ],
+            'pagination': {
+                'next_cursor': next_cursor,
+                'limit': limit,
+            }
+        }
+
 class SuperService:
+    # Subclass model for each Super.super_type that has its own table
+    ACTIVITY_MODELS = {
+        Super.SuperType.PROJECT: Project,
+        Super.SuperType.EVENT: Event,
+        Super.SuperType.CLUB: Club,
+    }
+    
+    async def asearch_activities(params):
+        """
+        Search projects, events and clubs together in one ranked list
+        
+        Matches against name, description and tags through the activity
+        search index, optionally narrowed with ?type=, and keyset paginated
+        with ?cursor= / ?limit= like the post feed. The per-type loads and
+        the follower/link/tag reads are one query each, however long the page.
+        
+        Args:
+            params: The request's query parameters
+            
+        Returns:
+            dict: Matching activities and pagination data
+        """
+        querySet, ordering, cursor, limit = SuperService.activities_query(params)
+        results, next_cursor = await akeyset_page(querySet, ordering, cursor, limit)
+        activities = await SuperService.aas_activities(results)
+        
+        return {
+            'activities': await SuperService.aserialize_supers(activities),
+            'pagination': {
+                'next_cursor': next_cursor,
+                'limit': limit,
+            }
+        }
+    
+    def activities_query(params):
+        """
+        Build the activity search queryset from the request's query parameters
+        
+        Returns:
+            tuple: (querySet, ordering, cursor, limit) for keyset_page()
+        """
+        search: str = params.get('search', '')
+        type: str = params.get('type', '')
+        cursor: str = params.get('cursor', '')
+        # Untyped searches used to return up to 10 of each type
+        limit: int = parse_limit(params.get('limit'), default=10 if type else 30)
+        
+        querySet = Super.objects.all()
+        if type in SuperService.ACTIVITY_MODELS:
+            querySet = querySet.filter(super_type=type)
+        else:
+            # Every type but plain Supers; unlike an IN over the activity
+            # types this walks the primary key in order instead of sorting
+            querySet = querySet.exclude(super_type=Super.SuperType.SUPER)
+        
+        ordering = ['id']
+        if search:
+            querySet, ordering = search_supers(querySet, search)
+        return querySet, ordering, cursor, limit
+    
+    # Batched relation reads shared by serialize_supers() and aserialize_supers()
+    SUPER_PREFETCHES = [
+        Prefetch('followers', queryset=User.objects.only('id')),
+        'links',
+        'tags',
+    ]
+    
+    def led_supers(username: str, chunk_size: int = PostService.EXPORT_CHUNK_SIZE):
+        """
+        Every Super a user leads, serialized as they are read
+        
+        Followers, links and tags are prefetched for each chunk of
+        chunk_size Supers, so memory stays flat however many there are.
+        
+        Returns:
+            iterator: Super to_dict() results
+        """
+        supers = Super.objects.filter(leader__username=username).order_by('id')
+        supers = supers.prefetch_related(*SuperService.SUPER_PREFETCHES)
+        for super in supers.iterator(chunk_size=chunk_size):
+            yield super.to_dict()
+    
+    def led_supers_page(username: str, cursor: str, limit: int):
+        """
+        One page of the Supers a user leads, with their relations prefetched
+        
+        Returns:
+            tuple: (Super dicts, cursor for the next page or None)
+        """
+        supers, next_cursor = keyset_page(Super.objects.filter(leader__username=username), ['id'], cursor, limit)
+        return SuperService.serialize_supers(supers), next_cursor
+    
+    def serialize_supers(supers) -> List[dict]:
+        """
+        Serialize many Supers (of any mix of types) with batched relation reads
+        
+        Produces exactly what calling to_dict() on each one would, but loads
+        followers, links and tags for the whole batch with one query each
+        instead of three queries per Super.
+        
+        Args:
+            supers: Iterable of Super/Project/Event/Club instances, or a queryset
+            
+        Returns:
+            list: One to_dict() result per Super, in order
+        """
+        supers = list(supers)
+        prefetch_related_objects(supers, *SuperService.SUPER_PREFETCHES)
+        return [super.to_dict() for super in supers]
+    
+    async def aserialize_supers(supers: List[Super]) -> List[dict]:
+        """Async version of serialize_supers()"""
+        await aprefetch_related_objects(supers, *SuperService.SUPER_PREFETCHES)
+        return [super.to_dict() for super in supers]
+    
+    async def aas_activities(supers: List[Super]) -> List[Super]:
+        """
+        Swap base Super rows for their Project/Event/Club instances
+        
+        Runs one primary key lookup per type present instead of one per row,
+        and keeps the input order.
+        
+        Args:
+            supers: Super instances, e.g. a page of search results
+            
+        Returns:
+            list: The matching subclass instances, in the same order
+        """
+        loaded = {super.id: super for super in supers}
+        for model, ids in SuperService._ids_by_model(supers).items():
+            loaded.update(await model.objects.ain_bulk(ids))
+        return [loaded[super.id] for super in supers]
+    
+    def _ids_by_model(supers):
+        ids_by_model = {}
+        for super in supers:
+            model = SuperService.ACTIVITY_MODELS.get(super.super_type)
+            if model is not None:
+                ids_by_model.setdefault(model, []).append(super.id)
+        return ids_by_model
+    
+    @transaction.atomic
     def create_project(user: User, data: dict):
         # Create a Project instance using the provided data.
         # We assume `data` contains "name" and "description".
@@ -229,23 +1313,14 @@ class SuperService:
                 active=data.get('active', True)
             )
             project.save()
-
-            links = data.get('links', [])
-            for link_url in links:
-                link_obj, created  = Link.objects.get_or_create(link=link_url)
-                project.links.add(link_obj)
-
-            tags = data.get('tags', [])
-            for tag_name in tags:
-                tag_obj, created = Tag.objects.get_or_create(tag=tag_name)
-                project.tags.add(tag_obj)
-
-            project.save()
+            TagService.add_to_super(project, data.get('links', []), data.get('tags', []))
+            bump_versions(super_key(project.id))
             return project
         
         except ValidationError as e:
                 raise ValidationError({'project': e.messages})
             
+    @transaction.atomic
     def create_event(user: User, data: dict):
         # Create a Project instance using the provided data.
         # We assume `data` contains "name" and "description".
@@ -258,30 +1333,19 @@ class SuperService:
                 end_time=datetime.fromisoformat(data.get('end_time', datetime.now().isoformat().replace("Z", "+00:00"))),
                 location=data.get('location', 'The University of Arizona')
             )
-                
-            event.save()
-
-            links = data.get('links', [])
-            for link_url in links:
-                link_obj, created = Link.objects.get_or_create(link=link_url)
-                event.links.add(link_obj)
-            
-            tags = data.get('tags', [])
-            for tag_name in tags:
-                tag_obj, created = Tag.objects.get_or_create(tag=tag_name)
-                event.tags.add(tag_obj)
-                
             club_id = data.get('club_ref')
-            if club_id and Club.objects.filter(id=club_id).exists():
-                club = Club.objects.get(id=club_id)
-                event.club_ref = club
-
+            if club_id:
+                event.club_ref = Club.objects.filter(id=club_id).first()
+                
             event.save()
+            TagService.add_to_super(event, data.get('links', []), data.get('tags', []))
+            bump_versions(super_key(event.id))
             return event
         
         except ValidationError as e:
                 raise ValidationError({'project': e.messages})
             
+    @transaction.atomic
     def create_club(user: User, data: dict):
         try:
             club = Club(
@@ -290,18 +1354,8 @@ class SuperService:
                 description=data.get('description', ''),
             )
             club.save()
-
-            links = data.get('links', [])
-            for link_url in links:
-                link_obj, created = Link.objects.get_or_create(link=link_url)
-                club.links.add(link_obj)
-
-            tags = data.get('tags', [])
-            for tag_name in tags:
-                tag_obj, created = Tag.objects.get_or_create(tag=tag_name)
-                club.tags.add(tag_obj)
-
-            club.save()
+            TagService.add_to_super(club, data.get('links', []), data.get('tags', []))
+            bump_versions(super_key(club.id))
             return club
         
         except ValidationError as e:
@@ -316,6 +1370,8 @@ class SuperService:
                 project.description = data.get('description',project.description)
                 project.active = data.get('active',project.active)
                 project.save()
+                # Names also show on cached posts
+                bump_versions(super_key(project.id), SUPERS)
                 return project
 
             except ValidationError as e:
@@ -329,6 +1385,8 @@ class SuperService:
             event.name = data.get('name',event.name)
             event.description = data.get('description',event.description)
             event.save()
+            # Names also show on cached posts
+            bump_versions(super_key(event.id), SUPERS)
             return event
         
         except ValidationError as e:
@@ -340,6 +1398,8 @@ class SuperService:
             club.name = data.get('name', club.name)
             club.description = data.get('description', club.description)
             club.save()
+            # Names also show on cached posts
+            bump_versions(super_key(club.id), SUPERS)
             return club
         
         except ValidationError as e:
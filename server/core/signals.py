@@ -0,0 +1,141 @@
+# Model signal handlers, connected in CoreConfig.ready()
+from django.db import connections
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import m2m_changed, post_migrate, post_save, pre_delete, pre_migrate
+from django.dispatch import receiver
+from .cache import bump_versions, super_key
+from .models import User, Super, Post, Tag
+from .search import drop_search_triggers, index_user, reinstall_search_triggers
+from .services import TagService, TimelineService
+from .tokens import PrincipalCache
+
+@receiver(post_save, sender=User)
+def update_user_search_terms(sender, instance: User, created: bool, update_fields=None, **kwargs):
+    """Reindex a user's name search terms when their names may have changed"""
+    # Logins save last_login with update_fields, skip those
+    if update_fields is not None and not {'username', 'display_name'} & set(update_fields):
+        return
+    index_user(instance)
+
+@receiver(post_save, sender=User)
+def forget_principal(sender, instance: User, **kwargs):
+    """Drop a saved user from this process's token principal cache"""
+    PrincipalCache.evict(instance.id)
+
+@receiver(m2m_changed, sender=Super.followers.through)
+def update_follower_count(sender, instance, action: str, reverse: bool, pk_set, **kwargs):
+    """
+    Recount Super.follower_count for every Super whose followers changed,
+    and bring the followers' timelines up to date
+    """
+    if action == 'pre_clear':
+        # clear() doesn't say which rows it touched
+        if reverse:
+            instance._cleared_ids = list(instance.super_users.values_list('id', flat=True))
+        else:
+            instance._cleared_ids = list(instance.followers.values_list('id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    changed = instance.__dict__.pop('_cleared_ids', []) if action == 'post_clear' else list(pk_set or [])
+    if reverse:
+        super_ids, user_ids = changed, [instance.pk]
+    else:
+        super_ids, user_ids = [instance.pk], changed
+    if not changed:
+        return
+
+    large = []
+    if action != 'post_add':
+        large = list(Super.objects.filter(
+            id__in=super_ids, follower_count__gt=TimelineService.FANOUT_LIMIT
+        ).values_list('id', flat=True))
+    Super.objects.filter(id__in=super_ids).update(follower_count=Coalesce(Subquery(
+        sender.objects.filter(super_id=OuterRef('pk')).order_by().values('super_id')
+        .annotate(total=Count('*')).values('total')
+    ), 0))
+    bump_versions(*[super_key(super_id) for super_id in super_ids])
+
+    if action == 'post_add':
+        TimelineService.followed(user_ids, super_ids)
+    else:
+        TimelineService.unfollowed(user_ids, super_ids)
+        if large:
+            TimelineService.shrunk(large)
+
+@receiver(m2m_changed, sender=Post.tag.through)
+@receiver(m2m_changed, sender=Super.tags.through)
+def update_tag_counts(sender, instance, action: str, reverse: bool, pk_set, **kwargs):
+    """Move Tag.post_count or Tag.super_count by the links added or removed, from either side"""
+    field = 'post_count' if sender is Post.tag.through else 'super_count'
+    if action in ('pre_remove', 'pre_clear'):
+        # remove() names objects that may not be linked and clear() names
+        # none, so note the links that are really there before they go
+        related = _tag_relation(instance, reverse, field)
+        if action == 'pre_remove':
+            related = related.filter(pk__in=pk_set)
+        instance._unlinked_ids = list(related.values_list('pk', flat=True))
+        return
+    if action == 'post_add':
+        # pk_set only holds the links that didn't exist yet
+        linked, delta = pk_set or [], 1
+    elif action in ('post_remove', 'post_clear'):
+        linked, delta = instance.__dict__.pop('_unlinked_ids', []), -1
+    else:
+        return
+
+    if reverse:
+        # One tag gained or lost several posts or Supers
+        if linked:
+            TagService.adjust(field, [instance.pk], delta * len(linked))
+    elif linked:
+        TagService.adjust(field, linked, delta)
+
+def _tag_relation(instance, reverse: bool, field: str):
+    # The other side of a tag link: a post's or Super's tags, or a tag's posts or Supers
+    if reverse:
+        return instance.post_set if field == 'post_count' else instance.super_set
+    return instance.tag if isinstance(instance, Post) else instance.tags
+
+@receiver(pre_delete, sender=Post)
+@receiver(pre_delete, sender=Super)
+def uncount_deleted_tags(sender, instance, **kwargs):
+    """
+    Take a deleted post or Super off its tags' counts
+
+    Deleting (including the cascade from a deleted user) removes the tag
+    links without sending m2m_changed. Sent for the Super row of a
+    deleted Project, Event or Club too.
+    """
+    if sender is Post:
+        TagService.adjust('post_count', Tag.objects.filter(post=instance).values('id'), -1)
+    else:
+        TagService.adjust('super_count', Tag.objects.filter(super=instance).values('id'), -1)
+
+def _migrates_core(sender, plan) -> bool:
+    # Both signals are sent once per app; only core's migrations matter
+    return sender.label == 'core' and any(migration.app_label == 'core' for migration, _ in plan or [])
+
+# Databases whose search triggers were dropped by the running migrate
+_triggers_dropped = set()
+
+@receiver(pre_migrate)
+def take_down_search_triggers(sender, using: str, plan=None, **kwargs):
+    """Drop the search triggers before core's migrations run, so table rebuilds can't trip on them"""
+    if _migrates_core(sender, plan) and drop_search_triggers(connections[using]):
+        _triggers_dropped.add(using)
+
+@receiver(post_migrate)
+def put_back_search_triggers(sender, using: str, plan=None, **kwargs):
+    """
+    Reinstall the search triggers once core's migrations are done
+
+    The indexes are only reread if triggers were dropped for the run. On a
+    fresh database there were none, and the migrations that create the
+    indexes fill them themselves.
+    """
+    if _migrates_core(sender, plan):
+        reinstall_search_triggers(connections[using], reindex=using in _triggers_dropped)
+        _triggers_dropped.discard(using)
@@ -0,0 +1,92 @@
+import json
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from api.testing import token_login
+from core.models import User, Post, Project, Like, Club
+from core.services import PostService
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], QUERY_BUDGET_STRICT=True)
+class AsyncViewTests(TestCase):
+    """Test cases for the async read endpoints, through the ASGI handler."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """A user with liked posts, a followed club and a project."""
+        cls.user = User.objects.create_user(username='author', password='x', display_name='Author')
+        cls.project = Project.objects.create(name='Robots', description='Building robots', leader=cls.user)
+        cls.club = Club.objects.create(name='Chess', leader=cls.user)
+        cls.club.followers.add(cls.user)
+        cls.posts = [
+            Post.objects.create(user=cls.user, title=f'Post {i}', text='hello', project=cls.project)
+            for i in range(3)
+        ]
+        Like.objects.create(user=cls.user, post=cls.posts[0])
+
+    def setUp(self):
+        cache.clear()
+
+    async def get(self, url):
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(0 < response.query_stats['count'] <= response.query_stats['budget'])
+        return json.loads(response.content)['data']
+
+    async def test_feed(self):
+        """Anonymous feed pages are the same shape as before and cached."""
+        data = await self.get('/api/posts?limit=2&total=exact')
+        self.assertEqual([post['id'] for post in data['posts']], [self.posts[0].id, self.posts[1].id])
+        self.assertEqual(data['pagination']['total'], 3)
+        self.assertNotIn('liked', data['posts'][0])
+
+        response = await self.async_client.get(f'/api/posts?cursor={data["pagination"]["next_cursor"]}')
+        self.assertEqual(json.loads(response.content)['data']['posts'][0]['id'], self.posts[2].id)
+        response = await self.async_client.get('/api/posts?limit=2&total=exact')
+        self.assertEqual(response.headers['X-Cache'], 'HIT')
+
+    async def test_logged_in_feed(self):
+        """Logged in users get their liked flags and their following timeline."""
+        token_login(self.async_client, self.user)
+        data = await self.get('/api/posts')
+        self.assertEqual([post['liked'] for post in data['posts']], [True, False, False])
+
+        post = await sync_to_async(PostService.create_a_post)(
+            self.user, {'title': 'Club news', 'text': 'hi', 'club': self.club.id}
+        )
+        data = await self.get('/api/posts?feed=following')
+        self.assertIn(post.id, [row['id'] for row in data['posts']])
+
+    async def test_post_detail(self):
+        """Posts are found by id, with a 404 for missing ones."""
+        data = await self.get(f'/api/posts/{self.posts[1].id}')
+        self.assertEqual(data['post']['title'], 'Post 1')
+        self.assertEqual(data['post']['project']['name'], 'Robots')
+        response = await self.async_client.get('/api/posts/999999')
+        self.assertEqual(response.status_code, 404)
+
+    async def test_searches_need_login(self):
+        """Activity search and user lookup keep requiring a session."""
+        for url in ['/api/super?search=robots', '/api/users/author']:
+            with self.subTest(url=url):
+                response = await self.async_client.get(url)
+                self.assertEqual(response.status_code, 403)
+
+        token_login(self.async_client, self.user)
+        data = await self.get('/api/super?search=robots')
+        self.assertEqual([activity['name'] for activity in data['activities']], ['Robots'])
+        self.assertEqual((await self.get('/api/users/author'))['username'], 'author')
+        self.assertEqual([user['username'] for user in (await self.get('/api/users?search=aut'))['users']], ['author'])
+
+    async def test_writes_go_to_drf_views(self):
+        """POSTs on the async endpoints still reach the DRF views."""
+        response = await self.async_client.post('/api/posts', {'title': 'New', 'text': 'hi'}, content_type='application/json')
+        self.assertEqual(response.status_code, 403)
+
+        token_login(self.async_client, self.user)
+        response = await self.async_client.post(
+            '/api/posts', {'title': 'New', 'text': 'hi', 'project': self.project.id},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(await Post.objects.filter(title='New').aexists())
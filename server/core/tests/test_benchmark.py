@@ -0,0 +1,101 @@
+from datetime import timedelta
+from django.db.models import Count, F
+from django.test import TestCase
+from django.utils import timezone
+from core.benchmark import compare_results, dataset_size, generate_dataset, percentile, render_benchmark, reset_dataset, run_benchmark
+from core.models import User, Super, Post, Like, Comment, TimelineEntry
+
+
+class BenchmarkDatasetTests(TestCase):
+    """Test cases for the synthetic benchmark dataset and runner."""
+    
+    SCALE = 0.0002
+    
+    def snapshot(self):
+        return (
+            list(User.objects.order_by('id').values_list('username', 'display_name')),
+            list(Super.objects.order_by('id').values_list('name', 'super_type', 'follower_count')),
+            list(Post.objects.order_by('id').values_list('title', 'like_count', 'comment_count', 'project__name')),
+            Like.objects.count(),
+            Comment.objects.count(),
+        )
+    
+    def test_sizes_scale(self):
+        """Row counts follow the scale factor, with a floor for tiny scales."""
+        self.assertEqual(dataset_size(1)['posts'], 1_000_000)
+        self.assertEqual(dataset_size(0.01)['users'], 1000)
+        self.assertEqual(dataset_size(0)['supers'], 3)
+    
+    def test_deterministic(self):
+        """The same scale and seed produce the same data."""
+        generate_dataset(self.SCALE, seed=7)
+        first = self.snapshot()
+        reset_dataset()
+        generate_dataset(self.SCALE, seed=7)
+        self.assertEqual(self.snapshot(), first)
+        reset_dataset()
+        generate_dataset(self.SCALE, seed=8)
+        self.assertNotEqual(self.snapshot(), first)
+    
+    def test_denormalized_data_matches(self):
+        """Counters and timelines agree with the rows they summarize."""
+        generate_dataset(self.SCALE, seed=1)
+        for post in Post.objects.annotate(likes=Count('like', distinct=True), comments=Count('comment', distinct=True)):
+            self.assertEqual(post.like_count, post.likes)
+            self.assertEqual(post.comment_count, post.comments)
+        for instance in Super.objects.annotate(followers_total=Count('followers')):
+            self.assertEqual(instance.follower_count, instance.followers_total)
+        self.assertFalse(Like.objects.values('user', 'post').annotate(n=Count('id')).filter(n__gt=1).exists())
+        self.assertTrue(TimelineEntry.objects.exists())
+        self.assertTrue(User.objects.filter(search_terms__isnull=False).exists())
+    
+    def test_times_spread_over_window(self):
+        """Post times cover the window and rise with the id, and comments follow their post."""
+        started = timezone.now()
+        generate_dataset(self.SCALE, seed=1, days=10)
+        times = list(Post.objects.order_by('id').values_list('created_at', flat=True))
+        self.assertEqual(times, sorted(times))
+        self.assertGreaterEqual(times[0], started - timedelta(days=10))
+        self.assertGreater(times[-1] - times[0], timedelta(days=1))
+        self.assertLessEqual(times[-1], timezone.now())
+        self.assertFalse(Comment.objects.filter(created_at__lt=F('post__created_at')).exists())
+    
+    def test_runner_reports_every_scenario(self):
+        """The runner reports latency percentiles and query counts."""
+        generate_dataset(self.SCALE, seed=1)
+        results = run_benchmark(requests=3, warmup=1, scenarios=['feed', 'post_detail', 'user_supers'])
+        self.assertEqual(set(results['endpoints']), {'feed', 'post_detail', 'user_supers'})
+        for stats in results['endpoints'].values():
+            self.assertEqual(stats['errors'], 0)
+            self.assertLessEqual(stats['p50_ms'], stats['p99_ms'])
+            self.assertGreater(stats['throughput_rps'], 0)
+        self.assertEqual(results['meta']['rows']['posts'], Post.objects.count())
+    
+    def test_render_benchmark(self):
+        """Every renderer encodes the same feed page."""
+        results = render_benchmark(posts=50, repeat=2, log=lambda line: None)
+        self.assertIn('drf', results)
+        self.assertIn('stream', results)
+        self.assertEqual(len({stats['bytes'] for stats in results.values()}), 1)
+    
+    def test_percentile(self):
+        """Nearest-rank percentiles."""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([5], 95), 5)
+        self.assertIsNone(percentile([], 50))
+    
+    def test_compare_missing_stats(self):
+        """A stat missing from either run compares as n/a instead of failing."""
+        old = {'endpoints': {
+            'feed': {'p50_ms': 10.0, 'p95_ms': None, 'p99_ms': 0, 'mean_queries': 4.0},
+            'tags': {'p50_ms': 1.0, 'p95_ms': 1.0, 'p99_ms': 1.0, 'mean_queries': 1.0},
+        }}
+        new = {'endpoints': {
+            'feed': {'p50_ms': 5.0, 'p95_ms': 12.0, 'p99_ms': 3.0, 'mean_queries': None},
+        }}
+        self.assertEqual(compare_results(old, new), [
+            'feed             p50_ms 10.0 -> 5.0 (-50%)  p95_ms n/a -> 12.0  '
+            'p99_ms 0.0 -> 3.0  mean_queries 4.0 -> n/a'
+        ])
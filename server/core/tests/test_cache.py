@@ -0,0 +1,109 @@
+from unittest.mock import patch
+from asgiref.sync import sync_to_async
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from api.cache import CacheStats
+from api.testing import token_login
+from core.cache import FEED, _bump, bump_versions, get_versions, post_key
+from core.models import User, Post
+from core.services import PostService
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class ResponseCacheTests(TestCase):
+    """Test cases for the versioned response cache."""
+    
+    def setUp(self):
+        """Start each test with an empty cache and two posts."""
+        cache.clear()
+        CacheStats.reset()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='author', password='x', display_name='Author')
+        self.post = Post.objects.create(user=self.user, title='First', text='hello')
+        self.other = Post.objects.create(user=self.user, title='Second', text='hello')
+    
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+    
+    def test_repeat_reads_hit(self):
+        """The second anonymous read of the same URL is served from the cache."""
+        self.assertEqual(self.get('/api/posts').headers['X-Cache'], 'MISS')
+        self.assertEqual(self.get('/api/posts').headers['X-Cache'], 'HIT')
+        self.assertEqual(self.get('/api/posts?limit=1').headers['X-Cache'], 'MISS')
+        self.assertEqual(CacheStats.to_dict()['hits'], 1)
+        self.assertEqual(CacheStats.to_dict()['misses'], 2)
+    
+    def test_like_invalidates_only_affected_entries(self):
+        """Liking a post retires the feed pages and detail showing it, nothing else."""
+        self.get('/api/posts')
+        self.get(f'/api/posts/{self.post.id}')
+        self.get(f'/api/posts/{self.other.id}')
+        
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/likes', {'post': self.post.id}, format='json')
+        self.client.force_authenticate(None)
+        
+        feed = self.get('/api/posts')
+        self.assertEqual(feed.headers['X-Cache'], 'MISS')
+        self.assertEqual(feed.data['data']['posts'][0]['like_number'], 1)
+        detail = self.get(f'/api/posts/{self.post.id}')
+        self.assertEqual(detail.headers['X-Cache'], 'MISS')
+        self.assertEqual(detail.data['data']['post']['like_number'], 1)
+        self.assertEqual(self.get(f'/api/posts/{self.other.id}').headers['X-Cache'], 'HIT')
+    
+    def test_feed_pages_without_the_post_stay_cached(self):
+        """A comment retires the feed page showing its post, not the other pages."""
+        first = self.get('/api/posts?limit=1')
+        second_url = f'/api/posts?limit=1&cursor={first.data["data"]["pagination"]["next_cursor"]}'
+        self.get(second_url)
+        
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/comments', {'post': self.other.id, 'text': 'hi'}, format='json')
+        self.client.force_authenticate(None)
+        
+        self.assertEqual(self.get('/api/posts?limit=1').headers['X-Cache'], 'HIT')
+        second = self.get(second_url)
+        self.assertEqual(second.headers['X-Cache'], 'MISS')
+        self.assertEqual(second.data['data']['posts'][0]['comment_count'], 1)
+    
+    def test_like_during_a_feed_build(self):
+        """A like landing between reading the rows and caching them isn't cached over."""
+        build = PostService.aget_multiple_posts
+        
+        async def build_then_like(params, user):
+            page = await build(params, user)
+            # The like commits and bumps its post after the rows were read
+            await sync_to_async(Post.objects.filter(id=self.post.id).update)(like_count=F('like_count') + 1)
+            _bump([post_key(self.post.id)])
+            return page
+        
+        def likes(response):
+            return {post['id']: post['like_number'] for post in response.data['data']['posts']}[self.post.id]
+        
+        with patch.object(PostService, 'aget_multiple_posts', build_then_like):
+            self.assertEqual(likes(self.get('/api/posts')), 0)
+        feed = self.get('/api/posts')
+        self.assertEqual(feed.headers['X-Cache'], 'MISS')
+        self.assertEqual(likes(feed), 1)
+        self.assertEqual(self.get('/api/posts').headers['X-Cache'], 'HIT')
+    
+    def test_logged_in_feed_is_not_cached(self):
+        """Feed responses with per-user fields bypass the cache."""
+        token_login(self.client, self.user)
+        self.assertNotIn('X-Cache', self.get('/api/posts').headers)
+    
+    def test_evicted_versions_never_repeat(self):
+        """A version key recreated after eviction doesn't reuse an old value."""
+        before = get_versions([FEED])[FEED]
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_versions(FEED, post_key(1))
+        self.assertEqual(get_versions([FEED])[FEED], before + 1)
+        
+        cache.delete('version:' + FEED)
+        self.assertGreater(get_versions([FEED])[FEED], before + 1)
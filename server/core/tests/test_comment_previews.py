@@ -0,0 +1,52 @@
+from api.testing import APITestCase
+from core.models import Project
+from core.services import PostService
+
+
+class CommentPreviewTests(APITestCase):
+    """Test cases for inlining each post's latest comments in post lists."""
+
+    URLS = ['/api/posts', '/api/posts?feed=following', '/api/posts/user/author']
+
+    def setUp(self):
+        super().setUp()
+        self.project = Project.objects.create(name='Project', leader=self.user)
+        self.project.followers.add(self.user)
+        self.posts = [self.add_post(comments=comments, project=self.project.id) for comments in (0, 2, 5)]
+
+    def get_posts(self, url, comments):
+        separator = '&' if '?' in url else '?'
+        response = self.client.get(f'{url}{separator}comments={comments}')
+        self.assertEqual(response.status_code, 200)
+        self.assertWithinQueryBudget(response)
+        return response, response.data['data']['posts']
+
+    def test_latest_comments(self):
+        """Each post carries its newest comments, oldest of them first."""
+        for url in self.URLS:
+            with self.subTest(url=url):
+                _, posts = self.get_posts(url, 3)
+                previews = {post['id']: [comment['text'] for comment in post['comments']] for post in posts}
+                self.assertEqual(previews, {
+                    self.posts[0].id: [],
+                    self.posts[1].id: ['Comment 0', 'Comment 1'],
+                    self.posts[2].id: ['Comment 2', 'Comment 3', 'Comment 4'],
+                })
+                self.assertEqual([post['comment_count'] for post in posts if post['id'] == self.posts[2].id], [5])
+
+    def test_one_query_for_the_page(self):
+        """Previews cost one query however many posts and comments there are."""
+        self.client.get('/api/posts')  # Warm the token principal cache
+        for url in self.URLS:
+            with self.subTest(url=url):
+                without = self.get_posts(url, 0)[0].query_stats['count']
+                before = self.get_posts(url, 3)[0].query_stats['count']
+                self.add_post(comments=4, project=self.project.id)
+                self.assertEqual(self.get_posts(url, 3)[0].query_stats['count'], before)
+                self.assertEqual(before, without + 1)
+
+    def test_off_by_default(self):
+        """Without ?comments there are no previews; the size is bounded."""
+        self.assertNotIn('comments', self.client.get('/api/posts').data['data']['posts'][0])
+        self.assertEqual(PostService.preview_size({'comments': '500'}), PostService.COMMENT_PREVIEW_MAX)
+        self.assertEqual(self.client.get('/api/posts?comments=lots').status_code, 400)
@@ -0,0 +1,75 @@
+import json
+import warnings
+from rest_framework.test import APIClient
+from api.middleware import record_queries
+from api.testing import APITestCase, token_login
+from core.models import Tag
+from core.services import PostService
+
+
+class ExportTests(APITestCase):
+    """Test cases for streaming a user's posts, likes and activities."""
+
+    URLS = ['/api/posts/user/author', '/api/likes/user/author', '/api/super/user/author']
+    KEYS = ['posts', 'posts', 'activities']
+    login_as = 'fan'
+
+    def setUp(self):
+        super().setUp()
+        self.add_rows(3)
+
+    def add_rows(self, count):
+        posts = super().add_rows(count)
+        for i, post in enumerate(posts):
+            post.project.tags.add(Tag.objects.get_or_create(tag=f'tag{i % 2}')[0])
+        return posts
+
+    def ndjson(self, url, client=None):
+        response = (client or self.client).get(url + '?format=ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        body = b''.join(response.streaming_content)
+        return [json.loads(line) for line in body.decode().splitlines()]
+
+    def test_ndjson_matches_json(self):
+        """Every endpoint streams the same rows it lists, one per line."""
+        for url, key in zip(self.URLS, self.KEYS):
+            with self.subTest(url=url):
+                rows = self.ndjson(url)
+                self.assertEqual(len(rows), 3)
+                self.assertEqual(rows, self.client.get(url).data['data'][key])
+        self.assertTrue(all(row['liked'] for row in self.ndjson(self.URLS[0])))
+
+    def test_queries_dont_grow_with_rows(self):
+        """Rows are read in chunks with their relations, not one by one."""
+        def count(url):
+            with record_queries() as recorder:
+                self.ndjson(url)
+            return recorder.count
+
+        count(self.URLS[0])  # Warm the token principal cache
+        before = {url: count(url) for url in self.URLS}
+        self.add_rows(7)
+        self.assertEqual({url: count(url) for url in self.URLS}, before)
+
+    def test_rows_are_produced_lazily(self):
+        """Nothing is read until the stream is consumed, then chunk by chunk."""
+        with self.assertNumQueries(0):
+            rows = PostService.user_posts('author', self.fan, chunk_size=2)
+        self.assertEqual([row['title'] for row in rows], ['Post 0', 'Post 1', 'Post 2'])
+
+    def test_errors_are_one_line(self):
+        """Failures still come back as a single JSON line."""
+        response = APIClient().get(self.URLS[0] + '?format=ndjson')
+        self.assertEqual(response.status_code, 403)
+        self.assertIn('detail', json.loads(response.content))
+
+    async def test_streams_under_asgi(self):
+        """The async server streams chunk by chunk instead of buffering."""
+        token_login(self.async_client, self.fan)
+        response = await self.async_client.get(self.URLS[0] + '?format=ndjson')
+        self.assertEqual(response.status_code, 200)
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            body = b''.join([part async for part in response])
+        self.assertEqual(len(body.decode().splitlines()), 3)
@@ -0,0 +1,77 @@
+import datetime
+import math
+from django.utils import timezone
+from api.testing import APITestCase
+from core import hot
+from core.models import User, Post, Like, Comment, PostHotScore
+from core.services import HotService, PostService
+
+
+class HotRankingTests(APITestCase):
+    """Test cases for the time-decayed hot ranking of posts."""
+
+    def setUp(self):
+        super().setUp()
+        self.fans = [
+            User.objects.create_user(username=f'fan{i}', password='x', display_name='Fan') for i in range(3)
+        ]
+
+    def hot_titles(self, limit=10):
+        titles = []
+        cursor = ''
+        while True:
+            response = self.client.get(f'/api/posts?order=hot&limit={limit}&cursor={cursor}')
+            self.assertEqual(response.status_code, 200)
+            self.assertWithinQueryBudget(response)
+            data = response.data['data']
+            titles += [post['title'] for post in data['posts']]
+            cursor = data['pagination']['next_cursor']
+            if not cursor:
+                return titles
+
+    def test_scores_decay(self):
+        """A like today outweighs a like a day ago, which is worth half as much."""
+        today = hot.event_score(hot.LIKE_WEIGHT, datetime.date(2025, 6, 2))
+        yesterday = hot.event_score(hot.LIKE_WEIGHT, datetime.date(2025, 6, 1))
+        self.assertAlmostEqual(today - yesterday, math.log(2))
+        self.assertAlmostEqual(hot.combine([yesterday, yesterday]), today)
+
+    def test_engagement_and_age(self):
+        """Liked and commented posts rise, old posts sink."""
+        old = self.add_post('Old', age_days=10)
+        quiet = self.add_post('Quiet')
+        liked = self.add_post('Liked')
+        commented = self.add_post('Commented')
+        for fan in self.fans:
+            PostService.like_post(fan, liked.id)
+            PostService.like_post(fan, old.id)
+        self.client.post('/api/comments', {'post': commented.id, 'text': 'Nice'}, format='json')
+        titles = self.hot_titles()
+        self.assertEqual(set(titles[:2]), {'Liked', 'Commented'})
+        self.assertEqual(titles[2:], ['Quiet', 'Old'])
+        self.assertEqual(self.hot_titles(limit=1), titles)
+
+    def test_incremental_matches_recompute(self):
+        """Scores kept up as events arrive equal a full recompute."""
+        posts = [self.add_post(f'Post {i}') for i in range(3)]
+        PostService.like_post(self.fans[0], posts[0].id)
+        PostService.like_post(self.fans[1], posts[0].id)
+        PostService.like_post(self.fans[1], posts[1].id)
+        PostService.unlike_post(self.fans[1], posts[1].id)
+        self.client.post('/api/comments', {'post': posts[2].id, 'text': 'Nice'}, format='json')
+        incremental = dict(PostHotScore.objects.values_list('post_id', 'score'))
+
+        PostHotScore.objects.all().delete()
+        self.assertEqual(HotService.recompute(batch_size=2), 3)
+        recomputed = dict(PostHotScore.objects.values_list('post_id', 'score'))
+        self.assertEqual(incremental.keys(), recomputed.keys())
+        for post_id, score in incremental.items():
+            self.assertAlmostEqual(score, recomputed[post_id])
+
+    def test_ties_paginate(self):
+        """Posts with equal scores are all listed once, newest first."""
+        now = timezone.now()
+        posts = [self.add_post(f'Post {i}') for i in range(5)]
+        Post.objects.update(created_at=now)
+        HotService.refresh([post.id for post in posts])
+        self.assertEqual(self.hot_titles(limit=2), [f'Post {i}' for i in reversed(range(5))])
@@ -0,0 +1,70 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from api.testing import APITestCase
+from core.models import Post, Like
+from core.services import PostService
+
+
+class LikeTests(APITestCase):
+    """Test cases for liking, unliking and the liked set."""
+
+    def setUp(self):
+        super().setUp()
+        self.posts = [self.add_post(f'Post {i}') for i in range(3)]
+
+    def like(self, method, post_id):
+        response = getattr(self.client, method)('/api/likes', {'post': post_id}, format='json')
+        self.assertWithinQueryBudget(response)
+        return response
+
+    def test_double_taps(self):
+        """Liking or unliking twice changes the post once."""
+        post = self.posts[0]
+        for _ in range(2):
+            response = self.like('post', post.id)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['data'], {'liked': True})
+        self.assertEqual(Like.objects.filter(post=post).count(), 1)
+        self.assertEqual(Post.objects.get(id=post.id).like_count, 1)
+
+        for _ in range(2):
+            self.assertEqual(self.like('delete', post.id).status_code, 200)
+        self.assertFalse(Like.objects.filter(post=post).exists())
+        self.assertEqual(Post.objects.get(id=post.id).like_count, 0)
+
+    def test_no_op_writes_nothing(self):
+        """A repeated like doesn't touch the counter."""
+        PostService.like_post(self.user, self.posts[0].id)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertFalse(PostService.unlike_post(self.user, self.posts[1].id))
+            self.assertFalse(PostService.like_post(self.user, self.posts[0].id))
+        self.assertFalse([query for query in queries if query['sql'].startswith('UPDATE')])
+        self.assertEqual(Post.objects.get(id=self.posts[0].id).like_count, 1)
+
+    def test_unlike_with_drifted_counter(self):
+        """Unliking a post whose counter already reads 0 leaves it at 0."""
+        self.like('post', self.posts[0].id)
+        Post.objects.filter(id=self.posts[0].id).update(like_count=0)
+        self.assertEqual(self.like('delete', self.posts[0].id).status_code, 200)
+        self.assertEqual(Post.objects.get(id=self.posts[0].id).like_count, 0)
+
+    def test_missing_and_bad_posts(self):
+        """Liking a post that doesn't exist is a 404, a bad id a 400."""
+        self.assertEqual(self.like('post', 999).status_code, 404)
+        self.assertEqual(self.like('post', 'abc').status_code, 400)
+        self.assertFalse(Like.objects.exists())
+
+    def test_liked_set(self):
+        """The viewer's likes among the given posts come back in one query."""
+        PostService.like_post(self.user, self.posts[0].id)
+        PostService.like_post(self.user, self.posts[2].id)
+        ids = [post.id for post in self.posts] + [999]
+        response = self.client.post('/api/likes/state', {'posts': ids}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertWithinQueryBudget(response)
+        self.assertEqual(response.data['data']['liked'], [self.posts[0].id, self.posts[2].id])
+
+        response = self.client.post('/api/likes/state', {'posts': 'nope'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/api/likes/state', {'posts': list(range(501))}, format='json')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,78 @@
+from api.testing import APITestCase
+from core.models import Post, Comment
+
+
+class ListingTests(APITestCase):
+    """Test cases for the paginated profile listings and comments."""
+
+    login_as = 'fan'
+
+    def setUp(self):
+        super().setUp()
+        self.post = Post.objects.create(user=self.user, title='Commented', text='hi')
+        self.add_rows(5)
+
+    @property
+    def urls(self):
+        return [
+            '/api/posts/user/author',
+            '/api/likes/user/author',
+            '/api/super/user/author',
+            f'/api/comments?id={self.post.id}',
+        ]
+
+    KEYS = ['posts', 'posts', 'activities', 'comments']
+
+    def add_rows(self, count):
+        posts = super().add_rows(count)
+        for i in range(count):
+            Comment.objects.create(user=self.fan, post=self.post, text=f'Comment {i}')
+        return posts
+
+    def walk(self, url, key, limit):
+        """Every row of a listing, following next_cursor page by page"""
+        rows = []
+        cursor = ''
+        while True:
+            separator = '&' if '?' in url else '?'
+            response = self.client.get(f'{url}{separator}limit={limit}&cursor={cursor}')
+            self.assertEqual(response.status_code, 200)
+            self.assertWithinQueryBudget(response)
+            page = response.data['data']
+            self.assertLessEqual(len(page[key]), limit)
+            self.assertEqual(page['pagination']['limit'], limit)
+            rows += page[key]
+            cursor = page['pagination']['next_cursor']
+            if not cursor:
+                return rows
+
+    def test_pages_cover_the_list(self):
+        """Walking the pages gives every row once, in order."""
+        for url, key in zip(self.urls, self.KEYS):
+            with self.subTest(url=url):
+                rows = self.walk(url, key, limit=2)
+                self.assertEqual(len(rows), 6 if url == '/api/posts/user/author' else 5)
+                self.assertEqual(rows, self.client.get(url).data['data'][key])
+                ids = [row['id'] for row in rows]
+                self.assertEqual(len(set(ids)), len(ids))
+
+    def test_queries_dont_grow_with_rows(self):
+        """A page costs the same number of queries however long the list is."""
+        self.client.get(self.urls[0])  # Warm the token principal cache
+        before = [self.client.get(url).query_stats['count'] for url in self.urls]
+        self.add_rows(10)
+        self.assertEqual([self.client.get(url).query_stats['count'] for url in self.urls], before)
+
+    def test_pages_are_bounded(self):
+        """Without a limit a page holds PAGE_SIZE rows."""
+        Comment.objects.bulk_create(
+            Comment(user=self.fan, post=self.post, text='more') for _ in range(60)
+        )
+        data = self.client.get(f'/api/comments?id={self.post.id}').data['data']
+        self.assertEqual(len(data['comments']), 50)
+        self.assertIsNotNone(data['pagination']['next_cursor'])
+
+    def test_bad_cursor(self):
+        """A malformed cursor is a client error."""
+        response = self.client.get('/api/posts/user/author?cursor=nope')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,97 @@
+from unittest.mock import patch
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from api.middleware import QueryBudgetExceeded, QueryStatsRegistry
+from api.testing import QueryBudgetTestMixin, token_login
+from api.async_views import FeedView
+from core.models import User, Post, Project, Like
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class QueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    """Test cases for the per-request query budget middleware."""
+    
+    def setUp(self):
+        """Create a user with a few posts, likes and an activity."""
+        cache.clear()
+        QueryStatsRegistry.reset()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='author', password='x', display_name='Author')
+        self.project = Project.objects.create(name='Robots', leader=self.user)
+        for i in range(5):
+            post = Post.objects.create(user=self.user, title=f'Post {i}', text='hello', project=self.project)
+            Like.objects.create(user=self.user, post=post)
+        token_login(self.client, self.user)
+    
+    @override_settings(QUERY_BUDGET_HEADERS=True)
+    def test_headers(self):
+        """Query count, DB time and budget are sent as headers when enabled."""
+        response = self.client.get('/api/posts')
+        self.assertEqual(int(response.headers['X-Query-Count']), response.query_stats['count'])
+        self.assertIn('X-DB-Time-Ms', response.headers)
+        self.assertEqual(response.headers['X-Query-Budget'], '7')
+    
+    @override_settings(QUERY_BUDGET_HEADERS=False)
+    def test_no_headers_in_production(self):
+        """Headers are left out when disabled, but stats are still recorded."""
+        response = self.client.get('/api/posts')
+        self.assertNotIn('X-Query-Count', response.headers)
+        self.assertGreater(response.query_stats['count'], 0)
+    
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_read_endpoints_within_budget(self):
+        """The main read endpoints stay within their declared budgets."""
+        post = Post.objects.first()
+        for url in [
+            '/api/posts',
+            '/api/posts?search=post',
+            '/api/posts?feed=following',
+            f'/api/posts/{post.id}',
+            '/api/super?search=robots',
+            f'/api/super/{self.project.id}',
+            '/api/users?search=aut',
+            '/api/super/user/author',
+            f'/api/comments?id={post.id}',
+        ]:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertWithinQueryBudget(response)
+    
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_batch_create_within_budget(self):
+        """Creating a batch of posts stays within the endpoint's budget."""
+        posts = [{'title': f'Batch {i}', 'text': 'hi', 'project': self.project.id} for i in range(20)]
+        response = self.client.post('/api/posts/batch', {'posts': posts}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['data']['results']), 20)
+        self.assertWithinQueryBudget(response)
+    
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_strict_mode_raises(self):
+        """Going over budget fails the request in strict mode."""
+        with patch.object(FeedView, 'query_budget', {'GET': 0}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get('/api/posts')
+    
+    def test_report_orders_worst_first(self):
+        """The report lists the endpoints with the most queries first."""
+        post = Post.objects.first()
+        self.client.get('/api/posts')
+        self.client.get(f'/api/posts/{post.id}')
+        self.client.get('/api/super?search=robots')
+        
+        report = QueryStatsRegistry.report()
+        means = [row['mean_queries'] for row in report]
+        self.assertEqual(means, sorted(means, reverse=True))
+        self.assertIn('GET /api/posts/<int:post_id>', [row['endpoint'] for row in report])
+    
+    def test_max_queries_helper(self):
+        """assertMaxQueries fails when a block runs too many queries."""
+        with self.assertMaxQueries(1):
+            User.objects.count()
+        with self.assertRaises(AssertionError):
+            with self.assertMaxQueries(1):
+                User.objects.count()
+                Post.objects.count()
@@ -0,0 +1,32 @@
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from core.models import User, Post, Like
+from core.query_plans import check_query_plans, plan_problems
+
+
+class QueryPlanTests(TestCase):
+    """Test cases for the indexes behind the hot queries."""
+
+    def test_hot_queries_use_indexes(self):
+        """No hot query scans a table or sorts without an index."""
+        if connection.vendor != 'sqlite':
+            self.skipTest('Plans are only checked on SQLite')
+        for name, result in check_query_plans().items():
+            with self.subTest(query=name):
+                self.assertEqual(result['problems'], [], result['plan'])
+
+    def test_scans_are_reported(self):
+        """Unindexed filters and sorts show up as problems."""
+        if connection.vendor != 'sqlite':
+            self.skipTest('Plans are only checked on SQLite')
+        plan = Post.objects.filter(title='Hi').order_by('text').explain()
+        self.assertEqual(len(plan_problems(plan)), 2)
+        self.assertEqual(len(plan_problems(plan, allow_sort=True)), 1)
+
+    def test_likes_are_unique(self):
+        """A user can like a post only once."""
+        user = User.objects.create_user(username='author', password='x', display_name='Author')
+        post = Post.objects.create(user=user, title='Hi', text='there')
+        Like.objects.create(user=user, post=post)
+        with self.assertRaises(IntegrityError):
+            Like.objects.create(user=user, post=post)
@@ -0,0 +1,83 @@
+import datetime
+import json
+from decimal import Decimal
+from unittest import mock, skipIf
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from api import renderers
+from api.testing import token_login
+from core.models import User, Post, Event
+
+
+class RendererTests(TestCase):
+    """Test cases for the JSON encoding of API responses."""
+
+    PAYLOAD = {
+        'detail': 'ok',
+        'data': {
+            'day': datetime.date(2025, 5, 1),
+            'at': datetime.datetime(2025, 5, 1, 10, 30, tzinfo=datetime.timezone.utc),
+            'price': Decimal('1.50'),
+            'names': ['Zoë', None, True],
+            1: 'int key',
+        },
+    }
+
+    def test_encoders_agree(self):
+        """orjson and the stdlib fallback write the same JSON."""
+        fast = renderers.dumps(self.PAYLOAD)
+        with mock.patch.object(renderers, 'orjson', None):
+            fallback = renderers.dumps(self.PAYLOAD)
+        self.assertEqual(json.loads(fast), json.loads(fallback))
+        self.assertEqual(json.loads(fast)['data']['day'], '2025-05-01')
+        self.assertEqual(json.loads(fast)['data']['at'], '2025-05-01T10:30:00+00:00')
+
+    @skipIf(renderers.orjson is None, 'orjson is not installed')
+    def test_orjson_is_used(self):
+        """The renderer goes through orjson when it is installed."""
+        with mock.patch.object(renderers.orjson, 'dumps', wraps=renderers.orjson.dumps) as dumps:
+            renderers.FastJSONRenderer().render({'a': 1})
+        dumps.assert_called_once()
+
+    def test_streaming_matches(self):
+        """Streaming a payload with iterators gives the same document."""
+        for batch_size in (1, 2, 100):
+            with self.subTest(batch_size=batch_size):
+                data = {'detail': 'ok', 'data': iter([{'id': i} for i in range(5)])}
+                body = b''.join(renderers.iter_json(data, batch_size=batch_size))
+                self.assertEqual(json.loads(body), {'detail': 'ok', 'data': [{'id': i} for i in range(5)]})
+        self.assertEqual(b''.join(renderers.iter_json({'data': iter([])})), b'{"data":[]}')
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class RenderedResponseTests(TestCase):
+    """Test cases for responses going through the fast renderer."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='author', password='x', display_name='Author')
+        self.client = APIClient()
+        token_login(self.client, self.user)
+
+    def test_event_dates(self):
+        """Event dates come out as ISO strings without to_dict() formatting them."""
+        Event.objects.create(
+            name='Fair', leader=self.user,
+            start_time=datetime.date(2025, 5, 1), end_time=datetime.date(2025, 5, 2),
+        )
+        response = self.client.get('/api/super?type=event')
+        self.assertEqual(response.status_code, 200)
+        [activity] = json.loads(response.content)['data']['activities']
+        self.assertEqual((activity['start_time'], activity['end_time']), ('2025-05-01', '2025-05-02'))
+
+    def test_opt_in_streaming(self):
+        """?stream=true streams the same rows as the regular response's page."""
+        for i in range(3):
+            Post.objects.create(user=self.user, title=f'Post {i}', text='hello')
+        for url in ['/api/posts/user/author', '/api/likes/user/author']:
+            with self.subTest(url=url):
+                regular = json.loads(self.client.get(url).content)
+                streamed = self.client.get(url + '?stream=true')
+                self.assertTrue(streamed.streaming)
+                self.assertEqual(json.loads(b''.join(streamed.streaming_content)), {
+                    'detail': regular['detail'], 'data': regular['data']['posts'],
+                })
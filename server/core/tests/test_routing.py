@@ -0,0 +1,111 @@
+import time
+from unittest import skipUnless
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from api.middleware import ReplicaRoutingMiddleware
+from api.testing import token_login
+from core import routers
+from core.models import User, Post
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRouterTests(SimpleTestCase):
+    """Test cases for the read/write database router."""
+    
+    def setUp(self):
+        self.router = routers.ReplicaRouter()
+    
+    def read(self):
+        return self.router.db_for_read(Post)
+    
+    def test_reads_stay_on_primary_unless_opted_in(self):
+        """Only reads inside @use_replica go to a replica."""
+        self.assertEqual(self.read(), 'default')
+        self.assertEqual(routers.use_replica(self.read)(), 'replica')
+        self.assertEqual(self.read(), 'default')
+    
+    def test_writes_pin_the_rest_of_the_request(self):
+        """After a write, reads in the same request see the primary."""
+        def handler():
+            before = self.read()
+            self.assertEqual(self.router.db_for_write(Post), 'default')
+            return before, self.read()
+        self.assertEqual(routers.use_replica(handler)(), ('replica', 'default'))
+    
+    def test_pinned_clients_skip_replicas(self):
+        """A client that wrote recently reads from the primary."""
+        token = routers.begin(pinned=True)
+        try:
+            self.assertEqual(routers.use_replica(self.read)(), 'default')
+        finally:
+            routers.end(token)
+    
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        """Without replicas everything goes to the primary."""
+        self.assertEqual(routers.use_replica(self.read)(), 'default')
+    
+    def test_middleware_sets_and_honours_cookie(self):
+        """Writing sets the read-your-writes cookie, which pins later requests."""
+        factory = RequestFactory()
+        
+        def write(request):
+            self.router.db_for_write(Post)
+            return HttpResponse()
+        response = ReplicaRoutingMiddleware(write)(factory.post('/'))
+        cookie = response.cookies[ReplicaRoutingMiddleware.COOKIE]
+        self.assertEqual(cookie['max-age'], settings.READ_YOUR_WRITES_SECONDS)
+        
+        def read(request):
+            return HttpResponse(routers.use_replica(self.read)())
+        request = factory.get('/')
+        request.COOKIES[ReplicaRoutingMiddleware.COOKIE] = cookie.value
+        self.assertEqual(ReplicaRoutingMiddleware(read)(request).content, b'default')
+        
+        request = factory.get('/')
+        request.COOKIES[ReplicaRoutingMiddleware.COOKIE] = str(time.time() - 1)
+        self.assertEqual(ReplicaRoutingMiddleware(read)(request).content, b'replica')
+        self.assertNotIn(ReplicaRoutingMiddleware.COOKIE, ReplicaRoutingMiddleware(read)(request).cookies)
+
+
+# Run with DATABASE_REPLICA=replica.sqlite3 python manage.py test core.tests.test_routing
+@skipUnless('replica' in settings.DATABASES, 'No replica database configured')
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class ReplicaRoutingIntegrationTests(TransactionTestCase):
+    """Test cases routing real API requests between two databases."""
+    
+    # The runner sets up every database a test class names, even skipped ones
+    databases = {'default', 'replica'} if 'replica' in settings.DATABASES else {'default'}
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='author', password='x', display_name='Author')
+        self.post = Post.objects.create(user=self.user, title='Hello', text='world')
+        self.client = APIClient()
+        token_login(self.client, self.user)
+    
+    def count_queries(self, method, *args, **kwargs):
+        counts = {}
+        def counter(alias):
+            def wrapper(execute, sql, params, many, context):
+                counts[alias] = counts.get(alias, 0) + 1
+                return execute(sql, params, many, context)
+            return wrapper
+        with connections['default'].execute_wrapper(counter('default')), \
+                connections['replica'].execute_wrapper(counter('replica')):
+            response = method(*args, **kwargs)
+        return response, counts
+    
+    def test_reads_go_to_replica_until_a_write(self):
+        """Profile reads use the replica, then the primary right after a write."""
+        response, counts = self.count_queries(self.client.get, '/api/super/user/author')
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(counts.get('replica', 0), 0)
+        
+        response, _ = self.count_queries(self.client.post, '/api/likes', {'post': self.post.id}, format='json')
+        self.assertIn(ReplicaRoutingMiddleware.COOKIE, response.cookies)
+        
+        response, counts = self.count_queries(self.client.get, '/api/super/user/author')
+        self.assertEqual(counts.get('replica', 0), 0)
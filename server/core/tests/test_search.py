@@ -0,0 +1,271 @@
+import time
+from io import StringIO
+from asgiref.sync import async_to_sync
+from django.apps import apps
+from django.test import TestCase
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from django.http import QueryDict
+from rest_framework.test import APIRequestFactory
+from core.pagination import keyset_page
+from core.services import PostService, SuperService
+from django.test.utils import CaptureQueriesContext
+from core.models import User, Post, Super, Project, Club, Event, Tag, UserSearchTerm
+from core.search import POST_FTS_TABLE, asearch_users, drop_search_triggers, match_expression
+from core.signals import put_back_search_triggers, take_down_search_triggers
+
+
+class PostSearchTests(TestCase):
+    """Test cases for the post full-text search index."""
+    
+    def setUp(self):
+        """Create posts with the search terms in the title, the text or neither."""
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(
+            username='author',
+            password='AuthorPassword123!',
+            display_name='Author'
+        )
+        self.in_text = Post.objects.create(user=self.user, title='Meeting notes', text='We built robots today')
+        self.in_title = Post.objects.create(user=self.user, title='Robotics club', text='Come along')
+        self.unrelated = Post.objects.create(user=self.user, title='Bake sale', text='Cookies for everyone')
+    
+    def get_posts(self, **params):
+        params = self.factory.get('/api/posts', params).GET
+        return async_to_sync(PostService.aget_multiple_posts)(params, AnonymousUser())
+    
+    def search(self, term, **params):
+        return [post['id'] for post in self.get_posts(search=term, **params)['posts']]
+    
+    def test_prefix_matching_and_ranking(self):
+        """A partial word matches, and title hits rank above body hits."""
+        self.assertEqual(self.search('robot'), [self.in_title.id, self.in_text.id])
+    
+    def test_all_words_must_match(self):
+        """Multiple words are ANDed together."""
+        self.assertEqual(self.search('robots today'), [self.in_text.id])
+        self.assertEqual(self.search('robots cookies'), [])
+    
+    def test_operators_are_treated_as_text(self):
+        """FTS5 syntax in user input can't break the query."""
+        self.assertEqual(match_expression('NOT "bake" OR*'), '"not"* "bake"* "or"*')
+        self.assertEqual(self.search('bake OR ('), [])
+        self.assertIsNone(match_expression('  ?! '))
+    
+    def test_index_follows_edits_and_deletes(self):
+        """Triggers keep the index in sync with the posts table."""
+        self.unrelated.title = 'Robot bake sale'
+        self.unrelated.save()
+        self.assertIn(self.unrelated.id, self.search('robot'))
+        self.assertEqual(self.search('cookies'), [self.unrelated.id])
+        
+        self.in_title.delete()
+        self.assertNotIn(self.in_title.id, self.search('robot'))
+    
+    def test_search_results_paginate(self):
+        """Ranked results walk with the same cursor scheme as the feed."""
+        first = self.get_posts(search='robot', limit=1)
+        second = self.get_posts(search='robot', limit=1, cursor=first['pagination']['next_cursor'])
+        
+        self.assertEqual(first['posts'][0]['id'], self.in_title.id)
+        self.assertEqual(second['posts'][0]['id'], self.in_text.id)
+        self.assertIsNone(second['pagination']['next_cursor'])
+    
+    def test_text_without_words(self):
+        """Punctuation alone searches for nothing and keeps the feed's order."""
+        self.assertEqual(
+            self.search('!!!', order='reverse'),
+            [self.unrelated.id, self.in_title.id, self.in_text.id],
+        )
+    
+    def test_many_matches(self):
+        """A page of a search with thousands of matches reads the index once."""
+        Post.objects.bulk_create([
+            Post(user=self.user, title=f'Robot {i}', text='Lots of robots') for i in range(3000)
+        ])
+        querySet, ordering, cursor, limit = PostService.posts_query(QueryDict('search=robot'), AnonymousUser())
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            page, next_cursor = keyset_page(querySet, ordering, cursor, limit)
+            elapsed = time.perf_counter() - started
+        
+        self.assertEqual(len(page), 10)
+        self.assertEqual(queries[0]['sql'].count('MATCH'), 1)
+        # Re-running the MATCH per row took seconds at this size
+        self.assertLess(elapsed, 0.5)
+    
+    def test_rebuild_command(self):
+        """The rebuild command restores a wiped index."""
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {POST_FTS_TABLE}({POST_FTS_TABLE}) VALUES ('delete-all')")
+        self.assertEqual(self.search('robot'), [])
+        
+        call_command('rebuild_post_search_index', stdout=StringIO())
+        self.assertEqual(self.search('robot'), [self.in_title.id, self.in_text.id])
+    
+    def test_triggers_come_back_after_migrate(self):
+        """Core migrations run without the triggers, which are reinstalled afterwards."""
+        core = apps.get_app_config('core')
+        plan = [(MigrationLoader(connection).get_migration('core', '0016_tag_counts'), False)]
+        take_down_search_triggers(sender=core, using='default', plan=plan)
+        Post.objects.filter(id=self.unrelated.id).update(title='Robot bake sale')
+        self.assertNotIn(self.unrelated.id, self.search('robot'))
+        
+        put_back_search_triggers(sender=core, using='default', plan=plan)
+        self.assertIn(self.unrelated.id, self.search('robot'))
+        self.in_text.delete()
+        self.assertNotIn(self.in_text.id, self.search('robot'))
+    
+    def test_no_reindex_without_dropped_triggers(self):
+        """A migrate that found no triggers to drop reinstalls them without rereading the tables."""
+        core = apps.get_app_config('core')
+        plan = [(MigrationLoader(connection).get_migration('core', '0016_tag_counts'), False)]
+        drop_search_triggers()
+        take_down_search_triggers(sender=core, using='default', plan=plan)
+        with CaptureQueriesContext(connection) as queries:
+            put_back_search_triggers(sender=core, using='default', plan=plan)
+        
+        reads = [query['sql'] for query in queries if 'CREATE TRIGGER' not in query['sql']]
+        self.assertFalse([sql for sql in reads if 'INSERT INTO' in sql or 'DELETE FROM' in sql])
+        self.in_text.delete()
+        self.assertNotIn(self.in_text.id, self.search('robot'))
+
+
+
+class ActivitySearchTests(TestCase):
+    """Test cases for the unified activity search."""
+    
+    def setUp(self):
+        """Create one of each activity type, linked by a shared tag."""
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(
+            username='leader',
+            password='LeaderPassword123!',
+            display_name='Leader'
+        )
+        self.tag = Tag.objects.create(tag='robotics')
+        self.project = Project.objects.create(name='Rover build', leader=self.user, description='Mars rover')
+        self.club = Club.objects.create(name='Robotics Club', leader=self.user)
+        self.event = Event.objects.create(name='Demo day', leader=self.user, description='Show and tell')
+        self.event.tags.add(self.tag)
+        self.plain = Super.objects.create(name='Robotics misc')
+    
+    def search(self, **params):
+        return async_to_sync(SuperService.asearch_activities)(self.factory.get('/api/super', params).GET)
+    
+    def test_super_type_is_recorded(self):
+        """Each subclass records its type on the shared Super row."""
+        types = dict(Super.objects.values_list('id', 'super_type'))
+        self.assertEqual(types[self.project.id], 'project')
+        self.assertEqual(types[self.club.id], 'club')
+        self.assertEqual(types[self.event.id], 'event')
+        self.assertEqual(types[self.plain.id], 'super')
+    
+    def test_ranked_across_types(self):
+        """Name hits rank above tag hits, and plain Supers are left out."""
+        activities = self.search(search='robot')['activities']
+        self.assertEqual([a['id'] for a in activities], [self.club.id, self.event.id])
+        self.assertEqual(activities[0], Club.objects.get(id=self.club.id).to_dict())
+        self.assertEqual(activities[1], Event.objects.get(id=self.event.id).to_dict())
+    
+    def test_type_filter_and_tag_changes(self):
+        """The index follows tag edits, and ?type= narrows the results."""
+        self.project.tags.add(self.tag)
+        self.assertEqual(
+            [a['id'] for a in self.search(search='robotics', type='project')['activities']],
+            [self.project.id],
+        )
+        
+        self.tag.tag = 'mechatronics'
+        self.tag.save()
+        self.assertEqual(
+            [a['id'] for a in self.search(search='mecha')['activities']],
+            [self.project.id, self.event.id],
+        )
+        
+        self.event.tags.remove(self.tag)
+        self.assertEqual(
+            [a['id'] for a in self.search(search='mecha')['activities']],
+            [self.project.id],
+        )
+    
+    def test_paginates_without_search(self):
+        """An empty search pages through every activity by id."""
+        first = self.search(limit=2)
+        second = self.search(limit=2, cursor=first['pagination']['next_cursor'])
+        ids = [a['id'] for a in first['activities'] + second['activities']]
+        self.assertEqual(ids, [self.project.id, self.club.id, self.event.id])
+        self.assertIsNone(second['pagination']['next_cursor'])
+    
+    def test_many_matches(self):
+        """A page of a search with thousands of matches reads the index once."""
+        Super.objects.bulk_create([
+            Super(name=f'Robot club {i}', super_type=Super.SuperType.CLUB) for i in range(3000)
+        ])
+        querySet, ordering, cursor, limit = SuperService.activities_query(QueryDict('search=robot'))
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            page, next_cursor = keyset_page(querySet, ordering, cursor, limit)
+            elapsed = time.perf_counter() - started
+        
+        self.assertEqual(len(page), 30)
+        self.assertEqual(queries[0]['sql'].count('MATCH'), 1)
+        self.assertLess(elapsed, 0.5)
+
+
+class UserSearchTests(TestCase):
+    """Test cases for the indexed user search."""
+    
+    def setUp(self):
+        """Create users whose names match 'ann' in different ways."""
+        self.prefix = User.objects.create_user(username='annabel', password='x', display_name='Bel')
+        self.exact = User.objects.create_user(username='ann', password='x', display_name='Ann A')
+        self.display = User.objects.create_user(username='zed', password='x', display_name='Zed Annson')
+        self.infix = User.objects.create_user(username='joanne', password='x', display_name='Jo')
+        self.other = User.objects.create_user(username='bob', password='x', display_name='Bob')
+    
+    def test_ranking(self):
+        """Exact username, then username prefix, then display name, then substring."""
+        self.assertEqual(
+            async_to_sync(asearch_users)('Ann'),
+            [self.exact, self.prefix, self.display, self.infix],
+        )
+        self.assertEqual(async_to_sync(asearch_users)('ann', limit=2), [self.exact, self.prefix])
+    
+    def test_accents_and_full_display_name(self):
+        """Accents are ignored and multi-word display names match as typed."""
+        user = User.objects.create_user(username='u1', password='x', display_name='José Núñez')
+        self.assertEqual(async_to_sync(asearch_users)('jose nu'), [user])
+        self.assertEqual(async_to_sync(asearch_users)('NUNEZ'), [user])
+    
+    def test_renames_are_reindexed(self):
+        """Changing a name updates the index, but logins don't touch it."""
+        self.other.display_name = 'Robert'
+        self.other.save()
+        self.assertEqual(async_to_sync(asearch_users)('robe'), [self.other])
+        
+        with CaptureQueriesContext(connection) as ctx:
+            self.other.save(update_fields=['last_login'])
+        self.assertEqual(len(ctx.captured_queries), 1)
+    
+    def test_rebuild(self):
+        """The rebuild command restores a wiped index."""
+        UserSearchTerm.objects.all().delete()
+        self.assertEqual(async_to_sync(asearch_users)('bob'), [])
+        call_command('rebuild_user_search_index', stdout=StringIO())
+        self.assertEqual(async_to_sync(asearch_users)('bob'), [self.other])
+    
+    def test_stops_at_the_first_full_tier(self):
+        """Later tiers aren't read once the page is full."""
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(async_to_sync(asearch_users)('ann', limit=2), [self.exact, self.prefix])
+        self.assertEqual(len(ctx.captured_queries), 2)
+    
+    def test_lookup_is_a_bounded_range_scan(self):
+        """Each tier reads at most a few pages of the index."""
+        with CaptureQueriesContext(connection) as ctx:
+            async_to_sync(asearch_users)('ann')
+        for query in ctx.captured_queries[:-1]:
+            self.assertIn('LIMIT 50', query['sql'])
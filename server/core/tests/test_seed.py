@@ -0,0 +1,75 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
+from unittest.mock import patch
+from django.contrib.auth.hashers import check_password
+from django.core.management import call_command
+from django.test import TestCase
+from core.management.commands.seed_test_data import Command
+from core.management.hashing import hash_password
+from core.models import User, Super, Event, Tag, Link, UserSearchTerm
+
+
+class SeedTestDataTests(TestCase):
+    """Test cases for the seed_test_data command."""
+    
+    def seed(self, *args):
+        out = StringIO()
+        call_command('seed_test_data', *args, stdout=out)
+        return out.getvalue()
+    
+    def snapshot(self):
+        return {
+            'users': sorted(User.objects.values_list('username', 'display_name', 'is_superuser')),
+            'supers': sorted(
+                (instance.name, instance.super_type,
+                 tuple(sorted(instance.tags.values_list('tag', flat=True))),
+                 tuple(sorted(instance.links.values_list('link', flat=True))))
+                for instance in Super.objects.all()
+            ),
+            'tags': Tag.objects.count(),
+            'links': Link.objects.count(),
+        }
+    
+    def test_bulk_matches_row_by_row(self):
+        """Bulk mode seeds the same rows as the default mode."""
+        self.seed()
+        expected = self.snapshot()
+        Super.objects.all().delete()
+        Tag.objects.all().delete()
+        Link.objects.all().delete()
+        User.objects.all().delete()
+        
+        output = self.seed('--bulk')
+        self.assertEqual(self.snapshot(), expected)
+        self.assertIn('rows/sec', output)
+    
+    def test_bulk_users_can_log_in_and_be_found(self):
+        """Bulk created users get working passwords and search terms."""
+        self.seed('--bulk')
+        user = User.objects.get(username='student1')
+        self.assertTrue(user.check_password('password1'))
+        self.assertTrue(UserSearchTerm.objects.filter(user=user).exists())
+        event = Event.objects.get(name='Tech Conference 2025')
+        self.assertEqual(event.location, 'San Francisco, CA')
+        self.assertEqual(Super.objects.get(id=event.id).super_type, 'event')
+    
+    def test_bulk_reseed_is_idempotent(self):
+        """Seeding twice in bulk mode doesn't duplicate anything."""
+        self.seed('--bulk')
+        first = self.snapshot()
+        self.seed('--bulk')
+        self.assertEqual(self.snapshot(), first)
+    
+    def test_identical_passwords_hashed_once(self):
+        """Identical passwords share a single hash."""
+        with patch('core.management.commands.seed_test_data.hash_password', side_effect=lambda p: 'hash:' + p) as hasher:
+            hashes = Command().hash_passwords(['same', 'same', 'other', 'pbkdf2_sha256$x'], workers=1)
+        self.assertEqual(hasher.call_count, 2)
+        self.assertEqual(hashes, {'same': 'hash:same', 'other': 'hash:other', 'pbkdf2_sha256$x': 'pbkdf2_sha256$x'})
+    
+    def test_hash_worker_runs_in_a_spawned_process(self):
+        """The hashing worker loads in a fresh interpreter, where Django isn't set up."""
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+            hashed = pool.submit(hash_password, 'secret').result(timeout=60)
+        self.assertTrue(check_password('secret', hashed))
@@ -1,9 +1,17 @@
-from django.test import TestCase, RequestFactory
+from asgiref.sync import async_to_sync
+from django.test import TestCase, RequestFactory, override_settings
 from django.core.exceptions import ValidationError
 from django.contrib.auth import get_user_model
 from django.contrib.sessions.middleware import SessionMiddleware
-from core.services import UserService
-from core.models import User
+from django.contrib.auth.models import AnonymousUser
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APIRequestFactory
+from api.testing import token_login
+from core.services import UserService, PostService, SuperService
+from core.pagination import encode_cursor
+from core.tokens import resolve_token
+from core.models import User, Post, Like, Project, Club, Event, Super, Tag, Link
 
 
 class UserServiceTests(TestCase):
@@ -100,16 +108,310 @@ class UserServiceTests(TestCase):
         self.assertEqual(user_data['user']['username'], 'existinguser')
         self.assertEqual(user_data['user']['display_name'], 'Existing User')
         
-        # Check session contains the user ID
-        self.assertEqual(int(self.request.session['_auth_user_id']), self.user.id)
+        # Check the token resolves to the user
+        self.assertEqual(resolve_token(user_data['token']), self.user)
     
     def test_logout_user(self):
         """Test logging out a user."""
         # First login the user
-        UserService.login_user(self.request, self.user)
+        token = UserService.login_user(self.request, self.user)['token']
+        self.request.user = resolve_token(token)
+        self.request.auth = token
         
         # Then logout
         UserService.logout_user(self.request)
         
-        # Check session doesn't contain user ID
-        self.assertNotIn('_auth_user_id', self.request.session)
\ No newline at end of file
+        # Check the token no longer works
+        self.assertIsNone(resolve_token(token))
+
+
+class PostServiceTests(TestCase):
+    """Test cases for PostService feed assembly."""
+    
+    def setUp(self):
+        """Create a few hundred posts spread across activities, with likes."""
+        self.factory = APIRequestFactory()
+        self.author = User.objects.create_user(
+            username='author',
+            password='AuthorPassword123!',
+            display_name='Author'
+        )
+        self.viewer = User.objects.create_user(
+            username='viewer',
+            password='ViewerPassword123!',
+            display_name='Viewer'
+        )
+        self.project = Project.objects.create(name='Robots', leader=self.author)
+        self.club = Club.objects.create(name='Chess', leader=self.author)
+        
+        posts = []
+        for i in range(500):
+            posts.append(Post(
+                user=self.author,
+                title=f'Post {i}',
+                text='hello',
+                project=self.project if i % 3 == 0 else None,
+                club=self.club if i % 3 == 1 else None,
+            ))
+        Post.objects.bulk_create(posts)
+        
+        likes = []
+        for post in Post.objects.all()[:250]:
+            likes.append(Like(post=post, user=self.viewer))
+            likes.append(Like(post=post, user=self.author))
+        Like.objects.bulk_create(likes)
+        PostService.reconcile_counters()
+    
+    def get_posts(self, user, **params):
+        return async_to_sync(PostService.aget_multiple_posts)(self.factory.get('/api/posts', params).GET, user)
+    
+    def count_queries(self, user, limit):
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.get_posts(user, limit=limit)
+        self.assertEqual(len(data['posts']), limit)
+        return len(ctx.captured_queries)
+    
+    def test_query_count_is_flat_for_anonymous_users(self):
+        """The number of queries doesn't grow with the page size."""
+        self.assertEqual(
+            self.count_queries(AnonymousUser(), 10),
+            self.count_queries(AnonymousUser(), 500),
+        )
+    
+    def test_query_count_is_flat_for_authenticated_users(self):
+        """The liked flag doesn't add a query per post."""
+        self.assertEqual(
+            self.count_queries(self.viewer, 10),
+            self.count_queries(self.viewer, 500),
+        )
+    
+    def test_feed_matches_to_dict(self):
+        """The feed returns the same shape as Post.to_dict() plus liked."""
+        data = self.get_posts(self.viewer, limit=500)
+        liked_ids = set(Like.objects.filter(user=self.viewer).values_list('post_id', flat=True))
+        
+        for post_dict in data['posts']:
+            post = Post.objects.get(id=post_dict['id'])
+            expected = post.to_dict()
+            expected['liked'] = post.id in liked_ids
+            self.assertEqual(post_dict, expected)
+    
+    def test_reconcile_counters_reports_and_fixes_drift(self):
+        """Counters drifted away from the Like table get repaired."""
+        post = Post.objects.filter(like_count=2).first()
+        Post.objects.filter(id=post.id).update(like_count=7)
+        
+        result = PostService.reconcile_counters(batch_size=64, fix=False)
+        self.assertEqual(result['checked'], 500)
+        self.assertEqual(result['drift'], [(post.id, 'like_count', 7, 2)])
+        self.assertEqual(Post.objects.get(id=post.id).like_count, 7)
+        
+        PostService.reconcile_counters(batch_size=64)
+        self.assertEqual(Post.objects.get(id=post.id).like_count, 2)
+        self.assertEqual(PostService.reconcile_counters()['drift'], [])
+    
+    def walk_pages(self, **params):
+        ids, cursor, pages = [], None, 0
+        while True:
+            if cursor:
+                params['cursor'] = cursor
+            data = self.get_posts(AnonymousUser(), limit=64, **params)
+            ids += [post['id'] for post in data['posts']]
+            pages += 1
+            cursor = data['pagination']['next_cursor']
+            if cursor is None:
+                return ids, pages
+    
+    def test_cursor_pagination_visits_every_post_once(self):
+        """Following next_cursor walks the whole feed in both orders."""
+        all_ids = list(Post.objects.order_by('id').values_list('id', flat=True))
+        
+        ids, pages = self.walk_pages()
+        self.assertEqual(ids, all_ids)
+        self.assertEqual(pages, 8)
+        
+        ids, _ = self.walk_pages(order='reverse')
+        self.assertEqual(ids, all_ids[::-1])
+    
+    def test_deep_pages_cost_the_same_as_the_first(self):
+        """A deep page runs the same queries as page one, with no count."""
+        with CaptureQueriesContext(connection) as first:
+            data = self.get_posts(AnonymousUser(), limit=10)
+        self.assertNotIn('total', data['pagination'])
+        
+        deep_cursor = encode_cursor([Post.objects.order_by('id').values_list('id', flat=True)[480]])
+        with CaptureQueriesContext(connection) as deep:
+            data = self.get_posts(AnonymousUser(), limit=10, cursor=deep_cursor)
+        self.assertEqual(len(data['posts']), 10)
+        self.assertEqual(len(first.captured_queries), len(deep.captured_queries))
+        self.assertNotIn('OFFSET', deep.captured_queries[-1]['sql'])
+    
+    def test_exact_total_is_opt_in(self):
+        """?total=exact adds the full count."""
+        data = self.get_posts(AnonymousUser(), limit=10, total='exact')
+        self.assertEqual(data['pagination']['total'], 500)
+    
+    def test_invalid_cursor(self):
+        """A garbage cursor is a validation error."""
+        with self.assertRaises(ValidationError):
+            self.get_posts(AnonymousUser(), cursor='not-a-cursor')
+
+
+class SuperServiceTests(TestCase):
+    """Test cases for bulk Super serialization."""
+    
+    def setUp(self):
+        """Create a mix of activities with followers, links and tags."""
+        self.users = [
+            User.objects.create_user(username=f'user{i}', password='x', display_name=f'User {i}')
+            for i in range(3)
+        ]
+        self.tags = [Tag.objects.create(tag=f'tag{i}') for i in range(3)]
+        self.links = [Link.objects.create(link=f'https://example.com/{i}') for i in range(3)]
+        self.club = Club.objects.create(name='Club 0', leader=self.users[0])
+    
+    def make_supers(self, count):
+        for i in range(count):
+            model = (Project, Club, Event)[i % 3]
+            extra = {'club_ref': self.club} if model is Event else {}
+            super = model.objects.create(name=f'{model.__name__} {i}', leader=self.users[i % 3], **extra)
+            super.followers.add(*self.users[:i % 4])
+            super.tags.add(*self.tags[:i % 3])
+            super.links.add(*self.links[:(i + 1) % 3])
+        supers = Super.objects.exclude(id=self.club.id).order_by('id')
+        return async_to_sync(SuperService.aas_activities)(list(supers))
+    
+    def test_matches_per_instance_to_dict(self):
+        """Bulk output is identical to calling to_dict() on each instance."""
+        activities = self.make_supers(9)
+        expected = [
+            type(activity).objects.get(id=activity.id).to_dict() for activity in activities
+        ]
+        self.assertEqual(SuperService.serialize_supers(activities), expected)
+        
+        plain = list(Super.objects.order_by('id'))
+        self.assertEqual(
+            SuperService.serialize_supers(Super.objects.order_by('id')),
+            [super.to_dict() for super in plain],
+        )
+    
+    def test_query_count_is_constant(self):
+        """Serializing 30 Supers costs the same as serializing 3."""
+        activities = self.make_supers(30)
+        with CaptureQueriesContext(connection) as small:
+            SuperService.serialize_supers(activities[:3])
+        with CaptureQueriesContext(connection) as large:
+            SuperService.serialize_supers(activities)
+        self.assertEqual(len(small.captured_queries), 3)
+        self.assertEqual(len(large.captured_queries), 3)
+
+
+class PostBatchTests(TestCase):
+    """Test cases for creating many posts at once."""
+    
+    def setUp(self):
+        """Create an author, some activities and a follower."""
+        self.user = User.objects.create_user(username='author', password='x', display_name='Author')
+        self.follower = User.objects.create_user(username='fan', password='x', display_name='Fan')
+        self.project = Project.objects.create(name='Robots', leader=self.user)
+        self.club = Club.objects.create(name='Chess', leader=self.user)
+        self.project.followers.add(self.follower)
+    
+    def test_creates_valid_items_and_reports_invalid_ones(self):
+        """Each item gets its own result, in order."""
+        results = PostService.create_posts(self.user, [
+            {'title': 'One', 'text': 'hello', 'project': self.project.id},
+            {'title': 'Two', 'text': 'hello', 'project': 999999},
+            {'title': 'x' * 300, 'text': 'too long'},
+            {'title': 'Three', 'contentType': 'IMAGE', 'image_url': 'a.png', 'club': self.club.id},
+            'not a post',
+        ])
+        self.assertEqual([result['index'] for result in results], [0, 1, 2, 3, 4])
+        self.assertEqual(results[0]['post']['project']['name'], 'Robots')
+        self.assertIn('project', results[1]['errors'])
+        self.assertIn('title', results[2]['errors'])
+        self.assertEqual(results[3]['post']['contentType'], 'image')
+        self.assertIn('post', results[4]['errors'])
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertTrue(self.follower.timeline.filter(post_id=results[0]['post']['id']).exists())
+    
+    def test_query_count_is_constant(self):
+        """Creating 50 posts costs the same as creating 2."""
+        def items(count):
+            return [
+                {'title': f'Post {i}', 'text': 'hello', 'project': self.project.id, 'club': self.club.id}
+                for i in range(count)
+            ]
+        with CaptureQueriesContext(connection) as small:
+            PostService.create_posts(self.user, items(2))
+        with CaptureQueriesContext(connection) as large:
+            PostService.create_posts(self.user, items(50))
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+        self.assertEqual(self.follower.timeline.count(), 52)
+    
+    def test_batch_size_limit(self):
+        """Empty and oversized batches are rejected outright."""
+        with self.assertRaises(ValidationError):
+            PostService.create_posts(self.user, [])
+        with self.assertRaises(ValidationError):
+            PostService.create_posts(self.user, [{'text': 'x'}] * (PostService.MAX_BATCH_SIZE + 1))
+    
+    @override_settings(ALLOWED_HOSTS=['testserver'])
+    def test_body_that_isnt_an_object(self):
+        """A list or scalar body is a client error, not a crash."""
+        client = APIClient()
+        token_login(client, self.user)
+        for body in ([{'title': 'One', 'text': 'hello'}], 'posts', 3):
+            with self.subTest(body=body):
+                response = client.post('/api/posts/batch', body, format='json')
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.data, {'detail': 'Expected an object with a posts list'})
+        self.assertFalse(Post.objects.exists())
+
+
+class TagResolutionTests(TestCase):
+    """Test cases for set-based tag and link resolution."""
+    
+    def setUp(self):
+        """Create a leader and a couple of existing tags and links."""
+        self.user = User.objects.create_user(username='leader', password='x', display_name='Leader')
+        Tag.objects.create(tag='robots')
+        Link.objects.create(link='https://example.com')
+    
+    def data(self, tags, links=()):
+        return {'name': 'Robotics', 'description': 'Build robots', 'tags': tags, 'links': list(links)}
+    
+    def test_reuses_existing_and_creates_missing(self):
+        """Existing names are reused, new ones are created once."""
+        project = SuperService.create_project(self.user, self.data(
+            ['robots', 'ai', 'ai', 'hardware'], ['https://example.com', 'https://robots.dev']))
+        self.assertEqual(sorted(project.tags.values_list('tag', flat=True)), ['ai', 'hardware', 'robots'])
+        self.assertEqual(sorted(project.links.values_list('link', flat=True)), ['https://example.com', 'https://robots.dev'])
+        self.assertEqual(Tag.objects.filter(tag='robots').count(), 1)
+        self.assertEqual(Tag.objects.count(), 3)
+    
+    def test_query_count_is_constant(self):
+        """A Super with 20 tags costs the same as one with 2."""
+        with CaptureQueriesContext(connection) as small:
+            SuperService.create_club(self.user, self.data([f'small{i}' for i in range(2)], ['https://a.dev']))
+        with CaptureQueriesContext(connection) as large:
+            SuperService.create_club(self.user, self.data([f'large{i}' for i in range(20)], ['https://b.dev']))
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+        self.assertLessEqual(len(large.captured_queries), 13)
+    
+    def test_names_are_unique(self):
+        """The database rejects a second row with the same name."""
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Tag.objects.create(tag='robots')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Link.objects.create(link='https://example.com')
+    
+    def test_event_with_club_and_tags(self):
+        """Events keep their club reference alongside the resolved tags."""
+        club = Club.objects.create(name='Makers', leader=self.user)
+        data = self.data(['robots'])
+        data.update(club_ref=club.id, start_time='2025-05-01T10:00:00', end_time='2025-05-01T12:00:00')
+        event = SuperService.create_event(self.user, data)
+        event.refresh_from_db()
+        self.assertEqual(event.club_ref_id, club.id)
+        self.assertEqual(list(event.tags.values_list('tag', flat=True)), ['robots'])
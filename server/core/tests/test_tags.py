@@ -0,0 +1,102 @@
+from api.testing import APITestCase
+from core.models import User, Post, Project, Club, Tag
+from core.services import TagService
+
+
+class TagCountTests(APITestCase):
+    """Test cases for the tag counters and the tag listing."""
+
+    login_as = None
+
+    def setUp(self):
+        super().setUp()
+        self.art, self.arts, self.music = [Tag.objects.create(tag=name) for name in ('art', 'arts', 'music')]
+        self.posts = [self.add_post(f'Post {i}') for i in range(3)]
+
+    def counts(self):
+        return {tag.tag: (tag.post_count, tag.super_count) for tag in Tag.objects.all()}
+
+    def test_counters_follow_relations(self):
+        """Adding, removing and clearing tags from either side keeps the counts right."""
+        for post in self.posts:
+            post.tag.add(self.art)
+        self.posts[0].tag.add(self.music)
+        self.music.post_set.add(self.posts[1])
+        club = Club.objects.create(name='Painters', leader=self.user)
+        club.tags.add(self.art)
+        self.assertEqual(self.counts(), {'art': (3, 1), 'arts': (0, 0), 'music': (2, 0)})
+
+        self.posts[0].tag.clear()
+        self.art.post_set.remove(self.posts[1])
+        club.tags.clear()
+        self.assertEqual(self.counts(), {'art': (1, 0), 'arts': (0, 0), 'music': (1, 0)})
+
+    def test_removing_what_isnt_there(self):
+        """Removing a tag a post doesn't carry leaves its count alone."""
+        self.posts[0].tag.add(self.art)
+        self.posts[1].tag.remove(self.art)
+        self.art.post_set.remove(self.posts[2])
+        self.posts[0].tag.add(self.art)
+        self.assertEqual(self.counts()['art'], (1, 0))
+
+    def test_deletes(self):
+        """Deleting a post, a Super or a whole user takes them off their tags."""
+        other = User.objects.create_user(username='other', password='x', display_name='Other')
+        mine = Post.objects.create(user=other, title='Mine', text='hi')
+        mine.tag.add(self.art, self.music)
+        club = Club.objects.create(name='Painters', leader=other)
+        club.tags.add(self.art)
+        project = Project.objects.create(name='Gallery', leader=self.user)
+        project.tags.add(self.art, self.arts)
+        for post in self.posts:
+            post.tag.add(self.art)
+
+        self.posts[0].delete()
+        project.delete()
+        self.assertEqual(self.counts(), {'art': (3, 1), 'arts': (0, 0), 'music': (1, 0)})
+
+        other.delete()
+        self.assertEqual(self.counts(), {'art': (2, 0), 'arts': (0, 0), 'music': (0, 0)})
+        self.assertEqual(TagService.rebuild_counts()['fixed'], 0)
+
+    def test_bulk_paths(self):
+        """Tags attached in bulk are counted too."""
+        project = Project.objects.create(name='Gallery', leader=self.user)
+        TagService.add_to_super(project, tags=['art', 'sculpture'])
+        self.assertEqual(Tag.objects.get(tag='sculpture').super_count, 1)
+        self.assertEqual(Tag.objects.get(tag='art').super_count, 1)
+
+    def test_rebuild_fixes_drift(self):
+        """The rebuild only rewrites the tags that drifted."""
+        self.posts[0].tag.add(self.art, self.music)
+        Post.tag.through.objects.create(post=self.posts[1], tag=self.art)
+        Tag.objects.filter(id=self.music.id).update(super_count=4)
+        self.assertEqual(TagService.rebuild_counts(batch_size=2), {'checked': 3, 'fixed': 2})
+        self.assertEqual(self.counts(), {'art': (2, 0), 'arts': (0, 0), 'music': (1, 0)})
+
+    def test_listing(self):
+        """Most used tags come first, a prefix lists matches alphabetically."""
+        for post in self.posts:
+            post.tag.add(self.art)
+        self.posts[0].tag.add(self.arts, self.music)
+        self.posts[1].tag.add(self.music)
+        Tag.objects.create(tag='unused')
+
+        tags = []
+        cursor = ''
+        while True:
+            response = self.client.get(f'/api/tags?limit=2&cursor={cursor}')
+            self.assertEqual(response.status_code, 200)
+            self.assertWithinQueryBudget(response)
+            tags += response.data['data']['tags']
+            cursor = response.data['data']['pagination']['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(tags, [
+            {'tag': 'art', 'posts': 3, 'supers': 0},
+            {'tag': 'music', 'posts': 2, 'supers': 0},
+            {'tag': 'arts', 'posts': 1, 'supers': 0},
+        ])
+
+        response = self.client.get('/api/tags?prefix=ar')
+        self.assertEqual([tag['tag'] for tag in response.data['data']['tags']], ['art', 'arts'])
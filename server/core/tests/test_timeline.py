@@ -0,0 +1,107 @@
+from asgiref.sync import async_to_sync
+from django.test import TestCase
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import PermissionDenied
+from rest_framework.test import APIRequestFactory
+from core.services import PostService, TimelineService
+from core.models import User, Club, Project, Super, TimelineEntry
+
+
+class TimelineTests(TestCase):
+    """Test cases for the fan-out-on-write following timeline."""
+    
+    def setUp(self):
+        """A reader following one small club and one (artificially) huge project."""
+        self.factory = APIRequestFactory()
+        self.leader = User.objects.create_user(username='leader', password='x', display_name='Leader')
+        self.reader = User.objects.create_user(username='reader', password='x', display_name='Reader')
+        self.stranger = User.objects.create_user(username='stranger', password='x', display_name='Stranger')
+        self.club = Club.objects.create(name='Chess', leader=self.leader)
+        self.project = Project.objects.create(name='Rover', leader=self.leader)
+        self.unfollowed = Club.objects.create(name='Knitting', leader=self.leader)
+        self.club.followers.add(self.reader)
+        self.reader.super_users.add(self.project)
+        self.project.followers.add(self.stranger)
+        
+        self.fanout_limit = TimelineService.FANOUT_LIMIT
+        TimelineService.FANOUT_LIMIT = 1
+    
+    def tearDown(self):
+        TimelineService.FANOUT_LIMIT = self.fanout_limit
+    
+    def following(self, user, **params):
+        params = self.factory.get('/api/posts', {'feed': 'following', **params}).GET
+        return async_to_sync(PostService.aget_multiple_posts)(params, user)
+    
+    def post_to(self, super, title):
+        return PostService.create_a_post(self.leader, {'title': title, 'text': 'hi', super.super_type: super.id})
+    
+    def test_follower_count_tracks_both_directions(self):
+        """Adding followers from either side keeps the counter right."""
+        self.assertEqual(Super.objects.get(id=self.club.id).follower_count, 1)
+        self.assertEqual(Super.objects.get(id=self.project.id).follower_count, 2)
+        
+        self.reader.super_users.clear()
+        self.assertEqual(Super.objects.get(id=self.club.id).follower_count, 0)
+        self.assertEqual(Super.objects.get(id=self.project.id).follower_count, 1)
+    
+    def test_small_supers_push_and_large_supers_pull(self):
+        """Club posts are materialized, project posts are read live, both show up."""
+        club_post = self.post_to(self.club, 'club news')
+        project_post = self.post_to(self.project, 'rover news')
+        self.post_to(self.unfollowed, 'yarn news')
+        
+        self.assertTrue(TimelineEntry.objects.filter(user=self.reader, post=club_post).exists())
+        self.assertFalse(TimelineEntry.objects.filter(post=project_post).exists())
+        
+        posts = self.following(self.reader)['posts']
+        self.assertEqual([post['id'] for post in posts], [project_post.id, club_post.id])
+        self.assertFalse(posts[0]['liked'])
+    
+    def test_pages_merge_both_sources(self):
+        """Keyset pages interleave pushed and pulled posts by recency."""
+        created = []
+        for i in range(5):
+            created.append(self.post_to(self.club if i % 2 else self.project, f'post {i}').id)
+        
+        seen, cursor = [], None
+        while True:
+            data = self.following(self.reader, limit=2, **({'cursor': cursor} if cursor else {}))
+            seen += [post['id'] for post in data['posts']]
+            cursor = data['pagination']['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(seen, created[::-1])
+    
+    def test_unfollow_and_refollow(self):
+        """Unfollowing takes a Super's posts out of the timeline, following brings them back."""
+        club_post = self.post_to(self.club, 'club news')
+        shared = PostService.create_a_post(self.leader, {
+            'title': 'joint news', 'text': 'hi', 'club': self.club.id, 'project': self.project.id,
+        })
+        
+        self.reader.super_users.remove(self.club)
+        self.assertFalse(TimelineEntry.objects.filter(user=self.reader, post=club_post).exists())
+        # Still followed through the project
+        self.assertEqual([post['id'] for post in self.following(self.reader)['posts']], [shared.id])
+        
+        self.club.followers.add(self.reader)
+        self.assertEqual(
+            [post['id'] for post in self.following(self.reader)['posts']], [shared.id, club_post.id]
+        )
+        
+        self.club.followers.clear()
+        self.assertFalse(TimelineEntry.objects.filter(post=club_post).exists())
+    
+    def test_shrinking_super_backfills(self):
+        """Posts pulled while a Super was large are pushed once it falls under the limit."""
+        project_post = self.post_to(self.project, 'rover news')
+        self.assertFalse(TimelineEntry.objects.filter(post=project_post).exists())
+        
+        self.project.followers.remove(self.stranger)
+        self.assertTrue(TimelineEntry.objects.filter(user=self.reader, post=project_post).exists())
+    
+    def test_requires_login(self):
+        """Anonymous users have no timeline."""
+        with self.assertRaises(PermissionDenied):
+            self.following(AnonymousUser())
@@ -0,0 +1,123 @@
+import base64
+from django.core import signing
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from api.authentication import COOKIE
+from core.models import User
+from core.tokens import SALT, PrincipalCache, issue_token, resolve_token, revoke_token, revoke_tokens
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class TokenTests(TestCase):
+    """Test cases for signed auth tokens and the principal cache."""
+
+    def setUp(self):
+        PrincipalCache.reset()
+        self.user = User.objects.create_user(username='author', password='secret-pass-1', display_name='Author')
+        self.client = APIClient()
+
+    def login(self, client=None):
+        response = (client or self.client).post(
+            '/api/sessions', {'username': 'author', 'password': 'secret-pass-1'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_tokens_resolve_from_cache(self):
+        """Only the first lookup of a user touches the database."""
+        token = issue_token(self.user)
+        with self.assertNumQueries(1):
+            self.assertEqual(resolve_token(token), self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve_token(token), self.user)
+
+    def test_bad_tokens_are_rejected(self):
+        """Tampered, foreign and expired tokens resolve to nobody."""
+        token = issue_token(self.user)
+        self.assertIsNone(resolve_token(token[:-1] + ('A' if token[-1] != 'A' else 'B')))
+        self.assertIsNone(resolve_token('not a token'))
+        with override_settings(AUTH_TOKEN_TTL=-1):
+            self.assertIsNone(resolve_token(token))
+
+    def test_revocation(self):
+        """Revoking retires old tokens, new ones work."""
+        old = issue_token(self.user)
+        resolve_token(old)
+        revoke_tokens(self.user)
+        self.assertIsNone(resolve_token(old))
+        self.assertEqual(resolve_token(issue_token(self.user)), self.user)
+
+    @override_settings(PRINCIPAL_CACHE_SIZE=2)
+    def test_cache_is_bounded(self):
+        """The least recently used user is dropped first."""
+        users = [self.user] + [
+            User.objects.create_user(username=f'user{i}', password='x', display_name='User') for i in range(2)
+        ]
+        tokens = [issue_token(user) for user in users]
+        resolve_token(tokens[0])
+        resolve_token(tokens[1])
+        resolve_token(tokens[0])
+        resolve_token(tokens[2])
+        with self.assertNumQueries(0):
+            resolve_token(tokens[0])
+        with self.assertNumQueries(1):
+            resolve_token(tokens[1])
+
+    def test_login_cookie_and_header(self):
+        """Login hands out a cookie for the web client and a token for API clients."""
+        response = self.login()
+        token = response.data['data']['token']
+        self.assertEqual(response.cookies[COOKIE].value, token)
+        self.assertTrue(response.cookies[COOKIE]['httponly'])
+        self.assertEqual(self.client.get('/api/users/me').status_code, 200)
+
+        api = APIClient()
+        api.credentials(HTTP_AUTHORIZATION=f'Token {token}')
+        self.assertEqual(api.get('/api/users/me').data['data']['user']['username'], 'author')
+        self.assertEqual(api.get('/api/users/author').status_code, 200)
+        api.credentials(HTTP_AUTHORIZATION=f'Token {token}x')
+        self.assertEqual(api.get('/api/users/me').status_code, 403)
+
+    def test_basic_auth_is_gone(self):
+        """Passwords are only checked at login."""
+        credentials = base64.b64encode(b'author:secret-pass-1').decode()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Basic {credentials}')
+        self.assertEqual(self.client.get('/api/users/me').status_code, 403)
+
+    def test_logout_revokes(self):
+        """Logging out clears the cookie and retires that token only."""
+        other_device = self.login(APIClient()).data['data']['token']
+        token = self.login().data['data']['token']
+        response = self.client.delete('/api/sessions')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.cookies[COOKIE].value, '')
+        self.assertIsNone(resolve_token(token))
+        self.assertEqual(resolve_token(other_device), self.user)
+
+    def test_revoked_ids_are_pruned(self):
+        """Ids of tokens that have expired anyway are dropped on the next revoke."""
+        User.objects.filter(id=self.user.id).update(revoked_tokens={'old': 0})
+        token = issue_token(self.user)
+        revoke_token(self.user, token)
+        revoked = User.objects.get(id=self.user.id).revoked_tokens
+        self.assertEqual(list(revoked), [signing.loads(token, salt=SALT)[2]])
+
+    def test_tokens_without_an_id(self):
+        """Tokens issued before they had an id still work, and revoke every token."""
+        legacy = signing.dumps([self.user.id, self.user.token_version], salt=SALT)
+        current = issue_token(self.user)
+        self.assertEqual(resolve_token(legacy), self.user)
+        revoke_token(self.user, legacy)
+        self.assertIsNone(resolve_token(legacy))
+        self.assertIsNone(resolve_token(current))
+
+    def test_cookie_writes_need_csrf(self):
+        """Cookie authenticated writes are CSRF checked, like sessions were."""
+        client = APIClient(enforce_csrf_checks=True)
+        self.login(client)
+        response = client.post('/api/posts', {'title': 'Hi', 'text': 'there'}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+        csrf = client.cookies['csrftoken'].value
+        response = client.post('/api/posts', {'title': 'Hi', 'text': 'there'}, format='json', HTTP_X_CSRFTOKEN=csrf)
+        self.assertNotEqual(response.status_code, 403)
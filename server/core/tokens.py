@@ -0,0 +1,159 @@
+# Signed, expiring authentication tokens
+#
+# A token is the user's id, token_version and a random token id, signed
+# with SECRET_KEY and timestamped, so checking one is an HMAC and needs no
+# database. The user behind it comes from PrincipalCache, a small
+# per-process LRU, so an authenticated request usually doesn't query at all.
+#
+# revoke_token() retires a single token (a logout) by listing its id in
+# User.revoked_tokens until it would have expired anyway. revoke_tokens()
+# bumps User.token_version, which retires every token issued to that user.
+# Either way this process forgets the user at once; other processes notice
+# within settings.PRINCIPAL_CACHE_TTL seconds, when their entry expires.
+#
+# Admin logins still use database sessions; schedule Django's own
+# `manage.py clearsessions` (e.g. daily from cron) to delete expired ones.
+import copy
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+from django.db.models import F
+from .models import User
+
+SALT = 'core.tokens'
+
+def token_ttl() -> int:
+    """Seconds a token stays valid for"""
+    return getattr(settings, 'AUTH_TOKEN_TTL', 14 * 24 * 60 * 60)
+
+def issue_token(user: User) -> str:
+    """Sign a new token for user"""
+    return signing.dumps([user.id, user.token_version, secrets.token_urlsafe(8)], salt=SALT)
+
+def read_token(token: str) -> Optional[tuple]:
+    """
+    Check a token's signature and age
+
+    Returns:
+        tuple: (user_id, token_version, token_id), or None if the token is
+               forged, malformed or expired. token_id is None for tokens
+               issued before they had one.
+    """
+    try:
+        claims = signing.loads(token, salt=SALT, max_age=token_ttl())
+        if len(claims) == 2:
+            # Issued before tokens had an id
+            claims.append(None)
+        user_id, version, token_id = claims
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+    return user_id, version, token_id
+
+class PrincipalCache:
+    """Least recently used cache of the users tokens resolve to, per process"""
+    _lock = threading.Lock()
+    _users = OrderedDict()
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def get(cls, user_id: int) -> Optional[User]:
+        now = time.monotonic()
+        with cls._lock:
+            entry = cls._users.get(user_id)
+            if entry is None or entry[1] < now:
+                cls.misses += 1
+                return None
+            cls._users.move_to_end(user_id)
+            cls.hits += 1
+            # Requests get their own copy to change
+            return copy.copy(entry[0])
+
+    @classmethod
+    def put(cls, user: User):
+        expires = time.monotonic() + getattr(settings, 'PRINCIPAL_CACHE_TTL', 60)
+        with cls._lock:
+            cls._users[user.id] = (copy.copy(user), expires)
+            cls._users.move_to_end(user.id)
+            while len(cls._users) > getattr(settings, 'PRINCIPAL_CACHE_SIZE', 1024):
+                cls._users.popitem(last=False)
+
+    @classmethod
+    def evict(cls, user_id: int):
+        with cls._lock:
+            cls._users.pop(user_id, None)
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._users.clear()
+            cls.hits = cls.misses = 0
+
+def resolve_token(token: str) -> Optional[User]:
+    """
+    The active user a token belongs to
+
+    Returns:
+        User: The user, or None if the token is invalid, expired or revoked
+    """
+    claims = read_token(token)
+    if claims is None:
+        return None
+    user = PrincipalCache.get(claims[0])
+    if user is None:
+        user = User.objects.filter(id=claims[0], is_active=True).first()
+        if user is None:
+            return None
+        PrincipalCache.put(user)
+    return user if _accepts(user, claims) else None
+
+async def aresolve_token(token: str) -> Optional[User]:
+    """Async version of resolve_token()"""
+    claims = read_token(token)
+    if claims is None:
+        return None
+    user = PrincipalCache.get(claims[0])
+    if user is None:
+        user = await User.objects.filter(id=claims[0], is_active=True).afirst()
+        if user is None:
+            return None
+        PrincipalCache.put(user)
+    return user if _accepts(user, claims) else None
+
+def _accepts(user: User, claims: tuple) -> bool:
+    # Whether the user still honours a token with these claims
+    return user.token_version == claims[1] and claims[2] not in user.revoked_tokens
+
+def revoke_token(user: User, token: str):
+    """
+    Retire a single token issued to user, e.g. on logout
+
+    Tokens issued before they carried an id can't be told apart, so for
+    those every token of the user is retired instead.
+    """
+    claims = read_token(token)
+    if claims is None or claims[0] != user.id:
+        return
+    if claims[2] is None:
+        revoke_tokens(user)
+        return
+    now = time.time()
+    with transaction.atomic():
+        revoked = User.objects.select_for_update().values_list('revoked_tokens', flat=True).get(id=user.id)
+        # Expired tokens are rejected anyway, so their ids can go
+        revoked = {token_id: expires for token_id, expires in revoked.items() if expires > now}
+        revoked[claims[2]] = now + token_ttl()
+        User.objects.filter(id=user.id).update(revoked_tokens=revoked)
+    user.revoked_tokens = revoked
+    PrincipalCache.evict(user.id)
+
+def revoke_tokens(user: User):
+    """Retire every token issued to user so far"""
+    User.objects.filter(id=user.id).update(token_version=F('token_version') + 1)
+    user.refresh_from_db(fields=['token_version'])
+    PrincipalCache.evict(user.id)
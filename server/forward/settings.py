@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -59,16 +60,31 @@ INSTALLED_APPS = [
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.BasicAuthentication',
+        # Signed tokens from POST /api/sessions, see core.tokens
+        'api.authentication.TokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'EXCEPTION_HANDLER': 'api.utils.mistakes_were_made',
+    # orjson when installed, see api.renderers
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
+# Auth tokens (core.tokens): lifetime, and the per-process cache of the
+# users they resolve to. A revoked token can keep working in other
+# processes for up to PRINCIPAL_CACHE_TTL seconds.
+AUTH_TOKEN_TTL = 14 * 24 * 60 * 60
+PRINCIPAL_CACHE_SIZE = 1024
+PRINCIPAL_CACHE_TTL = 60
+
 MIDDLEWARE = [
+    # First, so session and auth queries count towards each request too
+    'api.middleware.QueryBudgetMiddleware',
+    'api.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -78,6 +94,12 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-request SQL accounting (see api/middleware.py). Headers expose the
+# query count and DB time per response; strict mode turns an exceeded view
+# query_budget into an error instead of a logged warning.
+QUERY_BUDGET_HEADERS = DEBUG
+QUERY_BUDGET_STRICT = False
+
 ROOT_URLCONF = 'forward.urls'
 
 TEMPLATES = [
@@ -109,6 +131,44 @@ DATABASES = {
     }
 }
 
+# Read replicas (see core/routers.py)
+#
+# Writes always go to 'default'. Reads marked with @use_replica go to one of
+# DATABASE_REPLICAS, except for clients that wrote within the last
+# READ_YOUR_WRITES_SECONDS. To try it locally with two SQLite files, copy
+# db.sqlite3 to replica.sqlite3 and start the server with
+# DATABASE_REPLICA=replica.sqlite3 (copy it again to "replicate").
+
+if os.environ.get('DATABASE_REPLICA'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / os.environ['DATABASE_REPLICA'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+READ_YOUR_WRITES_SECONDS = 5
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+#
+# LocMemCache evicts least recently used entries once MAX_ENTRIES is reached;
+# CULL_FREQUENCY = 10 drops the coldest tenth at a time. Cached responses are
+# invalidated by version keys (see core/cache.py), not by expiry.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'forward',
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+            'CULL_FREQUENCY': 10,
+        },
+    }
+}
+
 # Tells Django to use our custom User model instead of the default
 AUTH_USER_MODEL = 'core.User'
 
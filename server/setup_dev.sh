@@ -11,7 +11,7 @@ python -m venv .venv
 source .venv/bin/activate # Uncomment for Mac/Linux
 
 # Install dependencies
-pip install django djangorestframework
+pip install django djangorestframework uvicorn orjson
 
 # Run migrations
 python manage.py migrate